@@ -0,0 +1,112 @@
+"""users.last_active uchun yozuvlarni yig'ib yozuvchi bufer.
+
+Har bir /webapp ochilishi yoki bot xabari uchun alohida UPDATE o'rniga vaqt belgisi
+xotirada saqlanadi (bir foydalanuvchi uchun faqat eng oxirgisi) va har
+ACTIVITY_FLUSH_INTERVAL sekundda, ACTIVITY_MAX_BATCH ga yetganda yoki jarayon
+tugaganda bitta `UPDATE ... FROM (VALUES ...)` bilan yoziladi.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+import database as db
+
+ACTIVITY_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_FLUSH_INTERVAL', 30))   # sekund
+ACTIVITY_MAX_BATCH = int(os.environ.get('ACTIVITY_MAX_BATCH', 1000))
+
+logger = logging.getLogger(__name__)
+
+class ActivityBuffer:
+    """Thread-safe bufer: record() tez (lock + dict), yozish fon threadda"""
+
+    def __init__(self, flush_interval=ACTIVITY_FLUSH_INTERVAL, max_batch=ACTIVITY_MAX_BATCH):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = {}   # telegram_id -> unix vaqt
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._thread = None
+        self.recorded = 0
+        self.coalesced = 0   # bufferda allaqachon turgan foydalanuvchiga tushgan (yozilmagan) yozuvlar
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+
+    def record(self, telegram_id, when=None):
+        when = when or time.time()
+        with self._lock:
+            previous = self._pending.get(telegram_id)
+            if previous is not None:
+                self.coalesced += 1
+            if previous is None or previous < when:
+                self._pending[telegram_id] = when
+            self.recorded += 1
+            full = len(self._pending) >= self.max_batch
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Buferdagi barcha yozuvlarni bazaga yozish; yozilgan qatorlar sonini qaytaradi"""
+        with self._flush_lock:
+            with self._lock:
+                items, self._pending = self._pending, {}
+            if not items:
+                return 0
+            batch = list(items.items())
+            written = 0
+            try:
+                for start in range(0, len(batch), self.max_batch):
+                    written += db.update_users_last_active(batch[start:start + self.max_batch])
+            except Exception:
+                # Yozilmaganlari keyingi flush ga qaytadi (yangiroq vaqt saqlanadi)
+                with self._lock:
+                    for telegram_id, when in batch:
+                        if self._pending.get(telegram_id, 0) < when:
+                            self._pending[telegram_id] = when
+                    self.errors += 1
+                raise
+            with self._lock:
+                self.written += written
+                self.flushes += 1
+            return written
+
+    def stats(self):
+        with self._lock:
+            return {'pending': len(self._pending), 'recorded': self.recorded, 'coalesced': self.coalesced,
+                    'written': self.written, 'flushes': self.flushes, 'errors': self.errors}
+
+    def _ensure_thread(self):
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("last_active yozishda xato")
+
+buffer = ActivityBuffer()
+
+def record(telegram_id):
+    buffer.record(telegram_id)
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        buffer.flush()
+    except Exception:
+        logger.exception("last_active yakuniy yozishda xato")
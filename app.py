@@ -1,13 +1,44 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 import database as db
-from config import SECRET_KEY, TRANSLATIONS
-from datetime import datetime
+import importer
+import activity
+import webhook
+import serialization
+from config import SECRET_KEY, TRANSLATIONS, BOT_MODE
 import threading
-import bot  # Botni ishga tushirish uchun bot.py faylini import qilamiz
+import csv
+import io
 import os
 
+class ChorvaJSONProvider(DefaultJSONProvider):
+    """serialization.dumps orqali (orjson bo'lsa): DATE 'YYYY-MM-DD', NUMERIC son (API shakli o'zgarmaydi)"""
+
+    def dumps(self, obj, **kwargs):
+        return serialization.dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serialization.dumps(obj), mimetype=self.mimetype)
+
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
+app.json = ChorvaJSONProvider(app)
+webhook.init_app(app)
+
+@app.after_request
+def compress_api_response(response):
+    """/api/* javoblarini Accept-Encoding bo'yicha siqish (br/gzip, COMPRESS_MIN_SIZE dan katta)"""
+    if request.path.startswith('/api/'):
+        return serialization.compress_response(response, request.accept_encodings)
+    return response
+
+@app.errorhandler(db.ValidationError)
+def handle_validation_error(error):
+    body = {'success': False, 'error': str(error)}
+    if isinstance(error, db.BulkValidationError):
+        body['errors'] = error.errors
+    return jsonify(body), 400
 
 # Context processor - barcha template uchun tarjima funksiyasi
 @app.context_processor
@@ -27,12 +58,11 @@ def dashboard():
     if not user_id:
         return redirect(url_for('login'))
     
-    animals_stats = db.get_animals_stats(int(user_id))
-    finance_stats = db.get_finance_stats(int(user_id))
+    snapshot = db.get_dashboard_snapshot(int(user_id))
     
     return render_template('dashboard.html', 
-                         animals_stats=animals_stats,
-                         finance_stats=finance_stats)
+                         animals_stats=snapshot['animals'],
+                         finance_stats=snapshot['finance'])
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -66,7 +96,7 @@ def webapp():
     
     session['user_id'] = user_id
     session['language'] = user.get('language', 'uz')
-    db.update_user_last_active(int(user_id))
+    activity.record(int(user_id))
     
     page = request.args.get('page', 'dashboard')
     return redirect(url_for(page))
@@ -102,6 +132,92 @@ def set_language():
         db.update_user_language(int(user_id), lang)
     return jsonify({'success': True})
 
+def conditional_response(resource, user_id, build, depends=None):
+    """ETag = foydalanuvchining resurs versiyasi. If-None-Match mos kelsa 304 - ro'yxat o'qilmaydi.
+
+    Versiya ma'lumotdan oldin o'qiladi: orada yozish bo'lsa ETag eskiroq chiqadi va keyingi so'rov yangilaydi.
+    depends - bir nechta resursdan iborat javob uchun (bootstrap).
+    """
+    version = db.get_data_version(user_id, *(depends or (resource,)))
+    etag = f'{user_id or db.SHARED_USER}-{resource}-{version}'
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+    response.set_etag(etag, weak=True)
+    # Brauzer saqlashi mumkin, lekin har safar tekshiradi; javob sessiya cookie siga bog'liq
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+def page_limit(value):
+    return max(1, min(value or db.DEFAULT_PAGE_SIZE, db.MAX_PAGE_SIZE))
+
+def list_page(resource, getter, args, kwargs, limit, after=None, fields=None):
+    """(sahifa qatorlari, keyingi cursor, jami yoki None); fields - proyeksiya (cursor undan oldin olinadi)"""
+    rows = getter(*args, limit=limit + 1, after=after, **kwargs)
+    items, next_cursor = db.paginate(rows, limit, resource)
+    total = None
+    if not after and kwargs.get('search') is None:
+        total = len(items) if next_cursor is None else db.count_rows(resource, args[0] if args else None)
+    return db.project(items, fields), next_cursor, total
+
+def paged_response(resource, getter, *args, **kwargs):
+    """Keyset sahifalash: ?limit=&after=&fields=; X-Next-Cursor va (birinchi sahifada) X-Total-Count"""
+    limit = page_limit(request.args.get('limit', type=int))
+    after = request.args.get('after')
+    fields = db.parse_fields(resource, request.args.get('fields'))
+    user_id = args[0] if args else None
+
+    def build():
+        items, next_cursor, total = list_page(resource, getter, args, kwargs, limit, after, fields)
+        response = jsonify(items)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        if total is not None:
+            response.headers['X-Total-Count'] = str(total)
+        return response
+    return conditional_response(resource, user_id, build)
+
+# --- BOOTSTRAP API ---
+# Resurs -> getter; butchers umumiy, qolganlari foydalanuvchi bo'yicha
+BOOTSTRAP_GETTERS = {
+    'animals': db.get_animals,
+    'butchers': db.get_butchers,
+    'sales': db.get_sales,
+    'feed': db.get_feed,
+    'vaccinations': db.get_vaccinations,
+    'finance': db.get_finance,
+}
+
+@app.route('/api/bootstrap', methods=['GET'])
+def bootstrap():
+    """?include=sales,animals,butchers&fields[animals]=id,type,breed&limit[animals]=500
+
+    Sahifa uchun bir nechta ro'yxatning birinchi sahifasi bitta so'rovda: bitta ulanish va bitta
+    REPEATABLE READ READ ONLY tranzaksiya. Javob: {resurs: {items, next_cursor, total}}.
+    """
+    user_id = session.get('user_id')
+    if not user_id: return jsonify({'error': 'Unauthorized'}), 401
+    user_id = int(user_id)
+
+    include = list(dict.fromkeys(name.strip() for name in request.args.get('include', '').split(',') if name.strip()))
+    unknown = [name for name in include if name not in BOOTSTRAP_GETTERS]
+    if not include or unknown:
+        return jsonify({'success': False, 'error': f"include: {', '.join(BOOTSTRAP_GETTERS)}"}), 400
+    specs = [(name, page_limit(request.args.get(f'limit[{name}]', type=int)),
+              db.parse_fields(name, request.args.get(f'fields[{name}]'))) for name in include]
+
+    def build():
+        body = {}
+        with db.read_snapshot():
+            for name, limit, fields in specs:
+                args = () if name == 'butchers' else (user_id,)
+                items, next_cursor, total = list_page(name, BOOTSTRAP_GETTERS[name], args, {}, limit, fields=fields)
+                body[name] = {'items': items, 'next_cursor': next_cursor, 'total': total}
+        return jsonify(body)
+    return conditional_response('bootstrap', user_id, build, depends=include)
+
 # --- ANIMALS API ---
 @app.route('/api/animals', methods=['GET', 'POST'])
 def handle_animals():
@@ -109,17 +225,30 @@ def handle_animals():
     if not user_id: return jsonify({'error': 'Unauthorized'}), 401
     
     if request.method == 'GET':
-        return jsonify(db.get_animals(int(user_id)))
+        return paged_response('animals', db.get_animals, int(user_id))
     
     data = request.json
     animal_id = db.add_animal(
         user_id=int(user_id), animal_type=data['type'], breed=data['breed'],
         gender=data['gender'], birth_date=data.get('birth_date'),
-        weight=float(data['weight']) if data.get('weight') else None,
-        purchase_price=float(data['purchase_price']), purchase_date=data['purchase_date']
+        weight=data.get('weight'),
+        purchase_price=data.get('purchase_price'), purchase_date=data.get('purchase_date')
     )
     return jsonify({'success': True, 'id': animal_id})
 
+@app.route('/api/animals/bulk', methods=['POST'])
+def add_animals_bulk():
+    """Partiya xaridi: [{type, breed, gender, weight, purchase_price, purchase_date}, ...]"""
+    user_id = session.get('user_id')
+    if not user_id: return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.json
+    animals = data.get('animals') if isinstance(data, dict) else data
+    if not isinstance(animals, list):
+        return jsonify({'success': False, 'error': "animals: ro'yxat kutilgan"}), 400
+    ids = db.add_animals_bulk(int(user_id), animals)
+    return jsonify({'success': True, 'ids': ids, 'count': len(ids)})
+
 @app.route('/api/animals/<int:animal_id>', methods=['PUT', 'DELETE'])
 def manage_animal(animal_id):
     if request.method == 'DELETE':
@@ -132,11 +261,58 @@ def manage_animal(animal_id):
 @app.route('/api/butchers', methods=['GET', 'POST'])
 def handle_butchers():
     if request.method == 'GET':
-        return jsonify(db.get_butchers(request.args.get('search')))
+        return paged_response('butchers', db.get_butchers, search=request.args.get('search'))
     data = request.json
     bid = db.add_butcher(name=data['name'], phone=data['phone'], address=data.get('address'))
     return jsonify({'success': True, 'id': bid})
 
+# --- SALES API ---
+@app.route('/api/sales', methods=['GET', 'POST'])
+def handle_sales():
+    user_id = session.get('user_id')
+    if not user_id: return jsonify({'error': 'Unauthorized'}), 401
+    if request.method == 'GET':
+        return paged_response('sales', db.get_sales, int(user_id))
+    data = request.json
+    sale_id = db.add_sale(
+        user_id=int(user_id), animal_id=int(data['animal_id']),
+        butcher_id=int(data['butcher_id']) if data.get('butcher_id') else None,
+        sale_date=data.get('sale_date'), sale_price=data.get('sale_price'),
+        buyer_name=data.get('buyer_name'), buyer_phone=data.get('buyer_phone'),
+        payment_type=data.get('payment_type') or 'cash'
+    )
+    if sale_id is None:
+        return jsonify({'success': False, 'error': 'Hayvon topilmadi'}), 404
+    return jsonify({'success': True, 'id': sale_id})
+
+@app.route('/api/sales/analytics', methods=['GET'])
+def sales_analytics():
+    """?group=type|breed|butcher|month&date_from=&date_to= - foyda guruhlar bo'yicha"""
+    user_id = session.get('user_id')
+    if not user_id: return jsonify({'error': 'Unauthorized'}), 401
+    user_id = int(user_id)
+    group = request.args.get('group', 'type')
+    date_from, date_to = request.args.get('date_from'), request.args.get('date_to')
+    # Xato parametrlar versiya o'qilishidan oldin 400 qaytaradi
+    if group not in db.SALES_ANALYTICS_GROUPS:
+        raise db.ValidationError(f"group: {', '.join(db.SALES_ANALYTICS_GROUPS)}")
+    return conditional_response(
+        'sales_analytics', user_id,
+        lambda: jsonify(db.get_sales_analytics(user_id, group, date_from, date_to)),
+        depends=('sales',))
+
+@app.route('/api/sales/<int:sale_id>', methods=['PUT', 'DELETE'])
+def manage_sale(sale_id):
+    user_id = session.get('user_id')
+    if not user_id: return jsonify({'error': 'Unauthorized'}), 401
+    if request.method == 'DELETE':
+        found = db.delete_sale(int(user_id), sale_id)
+    else:
+        found = db.update_sale(int(user_id), sale_id, request.json)
+    if not found:
+        return jsonify({'success': False, 'error': 'Sotuv topilmadi'}), 404
+    return jsonify({'success': True})
+
 # --- FINANCE API (MOLIYA QISMI TUZATILDI) ---
 @app.route('/api/finance', methods=['GET', 'POST'])
 def handle_finance():
@@ -144,12 +320,12 @@ def handle_finance():
     if not user_id: return jsonify({'error': 'Unauthorized'}), 401
     
     if request.method == 'GET':
-        return jsonify(db.get_finance(int(user_id)))
+        return paged_response('finance', db.get_finance, int(user_id))
     
     data = request.json
     db.add_finance(
-        user_id=int(user_id), finance_type=data['type'], amount=float(data['amount']),
-        category=data['category'], description=data.get('description'), date=data['date']
+        user_id=int(user_id), finance_type=data['type'], amount=data.get('amount'),
+        category=data['category'], description=data.get('description'), date=data.get('date')
     )
     return jsonify({'success': True})
 
@@ -158,7 +334,8 @@ def get_finance_stats_api():
     """Grafiklar uchun statistika ma'lumotlarini olish"""
     user_id = session.get('user_id')
     if not user_id: return jsonify({'income': 0, 'expense': 0, 'profit': 0})
-    return jsonify(db.get_finance_stats(int(user_id)))
+    return conditional_response('finance_stats', int(user_id),
+                                lambda: jsonify(db.get_dashboard_snapshot(int(user_id))['finance']))
 
 @app.route('/api/finance/<int:finance_id>', methods=['DELETE'])
 def delete_finance(finance_id):
@@ -171,11 +348,11 @@ def handle_feed():
     user_id = session.get('user_id')
     if not user_id: return jsonify({'error': 'Unauthorized'}), 401
     if request.method == 'GET':
-        return jsonify(db.get_feed(int(user_id)))
+        return paged_response('feed', db.get_feed, int(user_id))
     data = request.json
     fid = db.add_feed(
-        user_id=int(user_id), name=data['name'], quantity=float(data['quantity']),
-        unit_price=float(data['unit_price']), supplier=data.get('supplier'), feed_date=data['feed_date']
+        user_id=int(user_id), name=data['name'], quantity=data.get('quantity'),
+        unit_price=data.get('unit_price'), supplier=data.get('supplier'), feed_date=data.get('feed_date')
     )
     return jsonify({'success': True, 'id': fid})
 
@@ -193,13 +370,13 @@ def handle_vaccinations():
     user_id = session.get('user_id')
     if not user_id: return jsonify({'error': 'Unauthorized'}), 401
     if request.method == 'GET':
-        return jsonify(db.get_vaccinations(int(user_id)))
+        return paged_response('vaccinations', db.get_vaccinations, int(user_id))
     data = request.json
     vid = db.add_vaccination(
         user_id=int(user_id), animal_id=int(data['animal_id']),
         vaccine_name=data['vaccine_name'], vaccination_date=data['vaccination_date'],
         next_date=data.get('next_date'), veterinarian=data.get('veterinarian'),
-        cost=float(data['cost']) if data.get('cost') else 0
+        cost=data.get('cost')
     )
     return jsonify({'success': True, 'id': vid})
 
@@ -211,24 +388,83 @@ def manage_vaccination(vac_id):
         db.update_vaccination(vac_id, request.json)
     return jsonify({'success': True})
 
+# --- EXPORT API ---
+EXPORT_BATCH = 500  # nechta qator bitta chunk bo'lib yuboriladi
+
+def _export_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _export_ndjson(columns, rows):
+    lines = []
+    for row in rows:
+        lines.append(app.json.dumps(dict(zip(columns, row))))
+        if len(lines) >= EXPORT_BATCH:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+@app.route('/api/export/<table>', methods=['GET'])
+def export_data(table):
+    """?format=csv|ndjson&date_from=&date_to= - chunked javob, xotira qator soniga bog'liq emas"""
+    user_id = session.get('user_id')
+    if not user_id: return jsonify({'error': 'Unauthorized'}), 401
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'error': 'format: csv yoki ndjson'}), 400
+    rows = db.iter_export(table, int(user_id), request.args.get('date_from'), request.args.get('date_to'))
+    columns = next(rows)  # validatsiya xatolari shu yerda 400 bo'lib qaytadi
+    body = _export_csv(columns, rows) if fmt == 'csv' else _export_ndjson(columns, rows)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={table}.{fmt}'
+    return response
+
+# --- IMPORT API ---
+@app.route('/api/import/<kind>', methods=['POST'])
+def import_data(kind):
+    """CSV/XLSX yuklash (multipart 'file'): animals, feed yoki finance"""
+    user_id = session.get('user_id')
+    if not user_id: return jsonify({'error': 'Unauthorized'}), 401
+    
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'error': 'file: fayl yuklanmagan'}), 400
+    result = importer.import_file(kind, int(user_id), upload.stream, upload.filename)
+    return jsonify({'success': True, **result})
+
 @app.route('/ping')
 def ping(): return "Bot is alive!", 200
 
 # ==================== MAIN ====================
 
 if __name__ == '__main__':
-    db.init_db()
+    # Jadvallar bu yerda yaratilmaydi: avval `python migrate.py`
     
     def run_bot():
         print("🤖 Telegram bot ishga tushmoqda...")
         try:
+            # telegram kutubxonasi faqat polling rejimida yuklanadi (gunicorn workerlar uni import qilmaydi)
+            import bot
             bot.main()
         except Exception as e:
             print(f"Botda xatolik: {e}")
 
-    bot_thread = threading.Thread(target=run_bot)
-    bot_thread.daemon = True
-    bot_thread.start()
+    # Webhook rejimida yangilanishlar /telegram/webhook orqali keladi
+    if BOT_MODE == 'polling':
+        bot_thread = threading.Thread(target=run_bot)
+        bot_thread.daemon = True
+        bot_thread.start()
 
     print("🌐 CHORVA FERMERI PRO WEB SERVER ISHLAYAPTI")
     port = int(os.environ.get("PORT", 5000))
@@ -1,8 +1,18 @@
 import logging
-from telegram import Update, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ConversationHandler, ContextTypes, filters
-import database as db
-from config import TRANSLATIONS, BOT_TOKEN
+from telegram import Update
+from telegram.error import BadRequest
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ConversationHandler, ContextTypes, TypeHandler, filters
+import database_async as adb
+import activity
+import reminders
+import outbox
+import i18n
+import browser
+import update_processor
+from user_cache import cache as user_cache
+from snapshot_cache import cache as snapshot_cache
+from update_processor import UserOrderedUpdateProcessor, timed
+from config import BOT_TOKEN, ADMIN_IDS, TELEGRAM_API_BASE_URL, BOT_MODE
 
 # Logging sozlash
 logging.basicConfig(
@@ -19,47 +29,43 @@ PHONE, FULLNAME = range(2)
 
 # ==================== HELPER FUNCTIONS ====================
 
-def get_translation(lang, key):
-    """Tarjima olish"""
-    return TRANSLATIONS.get(lang, TRANSLATIONS['uz']).get(key, key)
+# O'zgarmas matnlar modul yuklanganda bir marta yig'iladi
+HELP_TEXT = (
+    "📚 CHORVA FERMERI PRO v2.0\n\n"
+    "🤖 Buyruqlar:\n"
+    "• /start - Boshlash\n"
+    "• /dashboard - Statistika\n"
+    "• /animals - Hayvonlar\n"
+    "• /butchers - Qassoblar\n"
+    "• /language - Til\n"
+    "• /help - Yordam\n\n"
+    f"💻 Web dastur: {WEBAPP_URL}\n\n"
+    "📱 Klaviatura tugmalari ham mavjud."
+)
 
-def get_main_keyboard(lang='uz'):
-    """Asosiy klaviatura"""
-    t = lambda k: get_translation(lang, k)
-    keyboard = [
-        [KeyboardButton(f"🐄 {t('animals')}"), KeyboardButton(f"👤 {t('butchers')}")],
-        [KeyboardButton(f"💰 {t('sales')}"), KeyboardButton(f"🌾 {t('feed')}")],
-        [KeyboardButton(f"💉 {t('vaccinations')}"), KeyboardButton(f"📊 {t('finance')}")],
-        [KeyboardButton(f"🏠 {t('dashboard')}"), KeyboardButton(f"🌐 {t('language')}")],
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+def _webapp_url(telegram_id):
+    return f"{WEBAPP_URL}/webapp?user_id={telegram_id}"
 
-def get_language_keyboard():
-    """Til tanlash klaviaturasi"""
-    keyboard = [
-        [InlineKeyboardButton("🇺🇿 O'zbekcha", callback_data='lang_uz')],
-        [InlineKeyboardButton("🇷🇺 Русский", callback_data='lang_ru')],
-        [InlineKeyboardButton("🇬🇧 English", callback_data='lang_en')],
-    ]
-    return InlineKeyboardMarkup(keyboard)
+def webapp_markup(label, telegram_id):
+    """Web App tugmasi (avtomatik kirish uchun user_id bilan)"""
+    return i18n.webapp_markup(label, _webapp_url(telegram_id))
 
 # ==================== BOT HANDLERS ====================
 
+async def track_activity(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Har bir yangilanishda last_active buferga yoziladi (DB ga emas)"""
+    if update.effective_user:
+        activity.record(update.effective_user.id)
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start komandasi"""
     telegram_id = update.effective_user.id
-    user = db.get_user(telegram_id)
+    user = await adb.get_user(telegram_id)
     
     if user:
         # Foydalanuvchi ro'yxatdan o'tgan
         lang = user.get('language', 'uz')
         
-        # WEB APP TUGMASI
-        web_app_url = f"{WEBAPP_URL}/webapp?user_id={telegram_id}"
-        keyboard = [
-            [InlineKeyboardButton("🌐 Dasturni ochish", web_app=WebAppInfo(url=web_app_url))]
-        ]
-        
         await update.message.reply_text(
             f"👋 Xush kelibsiz, {user.get('full_name', 'Foydalanuvchi')}!\n\n"
             f"🆔 Telegram ID: <code>{telegram_id}</code>\n\n"
@@ -71,23 +77,20 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"💻 Web dastur: {WEBAPP_URL}\n"
             f"Pastdagi tugmani bosing va avtomatik kirish:",
             parse_mode='HTML',
-            reply_markup=InlineKeyboardMarkup(keyboard)
+            reply_markup=webapp_markup("🌐 Dasturni ochish", telegram_id)
         )
         await update.message.reply_text(
             f"📱 Yoki klaviaturadan foydalaning:",
-            reply_markup=get_main_keyboard(lang)
+            reply_markup=i18n.main_keyboard(lang)
         )
         return ConversationHandler.END
     
     # Yangi foydalanuvchi
-    contact_keyboard = [
-        [KeyboardButton("📱 Telefon raqamni yuborish", request_contact=True)]
-    ]
     await update.message.reply_text(
         "👋 Assalomu alaykum!\n\n"
         "🐄 CHORVA FERMERI PRO botiga xush kelibsiz!\n\n"
         "Davom etish uchun telefon raqamingizni yuboring:",
-        reply_markup=ReplyKeyboardMarkup(contact_keyboard, resize_keyboard=True, one_time_keyboard=True)
+        reply_markup=i18n.CONTACT_KEYBOARD
     )
     return PHONE
 
@@ -108,13 +111,13 @@ async def receive_phone(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(
         "✅ Telefon raqamingiz qabul qilindi!\n\n"
         "Endi ism-sharifingizni yozing:",
-        reply_markup=ReplyKeyboardMarkup([[KeyboardButton("Bekor qilish")]], resize_keyboard=True)
+        reply_markup=i18n.CANCEL_KEYBOARD
     )
     return FULLNAME
 
 async def receive_fullname(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Ism-sharif qabul qilish"""
-    if update.message.text == "Bekor qilish":
+    if update.message.text == i18n.CANCEL_TEXT:
         await update.message.reply_text("❌ Ro'yxatdan o'tish bekor qilindi.")
         return ConversationHandler.END
     
@@ -125,7 +128,7 @@ async def receive_fullname(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Saqlash
     telegram_id = context.user_data['telegram_id']
-    db.add_user(
+    await adb.add_user(
         telegram_id=telegram_id,
         username=context.user_data.get('username'),
         first_name=context.user_data.get('first_name'),
@@ -134,12 +137,6 @@ async def receive_fullname(update: Update, context: ContextTypes.DEFAULT_TYPE):
         full_name=full_name
     )
     
-    # WEB APP TUGMASI
-    web_app_url = f"{WEBAPP_URL}/webapp?user_id={telegram_id}"
-    keyboard = [
-        [InlineKeyboardButton("🌐 Dasturni ochish", web_app=WebAppInfo(url=web_app_url))]
-    ]
-    
     await update.message.reply_text(
         f"✅ Tabriklaymiz, {full_name}!\n\n"
         f"Ro'yxatdan muvaffaqiyatli o'tdingiz.\n\n"
@@ -147,11 +144,11 @@ async def receive_fullname(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"💻 Web dastur: {WEBAPP_URL}\n"
         f"Pastdagi tugmani bosing va avtomatik kirish:",
         parse_mode='HTML',
-        reply_markup=InlineKeyboardMarkup(keyboard)
+        reply_markup=webapp_markup("🌐 Dasturni ochish", telegram_id)
     )
     await update.message.reply_text(
         "📱 Asosiy menyu:",
-        reply_markup=get_main_keyboard('uz')
+        reply_markup=i18n.main_keyboard('uz')
     )
     
     context.user_data.clear()
@@ -165,103 +162,63 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # 1. Dashboard funksiyasidagi sonlar formatini tekshirish
 async def dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
     telegram_id = int(update.effective_user.id) # Aniq BIGINT format uchun
-    user = db.get_user(telegram_id)
-    # ... qolgan qismi to'g'ri ...
+    # Foydalanuvchi va statistika bitta so'rovda
+    snapshot = await adb.get_dashboard_snapshot(telegram_id)
+    user = snapshot['user']
     if not user:
         await update.message.reply_text("❌ Siz ro'yxatdan o'tmagansiz. /start bosing.")
         return
     
-    lang = user.get('language', 'uz')
-    t = lambda k: get_translation(lang, k)
-    
-    animals_stats = db.get_animals_stats(telegram_id)
-    finance_stats = db.get_finance_stats(telegram_id)
-    
-    text = f"📊 {t('dashboard')}\n\n"
-    text += f"🐄 {t('total_animals')}: {animals_stats['total']}\n"
-    text += f"✅ {t('active_animals')}: {animals_stats['active']}\n\n"
-    text += f"💰 {t('total_income')}: {finance_stats['income']:,.0f} {t('sum')}\n"
-    text += f"💸 {t('total_expense')}: {finance_stats['expense']:,.0f} {t('sum')}\n"
-    text += f"📈 {t('net_profit')}: {finance_stats['profit']:,.0f} {t('sum')}\n\n"
-    
-    # WEB APP TUGMASI
-    web_app_url = f"{WEBAPP_URL}/webapp?user_id={telegram_id}"
-    keyboard = [
-        [InlineKeyboardButton("🌐 Batafsil ko'rish", web_app=WebAppInfo(url=web_app_url))]
-    ]
-    
-    await update.message.reply_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
+    text = i18n.render_dashboard(user.get('language', 'uz'), snapshot)
+    await update.message.reply_text(text, reply_markup=webapp_markup("🌐 Batafsil ko'rish", telegram_id))
 
 async def animals_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Hayvonlar"""
+    """Hayvonlar (sahifalar inline tugmalar bilan, browser.py)"""
     telegram_id = update.effective_user.id
-    user = db.get_user(telegram_id)
+    user = await adb.get_user(telegram_id)
     if not user:
         await update.message.reply_text("❌ Siz ro'yxatdan o'tmagansiz. /start bosing.")
         return
     
-    lang = user.get('language', 'uz')
-    t = lambda k: get_translation(lang, k)
-    
-    animals = db.get_animals(telegram_id)
-    if not animals:
-        await update.message.reply_text(f"❌ {t('no_data')}")
-        return
-    
-    text = f"🐄 {t('animals')} ({len(animals)} ta):\n\n"
-    for animal in animals[:10]:
-        status_emoji = "✅" if animal['status'] == 'active' else "❌"
-        text += f"{status_emoji} {animal['type']} - {animal['breed']}\n"
-        text += f"   💰 {animal['purchase_price']:,.0f} {t('sum')}\n"
-        text += f"   📅 {animal['purchase_date']}\n\n"
-    
-    if len(animals) > 10:
-        text += f"... va yana {len(animals) - 10} ta\n\n"
-    
-    # WEB APP TUGMASI
-    web_app_url = f"{WEBAPP_URL}/webapp?user_id={telegram_id}&page=animals"
-    keyboard = [
-        [InlineKeyboardButton("🌐 Barchasini ko'rish", web_app=WebAppInfo(url=web_app_url))]
-    ]
-    
-    await update.message.reply_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
+    text, markup = await browser.animals_page(telegram_id, user.get('language', 'uz'), _webapp_url(telegram_id))
+    await update.message.reply_text(text, reply_markup=markup)
 
 async def butchers_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Qassoblar"""
-    user = db.get_user(update.effective_user.id)
+    user = await adb.get_user(update.effective_user.id)
     lang = user.get('language', 'uz') if user else 'uz'
-    t = lambda k: get_translation(lang, k)
-    
-    butchers = db.get_butchers() or []
-    if not butchers:
-        await update.message.reply_text(f"❌ {t('no_data')}")
-        return
-    
-    text = f"👤 {t('butchers')} ({len(butchers)} ta):\n\n"
-    for butcher in butchers[:10]:
-        text += f"👤 {butcher['name']}\n"
-        text += f"   📱 {butcher['phone']}\n"
-        if butcher['address']:
-            text += f"   📍 {butcher['address']}\n"
-        text += "\n"
-    
-    if len(butchers) > 10:
-        text += f"... va yana {len(butchers) - 10} ta\n\n"
     
-    # WEB APP TUGMASI
+    text, markup = await browser.butchers_page(lang, _webapp_url(update.effective_user.id))
+    await update.message.reply_text(text, reply_markup=markup)
+
+async def browse_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Ro'yxat sahifalari va filtrlari - o'sha xabar tahrirlanadi"""
+    query = update.callback_query
     telegram_id = update.effective_user.id
-    web_app_url = f"{WEBAPP_URL}/webapp?user_id={telegram_id}&page=butchers"
-    keyboard = [
-        [InlineKeyboardButton("🌐 Barchasini ko'rish", web_app=WebAppInfo(url=web_app_url))]
-    ]
+    user = await adb.get_user(telegram_id)
+    if not user:
+        await query.answer("❌ Siz ro'yxatdan o'tmagansiz. /start bosing.", show_alert=True)
+        return
     
-    await update.message.reply_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
+    try:
+        text, markup = await browser.handle_callback(query.data, telegram_id, user.get('language', 'uz'),
+                                                     _webapp_url(telegram_id))
+    except ValueError:
+        await query.answer("❌ Eskirgan tugma. Ro'yxatni qaytadan oching.", show_alert=True)
+        return
+    await query.answer()
+    try:
+        await query.edit_message_text(text, reply_markup=markup)
+    except BadRequest as e:
+        # Bir tugma ikki marta bosilsa - matn o'zgarmagan
+        if 'not modified' not in str(e).lower():
+            raise
 
 async def language_change(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Tilni o'zgartirish"""
     await update.message.reply_text(
         "🌐 Tilni tanlang / Выберите язык / Choose language:",
-        reply_markup=get_language_keyboard()
+        reply_markup=i18n.LANGUAGE_KEYBOARD
     )
 
 async def language_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -272,68 +229,133 @@ async def language_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = query.data.split('_')[1]
     telegram_id = update.effective_user.id
     
-    db.update_user_language(telegram_id, lang)
+    await adb.update_user_language(telegram_id, lang)
     
-    languages = {'uz': '🇺🇿 O\'zbekcha', 'ru': '🇷🇺 Русский', 'en': '🇬🇧 English'}
-    await query.edit_message_text(f"✅ Til o'zgartirildi: {languages[lang]}")
+    await query.edit_message_text(f"✅ Til o'zgartirildi: {i18n.LANGUAGE_NAMES[lang]}")
     
     await context.bot.send_message(
         chat_id=telegram_id,
         text="📱 Asosiy menyu:",
-        reply_markup=get_main_keyboard(lang)
+        reply_markup=i18n.main_keyboard(lang)
     )
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Yordam"""
-    text = "📚 CHORVA FERMERI PRO v2.0\n\n"
-    text += "🤖 Buyruqlar:\n"
-    text += "• /start - Boshlash\n"
-    text += "• /dashboard - Statistika\n"
-    text += "• /animals - Hayvonlar\n"
-    text += "• /butchers - Qassoblar\n"
-    text += "• /language - Til\n"
-    text += "• /help - Yordam\n\n"
-    text += f"💻 Web dastur: {WEBAPP_URL}\n\n"
-    text += "📱 Klaviatura tugmalari ham mavjud."
+    await update.message.reply_text(HELP_TEXT)
+
+# ==================== ADMIN ====================
+
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/broadcast <matn> - barcha foydalanuvchilarga xabar (faqat ADMIN_IDS)"""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+    
+    text = update.message.text.partition(' ')[2].strip()
+    if not text:
+        lines = ["📣 /broadcast <matn>\n"]
+        for b in await adb.get_recent_broadcasts():
+            lines.append(f"#{b['id']} {b['status']}: ✅ {b['sent']} ❌ {b['failed']} / {b['total']}")
+        await update.message.reply_text('\n'.join(lines))
+        return
     
-    await update.message.reply_text(text)
+    broadcast = await adb.create_broadcast(text, update.effective_user.id)
+    outbox.start_broadcast(broadcast['id'])
+    await update.message.reply_text(f"📣 Broadcast #{broadcast['id']} boshlandi: {broadcast['total']} ta foydalanuvchi")
 
-# ==================== MAIN ====================
+def _format_stats(title, stats):
+    return f"{title}\n" + '\n'.join(f"  {key}: {value}" for key, value in stats.items())
 
-def main():
-    """Bot ishga tushirish"""
-    db.init_db()
-    logger.info("Database initialized")
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/stats - bot ichki ko'rsatkichlari (faqat ADMIN_IDS)"""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
     
-    application = Application.builder().token(BOT_TOKEN).build()
+    sections = [
+        _format_stats("⚙️ Yangilanishlar", {'update_queue': context.application.update_queue.qsize(),
+                                            **context.application.update_processor.stats()}),
+        _format_stats("👥 User cache", user_cache.stats()),
+        _format_stats("📊 Snapshot cache", snapshot_cache.stats()),
+        _format_stats("🕒 Activity", activity.buffer.stats()),
+        _format_stats("📤 Outbox", outbox.stats()),
+    ]
+    if BOT_MODE == 'webhook':
+        import webhook
+        sections.append(_format_stats("🔗 Webhook", webhook.runner.stats()))
+    handlers = update_processor.metrics.stats()
+    if handlers:
+        sections.append("⏱ Handlerlar (p50 / p95 / max, ms)\n" + '\n'.join(
+            f"  {name}: {m['p50_ms']} / {m['p95_ms']} / {m['max_ms']} ({m['count']} ta, {m['errors']} xato)"
+            for name, m in sorted(handlers.items())))
+    await update.message.reply_text('\n\n'.join(sections))
+
+# ==================== MAIN ====================
+
+async def post_init(application: Application):
+    """Asinxron DB pool va chiquvchi xabarlar navbati bot event loop ichida ochiladi"""
+    await adb.init_pool()
+    await outbox.start(application.bot)
+    logger.info("Async database pool and outbox ready")
+
+async def post_shutdown(application: Application):
+    await outbox.stop()
+    await adb.close_pool()
+
+def build_application():
+    """Handlerlar ulangan Application (polling va webhook rejimlari uchun umumiy)"""
+    # Turli foydalanuvchilar parallel, bitta foydalanuvchi yangilanishlari ketma-ket
+    builder = Application.builder().token(BOT_TOKEN).post_init(post_init).post_shutdown(post_shutdown) \
+                         .concurrent_updates(UserOrderedUpdateProcessor())
+    if TELEGRAM_API_BASE_URL:
+        # Lokal Bot API stub (scripts/telegram_stub.py) yoki o'z Bot API serveri
+        builder = builder.base_url(f'{TELEGRAM_API_BASE_URL.rstrip("/")}/bot') \
+                         .base_file_url(f'{TELEGRAM_API_BASE_URL.rstrip("/")}/file/bot')
+    application = builder.build()
     
     # Conversation handler
     conv_handler = ConversationHandler(
-        entry_points=[CommandHandler('start', start)],
+        entry_points=[CommandHandler('start', timed(start))],
         states={
-            PHONE: [MessageHandler(filters.CONTACT, receive_phone)],
-            FULLNAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, receive_fullname)],
+            PHONE: [MessageHandler(filters.CONTACT, timed(receive_phone))],
+            FULLNAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, timed(receive_fullname))],
         },
-        fallbacks=[CommandHandler('cancel', cancel)],
+        fallbacks=[CommandHandler('cancel', timed(cancel))],
     )
     
-    # Handlerlar
+    # Handlerlar (timed - kechikish /stats uchun o'lchanadi)
+    application.add_handler(TypeHandler(Update, track_activity), group=-1)
     application.add_handler(conv_handler)
-    application.add_handler(CommandHandler('dashboard', dashboard))
-    application.add_handler(CommandHandler('animals', animals_list))
-    application.add_handler(CommandHandler('butchers', butchers_list))
-    application.add_handler(CommandHandler('language', language_change))
-    application.add_handler(CommandHandler('help', help_command))
+    application.add_handler(CommandHandler('dashboard', timed(dashboard)))
+    application.add_handler(CommandHandler('animals', timed(animals_list)))
+    application.add_handler(CommandHandler('butchers', timed(butchers_list)))
+    application.add_handler(CommandHandler('language', timed(language_change)))
+    application.add_handler(CommandHandler('help', timed(help_command)))
+    application.add_handler(CommandHandler('broadcast', timed(broadcast_command)))
+    application.add_handler(CommandHandler('stats', timed(stats_command)))
     
     # Callback
-    application.add_handler(CallbackQueryHandler(language_callback, pattern='^lang_'))
+    application.add_handler(CallbackQueryHandler(timed(language_callback), pattern='^lang_'))
+    application.add_handler(CallbackQueryHandler(timed(browse_callback), pattern=browser.CALLBACK_PATTERN))
     
     # Klaviatura
-    application.add_handler(MessageHandler(filters.Regex(r'^🏠'), dashboard))
-    application.add_handler(MessageHandler(filters.Regex(r'^🐄'), animals_list))
-    application.add_handler(MessageHandler(filters.Regex(r'^👤'), butchers_list))
-    application.add_handler(MessageHandler(filters.Regex(r'^🌐'), language_change))
-    application.add_handler(MessageHandler(filters.Regex(r'^(💰|🌾|💉|📊)'), dashboard))
+    application.add_handler(MessageHandler(filters.Regex(r'^🏠'), timed(dashboard)))
+    application.add_handler(MessageHandler(filters.Regex(r'^🐄'), timed(animals_list)))
+    application.add_handler(MessageHandler(filters.Regex(r'^👤'), timed(butchers_list)))
+    application.add_handler(MessageHandler(filters.Regex(r'^🌐'), timed(language_change)))
+    application.add_handler(MessageHandler(filters.Regex(r'^(💰|🌾|💉|📊)'), timed(dashboard)))
+    
+    # Fon vazifalari
+    reminders.schedule(application)
+    return application
+
+def main():
+    """Bot ishga tushirish (polling - lokal ishlab chiqish uchun; jadvallar: python migrate.py)"""
+    # Sxema faqat migrations/ da; bu yerda yaratilmaydi, faqat tekshiriladi
+    import migrate
+    waiting = migrate.pending()
+    if waiting:
+        logger.error("❌ %s ta migratsiya qo'llanmagan - avval: python migrate.py", len(waiting))
+        return
+    application = build_application()
     
     logger.info("=" * 60)
     logger.info("🤖 CHORVA FERMERI PRO BOT - NGROK BILAN")
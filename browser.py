@@ -0,0 +1,181 @@
+"""Botdagi hayvonlar va qassoblar ro'yxati: inline tugmalar bilan sahifalash.
+
+Har bir sahifa - bitta LIMIT li keyset so'rov (database_async.browse_animals / browse_butchers),
+sahifalar bitta xabarni tahrirlab almashtiriladi. Holat callback_data da (Telegram: 64 baytgacha):
+
+    hb|<amal>|<sahifa>|<jami>|<holat>|<cursor>|<tur>     hayvonlar
+    bb|<amal>|<sahifa>|<jami>|<cursor>                   qassoblar
+
+amal: n - keyingi sahifa, p - oldingi, r - filtr bilan birinchi sahifa, f - tur tanlash menyusi.
+cursor - sahifa chetidagi yozuvning created_date (mikrosekund) va id si, base36 da.
+jami - faqat arzon bo'lganda (user_stats yoki birinchi sahifadagi COUNT), aks holda bo'sh.
+"""
+from datetime import datetime, timedelta
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
+
+import database_async as adb
+import i18n
+
+PAGE_SIZE = 10
+MAX_CALLBACK_BYTES = 64
+MAX_TYPE_BYTES = 24   # bundan uzun tur nomlari filtr menyusida ko'rsatilmaydi
+ANIMALS_PREFIX = 'hb'
+BUTCHERS_PREFIX = 'bb'
+CALLBACK_PATTERN = rf'^({ANIMALS_PREFIX}|{BUTCHERS_PREFIX})\|'
+
+# callback_data dagi qisqa kod -> animals.status
+STATUSES = {'a': 'active', 's': 'sold', 'd': 'deceased'}
+STATUS_LABELS = {'': 'all', 'a': 'active', 's': 'sold', 'd': 'deceased'}
+
+WEBAPP_LABEL = "🌐 Barchasini ko'rish"
+
+_EPOCH = datetime(1970, 1, 1)
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# ==================== CALLBACK DATA ====================
+
+def _b36(number):
+    digits = []
+    while True:
+        number, rest = divmod(number, 36)
+        digits.append(_DIGITS[rest])
+        if not number:
+            return ''.join(reversed(digits))
+
+def encode_cursor(row):
+    micros = (row['created_date'] - _EPOCH) // timedelta(microseconds=1)
+    return f"{_b36(micros)}.{_b36(row['id'])}"
+
+def decode_cursor(value):
+    """ValueError - noto'g'ri cursor"""
+    micros, row_id = value.split('.')
+    return _EPOCH + timedelta(microseconds=int(micros, 36)), int(row_id, 36)
+
+def _data(*fields):
+    data = '|'.join('' if field is None else str(field) for field in fields)
+    if len(data.encode()) > MAX_CALLBACK_BYTES:
+        raise ValueError(f'callback_data {MAX_CALLBACK_BYTES} baytdan uzun: {data!r}')
+    return data
+
+def _fits(animal_type):
+    return len(animal_type.encode()) <= MAX_TYPE_BYTES
+
+def _button(text, *fields):
+    return InlineKeyboardButton(text, callback_data=_data(*fields))
+
+def _nav_row(page, has_prev, has_next, rows, fields):
+    """◀️ / ▶️ tugmalari; fields(amal, sahifa, cursor) -> callback_data maydonlari"""
+    row = []
+    if has_prev:
+        row.append(_button("◀️", *fields('p', page - 1, encode_cursor(rows[0]))))
+    if has_next:
+        row.append(_button("▶️", *fields('n', page + 1, encode_cursor(rows[-1]))))
+    return row
+
+# ==================== ANIMALS ====================
+
+async def animals_page(user_id, lang, webapp_url, action='r', page=1, total=None, status='', cursor=None,
+                       animal_type=None):
+    """(matn, klaviatura) - bitta sahifa yoki (action='f') tur tanlash menyusi"""
+    t = lambda key: i18n.t(lang, key)
+    if action == 'f':
+        return await _animal_types_menu(user_id, lang, status, animal_type)
+    if action == 'r':
+        page, cursor = 1, None
+        if not animal_type and status in ('', 'a'):
+            animals_total, animals_active = await adb.get_animal_counts(user_id)
+            total = animals_active if status else animals_total
+        else:
+            total = None
+
+    backward = action == 'p'
+    rows, more = await adb.browse_animals(user_id, PAGE_SIZE, animal_type, STATUSES.get(status), cursor, backward)
+    if not rows and action != 'r':
+        # Yozuvlar o'chirilgan bo'lishi mumkin - filtr bilan boshidan
+        return await animals_page(user_id, lang, webapp_url, 'r', status=status, animal_type=animal_type)
+    if backward:
+        has_prev, has_next = more, True
+        if not more:
+            page = 1
+    else:
+        has_prev, has_next = page > 1, more
+
+    filters = [value for value in (animal_type, STATUSES.get(status) and t(STATUS_LABELS[status])) if value]
+    parts = [f"🐄 {t('animals')}"]
+    if total is not None:
+        parts.append(f" ({total} ta)")
+    if filters:
+        parts.append(f" — {', '.join(filters)}")
+    parts.append(f"\n📄 {t('page')} {page}\n\n")
+    parts.append(i18n.render_animal_items(lang, rows) if rows else i18n.templates(lang)['no_data'])
+
+    keyboard = []
+    nav = _nav_row(page, has_prev, has_next, rows, lambda action, to_page, edge: (
+        ANIMALS_PREFIX, action, to_page, total, status, edge, animal_type))
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([
+        _button(("• " if code == status else '') + t(label), ANIMALS_PREFIX, 'r', 1, None, code, None, animal_type)
+        for code, label in STATUS_LABELS.items()
+    ])
+    keyboard.append([_button(f"🔎 {t('type')}: {animal_type or t('all')}",
+                             ANIMALS_PREFIX, 'f', page, total, status, None, animal_type)])
+    keyboard.append([InlineKeyboardButton(WEBAPP_LABEL, web_app=WebAppInfo(url=f"{webapp_url}&page=animals"))])
+    return ''.join(parts), InlineKeyboardMarkup(keyboard)
+
+async def _animal_types_menu(user_id, lang, status, current_type):
+    types = [row for row in await adb.get_animal_types(user_id) if _fits(row['type'])]
+    buttons = [
+        _button(("• " if row['type'] == current_type else '') + f"{row['type']} ({row['count']})",
+                ANIMALS_PREFIX, 'r', 1, None, status, None, row['type'])
+        for row in types
+    ]
+    keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+    keyboard.append([_button(("• " if not current_type else '') + i18n.t(lang, 'all'),
+                             ANIMALS_PREFIX, 'r', 1, None, status, None, None)])
+    return f"🔎 {i18n.t(lang, 'type')}:", InlineKeyboardMarkup(keyboard)
+
+# ==================== BUTCHERS ====================
+
+async def butchers_page(lang, webapp_url, action='r', page=1, total=None, cursor=None):
+    if action == 'r':
+        page, cursor = 1, None
+        total = await adb.count_rows('butchers', None)
+
+    backward = action == 'p'
+    rows, more = await adb.browse_butchers(PAGE_SIZE, cursor, backward)
+    if not rows and action != 'r':
+        return await butchers_page(lang, webapp_url)
+    if backward:
+        has_prev, has_next = more, True
+        if not more:
+            page = 1
+    else:
+        has_prev, has_next = page > 1, more
+
+    text = (f"👤 {i18n.t(lang, 'butchers')} ({total} ta)\n📄 {i18n.t(lang, 'page')} {page}\n\n"
+            + (i18n.render_butcher_items(rows) if rows else i18n.templates(lang)['no_data']))
+    keyboard = []
+    nav = _nav_row(page, has_prev, has_next, rows, lambda action, to_page, edge: (
+        BUTCHERS_PREFIX, action, to_page, total, edge))
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([InlineKeyboardButton(WEBAPP_LABEL, web_app=WebAppInfo(url=f"{webapp_url}&page=butchers"))])
+    return text, InlineKeyboardMarkup(keyboard)
+
+# ==================== CALLBACK ====================
+
+async def handle_callback(data, user_id, lang, webapp_url):
+    """callback_data -> (matn, klaviatura); ValueError - eskirgan yoki noto'g'ri ma'lumot"""
+    prefix, _, rest = data.partition('|')
+    if prefix == ANIMALS_PREFIX:
+        action, page, total, status, cursor, animal_type = rest.split('|', 5)
+        return await animals_page(
+            user_id, lang, webapp_url, action, int(page), int(total) if total else None,
+            status if status in STATUSES else '', decode_cursor(cursor) if cursor else None, animal_type or None)
+    if prefix == BUTCHERS_PREFIX:
+        action, page, total, cursor = rest.split('|', 3)
+        return await butchers_page(lang, webapp_url, action, int(page), int(total) if total else 0,
+                                   decode_cursor(cursor) if cursor else None)
+    raise ValueError(f"noma'lum callback: {data!r}")
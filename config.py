@@ -8,6 +8,22 @@ BOT_TOKEN = os.getenv('BOT_TOKEN')
 ADMIN_IDS = [int(id.strip()) for id in os.getenv('ADMIN_IDS', '').split(',') if id.strip()]
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+# Bot API manzili (bo'sh - api.telegram.org; test uchun scripts/telegram_stub.py)
+TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL', '')
+# polling - lokal ishlab chiqish (python bot.py), webhook - yangilanishlar web jarayonga keladi
+# (faqat bitta gunicorn worker, gunicorn.conf.py), boshqa qiymat (masalan off) - python app.py botsiz
+BOT_MODE = os.getenv('BOT_MODE', 'webhook' if WEBHOOK_URL else 'polling')
+WEBHOOK_PATH = '/telegram/webhook'
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', 1000))
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', 8))         # setWebhook max_connections
+# Bir vaqtda qayta ishlanadigan yangilanishlar (bitta foydalanuvchiniki doim ketma-ket)
+BOT_CONCURRENT_UPDATES = int(os.getenv('BOT_CONCURRENT_UPDATES', 16))
+
+# Vaksinatsiya eslatmalari
+REMINDER_INTERVAL = int(os.getenv('REMINDER_INTERVAL', 3600))      # sekund
+REMINDER_DAYS_AHEAD = int(os.getenv('REMINDER_DAYS_AHEAD', 1))     # necha kun oldin eslatish
+REMINDER_BATCH = int(os.getenv('REMINDER_BATCH', 500))
 PORT = int(os.getenv('PORT', 10000))
 
 # Database
@@ -101,6 +117,14 @@ TRANSLATIONS = {
         'next_date': 'Keyingi sana',
         'veterinarian': 'Veterinar',
         'cost': 'Narxi',
+        'reminder_title': '💉 Vaksinatsiya eslatmasi',
+        'reminder_overdue': "Muddati o'tgan",
+        'reminder_today': 'Bugun',
+        'reminder_upcoming': 'Yaqinlashmoqda',
+        'reminder_more': 'yana {count} ta',
+        'all': 'Hammasi',
+        'page': 'sahifa',
+        'filter': 'Filtr',
         
         # Finance
         'add_finance': 'Moliya qo\'shish',
@@ -215,6 +239,14 @@ TRANSLATIONS = {
         'next_date': 'Следующая дата',
         'veterinarian': 'Ветеринар',
         'cost': 'Стоимость',
+        'reminder_title': '💉 Напоминание о вакцинации',
+        'reminder_overdue': 'Просрочено',
+        'reminder_today': 'Сегодня',
+        'reminder_upcoming': 'Скоро',
+        'reminder_more': 'ещё {count}',
+        'all': 'Все',
+        'page': 'стр.',
+        'filter': 'Фильтр',
         
         # Finance
         'add_finance': 'Добавить финансы',
@@ -329,6 +361,14 @@ TRANSLATIONS = {
         'next_date': 'Next Date',
         'veterinarian': 'Veterinarian',
         'cost': 'Cost',
+        'reminder_title': '💉 Vaccination reminder',
+        'reminder_overdue': 'Overdue',
+        'reminder_today': 'Today',
+        'reminder_upcoming': 'Upcoming',
+        'reminder_more': '{count} more',
+        'all': 'All',
+        'page': 'page',
+        'filter': 'Filter',
         
         # Finance
         'add_finance': 'Add Finance',
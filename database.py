@@ -1,239 +1,736 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from datetime import datetime
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2 import extensions
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+import threading
+import base64
+import json
+import time
 import os
 
+from user_cache import cache as user_cache, is_missing
+from snapshot_cache import cache as snapshot_cache
+
 # Render'dagi Database URL'ni muhit o'zgaruvchisidan olish
 DATABASE_URL = os.environ.get('DATABASE_URL')
+DB_SSLMODE = os.environ.get('DB_SSLMODE', 'require')
+
+# Connection pool sozlamalari
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))         # bo'sh ulanishni kutish (sekund)
+DB_POOL_RECYCLE = float(os.environ.get('DB_POOL_RECYCLE', 1800))       # ulanishning maksimal yoshi (sekund)
+DB_POOL_PING_AFTER = float(os.environ.get('DB_POOL_PING_AFTER', 30))   # shuncha bo'sh turgan ulanish tekshiriladi
 
 def get_db_connection():
-    """PostgreSQL bazasiga ulanish yaratish"""
-    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor, sslmode='require')
+    """PostgreSQL bazasiga yangi ulanish yaratish (pool ichida ishlatiladi)"""
+    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor, sslmode=DB_SSLMODE)
     return conn
 
-def init_db():
-    """Database jadvallarini yaratish"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            telegram_id BIGINT UNIQUE NOT NULL,
-            username TEXT,
-            first_name TEXT,
-            last_name TEXT,
-            phone TEXT,
-            full_name TEXT,
-            language TEXT DEFAULT 'uz',
-            registered_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Animals table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS animals (
-            id SERIAL PRIMARY KEY,
-            user_id BIGINT NOT NULL,
-            type TEXT NOT NULL,
-            breed TEXT,
-            gender TEXT,
-            birth_date TEXT,
-            weight REAL,
-            purchase_price REAL NOT NULL,
-            purchase_date TEXT NOT NULL,
-            status TEXT DEFAULT 'active',
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(telegram_id)
-        )
-    ''')
-    
-    # Butchers table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS butchers (
-            id SERIAL PRIMARY KEY,
-            name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            address TEXT,
-            experience INTEGER,
-            notes TEXT,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Sales table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sales (
-            id SERIAL PRIMARY KEY,
-            user_id BIGINT NOT NULL,
-            animal_id INTEGER NOT NULL,
-            butcher_id INTEGER,
-            sale_date TEXT NOT NULL,
-            sale_price REAL NOT NULL,
-            buyer_name TEXT,
-            buyer_phone TEXT,
-            payment_type TEXT DEFAULT 'cash',
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(telegram_id),
-            FOREIGN KEY (animal_id) REFERENCES animals(id) ON DELETE CASCADE,
-            FOREIGN KEY (butcher_id) REFERENCES butchers(id) ON DELETE SET NULL
-        )
-    ''')
-    
-    # Feed table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feed (
-            id SERIAL PRIMARY KEY,
-            user_id BIGINT NOT NULL,
-            name TEXT NOT NULL,
-            quantity REAL NOT NULL,
-            unit_price REAL NOT NULL,
-            supplier TEXT,
-            feed_date TEXT NOT NULL,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(telegram_id)
-        )
-    ''')
-    
-    # Vaccinations table
+# ==================== CONNECTION POOL ====================
+
+class PoolTimeout(Exception):
+    """Belgilangan vaqt ichida bo'sh ulanish topilmadi"""
+
+class ConnectionPool:
+    """Thread-safe ulanishlar pooli.
+
+    Har bir so'rov uchun yangi TLS ulanish ochish o'rniga tayyor ulanishlar
+    qayta ishlatiladi. Gunicorn workerlari fork qilinganda pool PID bo'yicha
+    qaytadan yaratiladi, bot thread va web threadlar bitta pooldan foydalanadi.
+    """
+
+    def __init__(self, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+                 recycle=DB_POOL_RECYCLE, ping_after=DB_POOL_PING_AFTER, connect=get_db_connection):
+        self.minconn = minconn
+        self.maxconn = max(maxconn, 1)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._connect = connect
+        self._cond = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = []       # [(conn, oxirgi_ishlatilgan_vaqt)] - LIFO
+        self._created = {}    # conn -> yaratilgan vaqt
+        self._size = 0
+        self._warmed = False
+
+    def _check_fork(self):
+        # Fork qilingan jarayonda ota jarayon ulanishlarini yopmaymiz (ular unga tegishli),
+        # shunchaki unutib, yangi pool boshlaymiz
+        if self._pid != os.getpid():
+            with self._cond:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def _new_conn(self):
+        conn = self._connect()
+        conn.autocommit = True
+        self._created[conn] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._created.pop(conn, None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, last_used):
+        now = time.monotonic()
+        if conn.closed or now - self._created.get(conn, now) > self.recycle:
+            return False
+        if now - last_used > self.ping_after:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except Exception:
+                return False
+        return True
+
+    def _warm_up(self):
+        # Tekshiruv va joy band qilish lock ostida: parallel birinchi so'rovlar
+        # ikki marta isitib, maxconn dan oshib ketmasin
+        with self._cond:
+            if self._warmed:
+                return
+            self._warmed = True
+            reserved = max(0, min(self.minconn, self.maxconn) - self._size)
+            self._size += reserved
+        for opened in range(reserved):
+            try:
+                conn = self._new_conn()
+            except Exception:
+                with self._cond:
+                    self._size -= reserved - opened
+                    self._cond.notify_all()
+                break
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self):
+        """Pooldan ulanish olish; timeout o'tsa PoolTimeout"""
+        self._check_fork()
+        if not self._warmed:
+            self._warm_up()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f'{self.timeout}s ichida bo\'sh ulanish topilmadi')
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                try:
+                    return self._new_conn()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            conn, last_used = entry
+            if self._is_healthy(conn, last_used):
+                return conn
+            # Eskirgan yoki uzilgan ulanish - o'rniga yangisini ochamiz
+            self._discard(conn)
+            try:
+                return self._new_conn()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+    def putconn(self, conn, discard=False):
+        """Ulanishni poolga qaytarish"""
+        if conn not in self._created:
+            # Fork'dan oldingi yoki begona ulanish
+            return
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                conn.autocommit = True
+            except Exception:
+                discard = True
+        if discard or conn.closed:
+            self._discard(conn)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Barcha bo'sh ulanishlarni yopish (shutdown uchun)"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {'size': self._size, 'idle': len(self._idle), 'max': self.maxconn}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Jarayon bo'yicha yagona pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+@contextmanager
+def get_cursor():
+    """O'qish uchun cursor (autocommit, bitta round trip); read_snapshot() ichida - uning cursori"""
+    cursor = getattr(_snapshot, 'cursor', None)
+    if cursor is not None:
+        yield cursor
+        return
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = False
+    try:
+        with conn.cursor() as cursor:
+            yield cursor
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        raise
+    finally:
+        pool.putconn(conn, discard=discard)
+
+_snapshot = threading.local()
+
+@contextmanager
+def read_snapshot():
+    """Bir nechta getter uchun bitta ulanish va bitta REPEATABLE READ READ ONLY tranzaksiya.
+
+    Ichida chaqirilgan get_cursor() shu cursorni beradi - barcha ro'yxatlar bir vaqt nuqtasidan o'qiladi.
+    """
+    if getattr(_snapshot, 'cursor', None) is not None:
+        yield _snapshot.cursor
+        return
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = False
+    try:
+        with conn.cursor() as cursor:
+            # Ulanish autocommit da: BEGIN qo'lda, psycopg2 alohida BEGIN / SET TRANSACTION yubormaydi
+            cursor.execute('BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            _snapshot.cursor = cursor
+            try:
+                yield cursor
+            except Exception:
+                if not conn.closed:
+                    cursor.execute('ROLLBACK')
+                raise
+            finally:
+                _snapshot.cursor = None
+            cursor.execute('COMMIT')
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        raise
+    finally:
+        pool.putconn(conn, discard=discard)
+
+@contextmanager
+def transaction():
+    """Yozish uchun cursor: bitta tranzaksiya, xatoda rollback"""
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = False
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cursor:
+            yield cursor
+        conn.commit()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        raise
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, discard=discard)
+
+# ==================== VALIDATION ====================
+
+class ValidationError(ValueError):
+    """Kiritilgan qiymat noto'g'ri (API 400 qaytaradi)"""
+
+# Yaxlitlash SQL ROUND / NUMERIC(14, 2) bilan bir xil (half-up) - importer va qo'lda kiritish bir summa beradi
+MONEY_QUANT = Decimal('0.01')
+
+def parse_date(value, field='date', required=True):
+    """'YYYY-MM-DD' (yoki date/datetime) -> date"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValidationError(f"{field}: sana kiritilmagan")
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise ValidationError(f"{field}: noto'g'ri sana {value!r} (YYYY-MM-DD kutilgan)")
+
+def parse_decimal(value, field='value', required=True, places=None):
+    """Raqam (str/int/float/Decimal, '1,000,000' ham) -> musbat Decimal"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValidationError(f"{field}: qiymat kiritilmagan")
+        return None
+    try:
+        number = Decimal(str(value).replace(',', '').strip())
+    except InvalidOperation:
+        raise ValidationError(f"{field}: raqam emas {value!r}")
+    if not number.is_finite() or number < 0:
+        raise ValidationError(f"{field}: noto'g'ri qiymat {value!r}")
+    return number.quantize(places, rounding=ROUND_HALF_UP) if places is not None else number
+
+def parse_money(value, field='amount', required=True):
+    """Pul summasi -> Decimal (2 xona)"""
+    return parse_decimal(value, field, required, places=MONEY_QUANT)
+
+class BulkValidationError(ValidationError):
+    """Bir nechta qatordagi xatolar: [{'index': i, 'error': '...'}]"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} ta qatorda xato")
+
+# ==================== PAGINATION ====================
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Resurs -> (jadval, tartib ustuni). Tartib har doim (ustun DESC, id DESC) - indekslar bilan bir xil.
+SORT_KEYS = {
+    'animals': ('animals', 'created_date'),
+    'finance': ('finance', 'date'),
+    'feed': ('feed', 'feed_date'),
+    'vaccinations': ('vaccinations', 'vaccination_date'),
+    'sales': ('sales', 'sale_date'),
+    'butchers': ('butchers', 'created_date'),
+}
+
+def encode_cursor(sort_value, row_id):
+    """(tartib qiymati, id) -> shaffof cursor satri"""
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise ValidationError("after: noto'g'ri cursor")
+
+MAX_ROW_ID = 2 ** 31 - 1   # SERIAL
+
+def _cursor_values(sort_column, after):
+    """Cursor qiymatlari ustun turiga mos (created_date - TIMESTAMP, qolganlari - DATE);
+    qo'lda yasalgan cursor SQL gacha yetib 500 bermasligi uchun"""
+    sort_value, row_id = decode_cursor(after)
+    parse = datetime.fromisoformat if sort_column.rsplit('.', 1)[-1] == 'created_date' else date.fromisoformat
+    if not isinstance(sort_value, str) or not 0 < row_id <= MAX_ROW_ID:
+        raise ValidationError("after: noto'g'ri cursor")
+    try:
+        return parse(sort_value), row_id
+    except ValueError:
+        raise ValidationError("after: noto'g'ri cursor")
+
+def _keyset(sort_column, id_column, after, limit):
+    """Getterlar uchun qo'shimcha WHERE sharti va LIMIT"""
+    condition, params = '', []
+    if after:
+        sort_value, row_id = _cursor_values(sort_column, after)
+        condition = f'AND ({sort_column}, {id_column}) < (%s, %s)'
+        params = [sort_value, row_id]
+    limit_sql = ''
+    if limit:
+        limit_sql = 'LIMIT %s'
+        params.append(int(limit))
+    return condition, limit_sql, params
+
+def paginate(rows, limit, resource):
+    """limit+1 qator olingan ro'yxatdan (sahifa, keyingi cursor) qaytarish"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    sort_column = SORT_KEYS[resource][1]
+    return page, encode_cursor(page[-1][sort_column], page[-1]['id'])
+
+# ?fields= / bootstrap proyeksiyasi uchun ruxsat etilgan maydonlar (getterlar qaytaradigan ustunlar)
+RESOURCE_FIELDS = {
+    'animals': ('id', 'type', 'breed', 'gender', 'birth_date', 'weight', 'purchase_price', 'purchase_date',
+                'status', 'created_date'),
+    'finance': ('id', 'type', 'amount', 'category', 'description', 'date', 'created_date'),
+    'feed': ('id', 'name', 'quantity', 'unit_price', 'supplier', 'feed_date', 'created_date'),
+    'vaccinations': ('id', 'animal_id', 'vaccine_name', 'vaccination_date', 'next_date', 'veterinarian', 'cost',
+                     'reminder_sent', 'created_date', 'animal_type', 'breed'),
+    'sales': ('id', 'animal_id', 'butcher_id', 'sale_date', 'sale_price', 'buyer_name', 'buyer_phone',
+              'payment_type', 'created_date', 'animal_type', 'breed', 'butcher_name', 'purchase_price', 'profit'),
+    'butchers': ('id', 'name', 'phone', 'address', 'experience', 'notes', 'created_date'),
+}
+
+def parse_fields(resource, value):
+    """'id,type,breed' -> maydonlar tuple (RESOURCE_FIELDS bo'yicha); bo'sh bo'lsa None - barcha ustunlar"""
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in RESOURCE_FIELDS[resource]]
+    if unknown:
+        raise ValidationError(f"fields: {', '.join(unknown)} ({resource}: {', '.join(RESOURCE_FIELDS[resource])})")
+    return fields
+
+def project(rows, fields):
+    """Faqat so'ralgan maydonlar (fields=None - o'zgarishsiz)"""
+    if fields is None:
+        return rows
+    return [{field: row[field] for field in fields} for row in rows]
+
+def count_rows(resource, user_id):
+    """Foydalanuvchi yozuvlari soni (user_id indeksidan index-only scan)"""
+    table = SORT_KEYS[resource][0]
+    with get_cursor() as cursor:
+        if table == 'butchers':
+            cursor.execute('SELECT COUNT(*) AS total FROM butchers')
+        elif table == 'animals':
+            # user_stats da tayyor turadi
+            cursor.execute('SELECT animals_total AS total FROM user_stats WHERE user_id = %s', (user_id,))
+            row = cursor.fetchone()
+            return row['total'] if row else 0
+        else:
+            cursor.execute(f'SELECT COUNT(*) AS total FROM {table} WHERE user_id = %s', (user_id,))
+        return cursor.fetchone()['total']
+
+# user_stats ni noldan hisoblash (backfill va reconcile uchun)
+USER_STATS_SQL = '''
+    SELECT u.telegram_id AS user_id,
+           COALESCE(f.income, 0) AS income, COALESCE(f.expense, 0) AS expense,
+           COALESCE(a.total, 0) AS animals_total, COALESCE(a.active, 0) AS animals_active
+    FROM users u
+    LEFT JOIN LATERAL (
+        SELECT SUM(amount) FILTER (WHERE type = 'income') AS income,
+               SUM(amount) FILTER (WHERE type = 'expense') AS expense
+        FROM finance WHERE user_id = u.telegram_id
+    ) f ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE status = 'active') AS active
+        FROM animals WHERE user_id = u.telegram_id
+    ) a ON TRUE
+    {filter}
+'''
+
+# ==================== USER STATS ====================
+
+def _bump_stats(cursor, user_id, income=0, expense=0, total=0, active=0):
+    """user_stats ni joriy tranzaksiya ichida o'zgartirish (delta)"""
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS vaccinations (
-            id SERIAL PRIMARY KEY,
-            user_id BIGINT NOT NULL,
-            animal_id INTEGER NOT NULL,
-            vaccine_name TEXT NOT NULL,
-            vaccination_date TEXT NOT NULL,
-            next_date TEXT,
-            veterinarian TEXT,
-            cost REAL,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(telegram_id),
-            FOREIGN KEY (animal_id) REFERENCES animals(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Finance table
+        INSERT INTO user_stats (user_id, income, expense, animals_total, animals_active)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (user_id) DO UPDATE SET
+            income = user_stats.income + EXCLUDED.income,
+            expense = user_stats.expense + EXCLUDED.expense,
+            animals_total = user_stats.animals_total + EXCLUDED.animals_total,
+            animals_active = user_stats.animals_active + EXCLUDED.animals_active,
+            updated_at = CURRENT_TIMESTAMP
+    ''', (user_id, income, expense, total, active))
+
+def _bump_finance_rows(cursor, user_id, rows, sign=1):
+    """O'chirilgan/qo'shilgan finance qatorlari (type, amount) bo'yicha delta"""
+    income = sum(r['amount'] for r in rows if r['type'] == 'income')
+    expense = sum(r['amount'] for r in rows if r['type'] == 'expense')
+    if income or expense:
+        _bump_stats(cursor, user_id, income=sign * income, expense=sign * expense)
+
+def rebuild_user_stats(user_id=None):
+    """user_stats ni noldan qayta hisoblash; farq qilgan qatorlar ro'yxatini qaytaradi"""
+    fields = ('income', 'expense', 'animals_total', 'animals_active')
+    with transaction() as cursor:
+        if user_id is None:
+            cursor.execute('LOCK TABLE user_stats IN SHARE ROW EXCLUSIVE MODE')
+            cursor.execute(USER_STATS_SQL.format(filter=''))
+        else:
+            cursor.execute('SELECT 1 FROM user_stats WHERE user_id = %s FOR UPDATE', (user_id,))
+            cursor.execute(USER_STATS_SQL.format(filter='WHERE u.telegram_id = %s'), (user_id,))
+        expected = {row['user_id']: row for row in cursor.fetchall()}
+        if user_id is None:
+            cursor.execute('SELECT * FROM user_stats')
+        else:
+            cursor.execute('SELECT * FROM user_stats WHERE user_id = %s', (user_id,))
+        stored = {row['user_id']: row for row in cursor.fetchall()}
+
+        drift = []
+        for uid, row in expected.items():
+            current = stored.get(uid)
+            diff = {f: (current[f] if current else None, row[f]) for f in fields
+                    if current is None or current[f] != row[f]}
+            if diff:
+                drift.append({'user_id': uid, 'diff': diff})
+                cursor.execute('''
+                    INSERT INTO user_stats (user_id, income, expense, animals_total, animals_active)
+                    VALUES (%(user_id)s, %(income)s, %(expense)s, %(animals_total)s, %(animals_active)s)
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        income = EXCLUDED.income, expense = EXCLUDED.expense,
+                        animals_total = EXCLUDED.animals_total, animals_active = EXCLUDED.animals_active,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', dict(row))
+                _bump_versions(cursor, uid, 'stats')
+    for item in drift:
+        snapshot_cache.invalidate(item['user_id'])
+    return drift
+
+# ==================== DATA VERSIONS ====================
+
+# Umumiy (foydalanuvchiga bog'liq bo'lmagan) resurslar shu user_id ostida saqlanadi
+SHARED_USER = 0
+SHARED_RESOURCES = ('butchers',)
+USER_RESOURCES = ('animals', 'sales', 'feed', 'vaccinations', 'finance', 'stats')
+
+# GET javobi qaysi resurslarga tayanadi (JOIN lar): ulardan biri o'zgarsa ETag ham o'zgaradi
+VERSION_DEPENDENCIES = {
+    'animals': ('animals',),
+    'butchers': ('butchers',),
+    'sales': ('sales', 'animals', 'butchers'),
+    'feed': ('feed',),
+    'vaccinations': ('vaccinations', 'animals'),
+    'finance': ('finance',),
+    # user_stats yig'indilari finance bilan birga o'zgaradi; 'stats' - faqat rebuild_user_stats tuzatganda
+    'finance_stats': ('finance', 'stats'),
+}
+
+def _bump_versions(cursor, user_id, *resources):
+    """Resurs versiyalarini joriy tranzaksiya ichida yangilash (user_data_version_seq dan yangi qiymat)"""
+    # Takroriy resurs (masalan, importer: kind='finance' + 'finance') ON CONFLICT DO UPDATE da
+    # bitta qatorni ikki marta o'zgartiradi - CardinalityViolation
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS finance (
-            id SERIAL PRIMARY KEY,
-            user_id BIGINT NOT NULL,
-            type TEXT NOT NULL,
-            amount REAL NOT NULL,
-            category TEXT NOT NULL,
-            description TEXT,
-            date TEXT NOT NULL,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(telegram_id)
-        )
-    ''')
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
+        INSERT INTO user_data_versions (user_id, resource, version)
+        SELECT %s, resource, nextval('user_data_version_seq') FROM unnest(%s::text[]) AS resource
+        ON CONFLICT (user_id, resource) DO UPDATE SET version = EXCLUDED.version
+    ''', (user_id, list(dict.fromkeys(resources))))
+
+def get_data_version(user_id, *resources):
+    """GET javobi versiyasi - bog'liq resurslarning eng katta versiyasi (primary key bo'yicha)"""
+    depends = {dependency for resource in resources for dependency in VERSION_DEPENDENCIES[resource]}
+    with get_cursor() as cursor:
+        cursor.execute('''
+            SELECT COALESCE(MAX(version), 0) AS version FROM user_data_versions
+            WHERE user_id = ANY(%s) AND resource = ANY(%s)
+        ''', ([user_id or SHARED_USER, SHARED_USER], sorted(depends)))
+        return cursor.fetchone()['version']
 
 # ==================== USERS ====================
 
 def get_user(telegram_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM users WHERE telegram_id = %s', (telegram_id,))
-    user = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return dict(user) if user else None
+    """users qatori (user_cache orqali; topilmasa None)"""
+    user = user_cache.get(telegram_id)
+    if not is_missing(user):
+        return user
+    token = user_cache.loading(telegram_id)
+    with get_cursor() as cursor:
+        cursor.execute('SELECT * FROM users WHERE telegram_id = %s', (telegram_id,))
+        user = cursor.fetchone()
+    user = dict(user) if user else None
+    user_cache.set(telegram_id, user, token)
+    return user
 
 def add_user(telegram_id, username, first_name, last_name, phone, full_name, language='uz'):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO users (telegram_id, username, first_name, last_name, phone, full_name, language)
-        VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
-    ''', (telegram_id, username, first_name, last_name, phone, full_name, language))
-    user_id = cursor.fetchone()['id']
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO users (telegram_id, username, first_name, last_name, phone, full_name, language)
+            VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
+        ''', (telegram_id, username, first_name, last_name, phone, full_name, language))
+        user_id = cursor.fetchone()['id']
+        _bump_stats(cursor, telegram_id)
+    user_cache.invalidate(telegram_id)
+    snapshot_cache.invalidate(telegram_id)
     return user_id
 
 def update_user_language(telegram_id, language):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('UPDATE users SET language = %s WHERE telegram_id = %s', (language, telegram_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-def update_user_last_active(telegram_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('UPDATE users SET last_active = CURRENT_TIMESTAMP WHERE telegram_id = %s', (telegram_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with get_cursor() as cursor:
+        cursor.execute('UPDATE users SET language = %s WHERE telegram_id = %s', (language, telegram_id))
+    user_cache.invalidate(telegram_id)
+    snapshot_cache.invalidate(telegram_id)
+
+def update_users_last_active(items):
+    """[(telegram_id, unix vaqt), ...] -> bitta UPDATE (activity.ActivityBuffer uchun)"""
+    with get_cursor() as cursor:
+        execute_values(cursor, '''
+            UPDATE users u SET last_active = v.ts
+            FROM (VALUES %s) AS v(telegram_id, ts)
+            WHERE u.telegram_id = v.telegram_id AND (u.last_active IS NULL OR u.last_active < v.ts)
+        ''', items, template='(%s::bigint, to_timestamp(%s)::timestamp)', page_size=len(items) or 1)
+        return cursor.rowcount
 
 # ==================== ANIMALS ====================
 
-def get_animals(user_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM animals WHERE user_id = %s ORDER BY created_date DESC', (user_id,))
-    animals = cursor.fetchall()
-    cursor.close()
-    conn.close()
+def get_animals(user_id, limit=None, after=None):
+    keyset, limit_sql, params = _keyset('created_date', 'id', after, limit)
+    with get_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT * FROM animals WHERE user_id = %s {keyset}
+            ORDER BY created_date DESC, id DESC {limit_sql}
+        ''', (user_id, *params))
+        animals = cursor.fetchall()
     return [dict(animal) for animal in animals]
 
 def get_animal(animal_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM animals WHERE id = %s', (animal_id,))
-    animal = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    with get_cursor() as cursor:
+        cursor.execute('SELECT * FROM animals WHERE id = %s', (animal_id,))
+        animal = cursor.fetchone()
     return dict(animal) if animal else None
 
 def add_animal(user_id, animal_type, breed, gender, birth_date, weight, purchase_price, purchase_date):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO animals (user_id, type, breed, gender, birth_date, weight, purchase_price, purchase_date)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
-    ''', (user_id, animal_type, breed, gender, birth_date, weight, purchase_price, purchase_date))
-    animal_id = cursor.fetchone()['id']
-    
-    cursor.execute('''
-        INSERT INTO finance (user_id, type, amount, category, description, date)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    ''', (user_id, 'expense', purchase_price, 'animal_purchase', f'{animal_type} - {breed}', purchase_date))
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
+    birth_date = parse_date(birth_date, 'birth_date', required=False)
+    weight = parse_decimal(weight, 'weight', required=False)
+    purchase_price = parse_money(purchase_price, 'purchase_price')
+    purchase_date = parse_date(purchase_date, 'purchase_date')
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO animals (user_id, type, breed, gender, birth_date, weight, purchase_price, purchase_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
+        ''', (user_id, animal_type, breed, gender, birth_date, weight, purchase_price, purchase_date))
+        animal_id = cursor.fetchone()['id']
+        
+        cursor.execute('''
+            INSERT INTO finance (user_id, type, amount, category, description, date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        ''', (user_id, 'expense', purchase_price, 'animal_purchase', f'{animal_type} - {breed}', purchase_date))
+        _bump_stats(cursor, user_id, expense=purchase_price, total=1, active=1)
+        _bump_versions(cursor, user_id, 'animals', 'finance')
+    snapshot_cache.invalidate(user_id)
     return animal_id
 
+MAX_BULK_ANIMALS = 1000
+
+def _normalize_animal(data):
+    """Bitta hayvon yozuvini tekshirish va DB turlariga o'tkazish"""
+    if not isinstance(data, dict):
+        raise ValidationError("qator obyekt (dict) bo'lishi kerak")
+    animal_type = (data.get('type') or '').strip()
+    if not animal_type:
+        raise ValidationError("type: turi kiritilmagan")
+    return {
+        'type': animal_type,
+        'breed': data.get('breed'),
+        'gender': data.get('gender'),
+        'birth_date': parse_date(data.get('birth_date'), 'birth_date', required=False),
+        'weight': parse_decimal(data.get('weight'), 'weight', required=False),
+        'purchase_price': parse_money(data.get('purchase_price'), 'purchase_price'),
+        'purchase_date': parse_date(data.get('purchase_date'), 'purchase_date'),
+    }
+
+def add_animals_bulk(user_id, animals):
+    """Hayvonlar partiyasini bitta tranzaksiyada qo'shish (multi-row INSERT).
+
+    Avval barcha qatorlar tekshiriladi; xato bo'lsa hech narsa yozilmaydi va
+    BulkValidationError barcha xatolar bilan ko'tariladi. Yangi id lar
+    kiritilgan tartibda qaytadi.
+    """
+    if not animals:
+        raise ValidationError("animals: bo'sh ro'yxat")
+    if len(animals) > MAX_BULK_ANIMALS:
+        raise ValidationError(f"animals: bir partiyada ko'pi bilan {MAX_BULK_ANIMALS} ta")
+
+    rows, errors = [], []
+    for index, data in enumerate(animals):
+        try:
+            rows.append(_normalize_animal(data))
+        except ValidationError as e:
+            errors.append({'index': index, 'error': str(e)})
+    if errors:
+        raise BulkValidationError(errors)
+
+    with transaction() as cursor:
+        inserted = execute_values(cursor, '''
+            INSERT INTO animals (user_id, type, breed, gender, birth_date, weight, purchase_price, purchase_date)
+            VALUES %s RETURNING id
+        ''', [(user_id, r['type'], r['breed'], r['gender'], r['birth_date'], r['weight'],
+               r['purchase_price'], r['purchase_date']) for r in rows],
+            page_size=len(rows), fetch=True)
+        ids = [row['id'] for row in inserted]
+
+        execute_values(cursor, '''
+            INSERT INTO finance (user_id, type, amount, category, description, date)
+            VALUES %s
+        ''', [(user_id, 'expense', r['purchase_price'], 'animal_purchase', f"{r['type']} - {r['breed']}",
+               r['purchase_date']) for r in rows], page_size=len(rows))
+
+        total_price = sum(r['purchase_price'] for r in rows)
+        _bump_stats(cursor, user_id, expense=total_price, total=len(rows), active=len(rows))
+        _bump_versions(cursor, user_id, 'animals', 'finance')
+    snapshot_cache.invalidate(user_id)
+    return ids
+
+ANIMAL_FIELDS = {
+    'type': None,
+    'breed': None,
+    'gender': None,
+    'status': None,
+    'birth_date': lambda v: parse_date(v, 'birth_date', required=False),
+    'weight': lambda v: parse_decimal(v, 'weight', required=False),
+    'purchase_price': lambda v: parse_money(v, 'purchase_price'),
+    'purchase_date': lambda v: parse_date(v, 'purchase_date'),
+}
+
 def update_animal(animal_id, data):
-    conn = get_db_connection()
-    cursor = conn.cursor()
     fields = []
     values = []
     for key, value in data.items():
+        if key not in ANIMAL_FIELDS:
+            raise ValidationError(f"{key}: noma'lum maydon")
+        convert = ANIMAL_FIELDS[key]
         fields.append(f"{key} = %s")
-        values.append(value)
+        values.append(convert(value) if convert else value)
     
     if fields:
         values.append(animal_id)
-        query = f"UPDATE animals SET {', '.join(fields)} WHERE id = %s"
-        cursor.execute(query, values)
-        conn.commit()
-    cursor.close()
-    conn.close()
+        with transaction() as cursor:
+            # Holat o'zgarsa faol hayvonlar soni ham o'zgaradi
+            cursor.execute('SELECT user_id, status FROM animals WHERE id = %s FOR UPDATE', (animal_id,))
+            old = cursor.fetchone()
+            cursor.execute(f"UPDATE animals SET {', '.join(fields)} WHERE id = %s RETURNING status", values)
+            new = cursor.fetchone()
+            if old and new and (old['status'] == 'active') != (new['status'] == 'active'):
+                _bump_stats(cursor, old['user_id'], active=1 if new['status'] == 'active' else -1)
+            if old:
+                _bump_versions(cursor, old['user_id'], 'animals')
+        if old:
+            snapshot_cache.invalidate(old['user_id'])
 
 def delete_animal(animal_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute('SELECT user_id, type, breed, purchase_price FROM animals WHERE id = %s', (animal_id,))
+    with transaction() as cursor:
+        cursor.execute('SELECT user_id, type, breed, purchase_price, status FROM animals WHERE id = %s FOR UPDATE', (animal_id,))
         animal = cursor.fetchone()
         if animal:
             desc_pattern = f"%{animal['type']} - {animal['breed']}%"
@@ -241,299 +738,504 @@ def delete_animal(animal_id):
                 DELETE FROM finance 
                 WHERE user_id = %s AND amount = %s AND category = 'animal_purchase' 
                 AND description LIKE %s
+                RETURNING type, amount
             ''', (animal['user_id'], animal['purchase_price'], desc_pattern))
+            _bump_finance_rows(cursor, animal['user_id'], cursor.fetchall(), sign=-1)
+            _bump_stats(cursor, animal['user_id'], total=-1, active=-1 if animal['status'] == 'active' else 0)
+            # sales/vaccinations qatorlari CASCADE bilan o'chadi
+            _bump_versions(cursor, animal['user_id'], 'animals', 'finance', 'sales', 'vaccinations')
 
         cursor.execute('DELETE FROM animals WHERE id = %s', (animal_id,))
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    if animal:
+        snapshot_cache.invalidate(animal['user_id'])
 
 def get_animals_stats(user_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) as total FROM animals WHERE user_id = %s', (user_id,))
-    total = cursor.fetchone()['total']
-    cursor.execute("SELECT COUNT(*) as active FROM animals WHERE user_id = %s AND status = 'active'", (user_id,))
-    active = cursor.fetchone()['active']
-    cursor.close()
-    conn.close()
-    return {'total': total, 'active': active}
+    return get_dashboard_snapshot(user_id)['animals']
 
 # ==================== BUTCHERS ====================
 
-def get_butchers(search=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def get_butchers(search=None, limit=None, after=None):
+    keyset, limit_sql, params = _keyset('created_date', 'id', after, limit)
+    where = 'WHERE TRUE'
     if search:
         pattern = f'%{search}%'
-        cursor.execute('SELECT * FROM butchers WHERE name LIKE %s OR phone LIKE %s ORDER BY created_date DESC', (pattern, pattern))
-    else:
-        cursor.execute('SELECT * FROM butchers ORDER BY created_date DESC')
-    butchers = cursor.fetchall()
-    cursor.close()
-    conn.close()
+        where = 'WHERE (name LIKE %s OR phone LIKE %s)'
+        params = [pattern, pattern, *params]
+    with get_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT * FROM butchers {where} {keyset}
+            ORDER BY created_date DESC, id DESC {limit_sql}
+        ''', params)
+        butchers = cursor.fetchall()
     return [dict(b) for b in butchers]
 
 def add_butcher(name, phone, address=None, experience=None, notes=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO butchers (name, phone, address, experience, notes)
-        VALUES (%s, %s, %s, %s, %s) RETURNING id
-    ''', (name, phone, address, experience, notes))
-    bid = cursor.fetchone()['id']
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO butchers (name, phone, address, experience, notes)
+            VALUES (%s, %s, %s, %s, %s) RETURNING id
+        ''', (name, phone, address, experience, notes))
+        bid = cursor.fetchone()['id']
+        _bump_versions(cursor, SHARED_USER, 'butchers')
     return bid
 
 def update_butcher(butcher_id, **kwargs):
-    conn = get_db_connection()
-    cursor = conn.cursor()
     fields = [f"{k} = %s" for k in kwargs.keys()]
     values = list(kwargs.values())
     values.append(butcher_id)
-    cursor.execute(f"UPDATE butchers SET {', '.join(fields)} WHERE id = %s", values)
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute(f"UPDATE butchers SET {', '.join(fields)} WHERE id = %s", values)
+        _bump_versions(cursor, SHARED_USER, 'butchers')
 
 def delete_butcher(butcher_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM butchers WHERE id = %s', (butcher_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute('DELETE FROM butchers WHERE id = %s', (butcher_id,))
+        _bump_versions(cursor, SHARED_USER, 'butchers')
 
 # ==================== SALES ====================
 
-def get_sales(user_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT s.*, a.type as animal_type, a.breed, b.name as butcher_name
-        FROM sales s
-        LEFT JOIN animals a ON s.animal_id = a.id
-        LEFT JOIN butchers b ON s.butcher_id = b.id
-        WHERE s.user_id = %s ORDER BY s.sale_date DESC
-    ''', (user_id,))
-    sales = cursor.fetchall()
-    cursor.close()
-    conn.close()
+def get_sales(user_id, limit=None, after=None):
+    keyset, limit_sql, params = _keyset('s.sale_date', 's.id', after, limit)
+    with get_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT s.*, a.type as animal_type, a.breed, b.name as butcher_name,
+                   a.purchase_price, s.sale_price - a.purchase_price AS profit
+            FROM sales s
+            LEFT JOIN animals a ON s.animal_id = a.id
+            LEFT JOIN butchers b ON s.butcher_id = b.id
+            WHERE s.user_id = %s {keyset}
+            ORDER BY s.sale_date DESC, s.id DESC {limit_sql}
+        ''', (user_id, *params))
+        sales = cursor.fetchall()
     return [dict(s) for s in sales]
 
 def add_sale(user_id, animal_id, butcher_id, sale_date, sale_price, buyer_name=None, buyer_phone=None, payment_type='cash'):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT purchase_price FROM animals WHERE id = %s', (animal_id,))
-    animal = cursor.fetchone()
-    if not animal:
-        return None
-    
-    cursor.execute('''
-        INSERT INTO sales (user_id, animal_id, butcher_id, sale_date, sale_price, buyer_name, buyer_phone, payment_type)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
-    ''', (user_id, animal_id, butcher_id, sale_date, sale_price, buyer_name, buyer_phone, payment_type))
-    sale_id = cursor.fetchone()['id']
-    
-    cursor.execute("UPDATE animals SET status = 'sold' WHERE id = %s", (animal_id,))
-    
-    profit = sale_price - animal['purchase_price']
-    cursor.execute('''
-        INSERT INTO finance (user_id, type, amount, category, description, date)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    ''', (user_id, 'income', sale_price, 'animal_sale', f'Sotuv (Foyda: {profit})', sale_date))
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
+    sale_date = parse_date(sale_date, 'sale_date')
+    sale_price = parse_money(sale_price, 'sale_price')
+    with transaction() as cursor:
+        cursor.execute('SELECT purchase_price, status FROM animals WHERE id = %s AND user_id = %s FOR UPDATE',
+                       (animal_id, user_id))
+        animal = cursor.fetchone()
+        if not animal:
+            return None
+        if animal['status'] != 'active':
+            raise ValidationError(f"animal_id: hayvon faol emas ({animal['status']}) - qayta sotib bo'lmaydi")
+        
+        cursor.execute('''
+            INSERT INTO sales (user_id, animal_id, butcher_id, sale_date, sale_price, buyer_name, buyer_phone, payment_type)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
+        ''', (user_id, animal_id, butcher_id, sale_date, sale_price, buyer_name, buyer_phone, payment_type))
+        sale_id = cursor.fetchone()['id']
+        
+        cursor.execute("UPDATE animals SET status = 'sold' WHERE id = %s", (animal_id,))
+        
+        profit = sale_price - animal['purchase_price']
+        cursor.execute('''
+            INSERT INTO finance (user_id, type, amount, category, description, date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        ''', (user_id, 'income', sale_price, 'animal_sale', f'Sotuv (Foyda: {profit})', sale_date))
+        _bump_stats(cursor, user_id, income=sale_price, active=-1)
+        _bump_versions(cursor, user_id, 'sales', 'animals', 'finance')
+    snapshot_cache.invalidate(user_id)
     return sale_id
 
-def delete_sale(sale_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT animal_id FROM sales WHERE id = %s', (sale_id,))
-    sale = cursor.fetchone()
-    if sale:
-        cursor.execute("UPDATE animals SET status = 'active' WHERE id = %s", (sale['animal_id'],))
-    cursor.execute('DELETE FROM sales WHERE id = %s', (sale_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+# Tahlil guruhlari: ?group= -> (kalit ifodasi, qo'shimcha JOIN)
+SALES_ANALYTICS_GROUPS = {
+    'type': ('a.type', ''),
+    'breed': ("COALESCE(a.breed, '')", ''),
+    'butcher': ("COALESCE(b.name, '')", 'LEFT JOIN butchers b ON b.id = s.butcher_id'),
+    'month': ("to_char(s.sale_date, 'YYYY-MM')", ''),
+}
+
+def get_sales_analytics(user_id, group='type', date_from=None, date_to=None):
+    """Sotuvlar foydasi guruh bo'yicha (foyda = sale_price - animals.purchase_price), SQL da hisoblanadi.
+
+    idx_sales_user_date_cover dan o'qiladi (sana oralig'i + kerakli ustunlar), animals - PK bo'yicha.
+    Javob: {'group', 'items': [{key, count, revenue, cost, profit}], 'total': {...}}
+    """
+    if group not in SALES_ANALYTICS_GROUPS:
+        raise ValidationError(f"group: {', '.join(SALES_ANALYTICS_GROUPS)}")
+    key, join = SALES_ANALYTICS_GROUPS[group]
+    order = 'key' if group == 'month' else 'profit DESC, key'   # oylar - xronologik
+    params = {
+        'user_id': user_id,
+        'date_from': parse_date(date_from, 'date_from', required=False),
+        'date_to': parse_date(date_to, 'date_to', required=False),
+    }
+    where = ''
+    if params['date_from']:
+        where += ' AND s.sale_date >= %(date_from)s'
+    if params['date_to']:
+        where += ' AND s.sale_date <= %(date_to)s'
+    with get_cursor() as cursor:
+        # GROUPING SETS: guruhlar va umumiy jami bitta o'tishda
+        cursor.execute(f'''
+            SELECT {key} AS key, GROUPING({key}) AS is_total, COUNT(*) AS count,
+                   COALESCE(SUM(s.sale_price), 0) AS revenue,
+                   COALESCE(SUM(a.purchase_price), 0) AS cost,
+                   COALESCE(SUM(s.sale_price - a.purchase_price), 0) AS profit
+            FROM sales s
+            JOIN animals a ON a.id = s.animal_id
+            {join}
+            WHERE s.user_id = %(user_id)s {where}
+            GROUP BY GROUPING SETS (({key}), ())
+            ORDER BY is_total, {order}
+        ''', params)
+        rows = cursor.fetchall()
+    items = [{k: row[k] for k in ('key', 'count', 'revenue', 'cost', 'profit')} for row in rows if not row['is_total']]
+    total = next((row for row in rows if row['is_total']), None)
+    return {
+        'group': group,
+        'items': items,
+        'total': {k: total[k] if total else 0 for k in ('count', 'revenue', 'cost', 'profit')},
+    }
+
+# add_sale yozgan kirim qatori (finance da sotuvga havola yo'q - summa va sana bo'yicha bittasi)
+_SALE_INCOME_ROW = '''
+    SELECT id FROM finance
+    WHERE user_id = %s AND category = 'animal_sale' AND type = 'income' AND amount = %s AND date = %s
+    ORDER BY id LIMIT 1
+'''
+
+def update_sale(user_id, sale_id, data):
+    """Sotuv narxi/sanasi/xaridori; hayvonni almashtirib bo'lmaydi (o'chirib qayta qo'shiladi).
+    Kirim qatori va user_stats shu tranzaksiyada tuzatiladi. Topilmasa False."""
+    sale_date = parse_date(data.get('sale_date'), 'sale_date')
+    sale_price = parse_money(data.get('sale_price'), 'sale_price')
+    with transaction() as cursor:
+        cursor.execute('''
+            SELECT s.sale_date, s.sale_price, a.purchase_price
+            FROM sales s LEFT JOIN animals a ON a.id = s.animal_id
+            WHERE s.id = %s AND s.user_id = %s FOR UPDATE OF s
+        ''', (sale_id, user_id))
+        old = cursor.fetchone()
+        if not old:
+            return False
+        cursor.execute('''
+            UPDATE sales SET butcher_id=%s, sale_date=%s, sale_price=%s, buyer_name=%s, buyer_phone=%s, payment_type=%s
+            WHERE id = %s
+        ''', (data.get('butcher_id') or None, sale_date, sale_price, data.get('buyer_name'), data.get('buyer_phone'),
+              data.get('payment_type') or 'cash', sale_id))
+        profit = sale_price - (old['purchase_price'] or 0)
+        cursor.execute(f'''
+            UPDATE finance SET amount = %s, date = %s, description = %s
+            WHERE id = ({_SALE_INCOME_ROW}) RETURNING id
+        ''', (sale_price, sale_date, f'Sotuv (Foyda: {profit})', user_id, old['sale_price'], old['sale_date']))
+        if cursor.fetchone() and sale_price != old['sale_price']:
+            _bump_stats(cursor, user_id, income=sale_price - old['sale_price'])
+        _bump_versions(cursor, user_id, 'sales', 'finance')
+    snapshot_cache.invalidate(user_id)
+    return True
+
+def delete_sale(user_id, sale_id):
+    """Sotuvni bekor qilish: hayvon yana faol, kirim qatori va user_stats qaytariladi. Topilmasa False."""
+    with transaction() as cursor:
+        cursor.execute('DELETE FROM sales WHERE id = %s AND user_id = %s RETURNING animal_id, sale_date, sale_price',
+                       (sale_id, user_id))
+        sale = cursor.fetchone()
+        if not sale:
+            return False
+        cursor.execute('''
+            UPDATE animals SET status = 'active' WHERE id = %s AND status <> 'active'
+            RETURNING user_id
+        ''', (sale['animal_id'],))
+        if cursor.fetchone():
+            _bump_stats(cursor, user_id, active=1)
+        cursor.execute(f'DELETE FROM finance WHERE id = ({_SALE_INCOME_ROW}) RETURNING type, amount',
+                       (user_id, sale['sale_price'], sale['sale_date']))
+        _bump_finance_rows(cursor, user_id, cursor.fetchall(), sign=-1)
+        _bump_versions(cursor, user_id, 'sales', 'animals', 'finance')
+    snapshot_cache.invalidate(user_id)
+    return True
 
 # ==================== FEED ====================
 
-def get_feed(user_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM feed WHERE user_id = %s ORDER BY feed_date DESC', (user_id,))
-    feeds = cursor.fetchall()
-    cursor.close()
-    conn.close()
+def get_feed(user_id, limit=None, after=None):
+    keyset, limit_sql, params = _keyset('feed_date', 'id', after, limit)
+    with get_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT * FROM feed WHERE user_id = %s {keyset}
+            ORDER BY feed_date DESC, id DESC {limit_sql}
+        ''', (user_id, *params))
+        feeds = cursor.fetchall()
     return [dict(f) for f in feeds]
 
 def add_feed(user_id, name, quantity, unit_price, supplier=None, feed_date=None):
-    if not feed_date: feed_date = datetime.now().strftime('%Y-%m-%d')
-    total = quantity * unit_price
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO feed (user_id, name, quantity, unit_price, supplier, feed_date)
-        VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
-    ''', (user_id, name, quantity, unit_price, supplier, feed_date))
-    fid = cursor.fetchone()['id']
-    
-    cursor.execute('''
-        INSERT INTO finance (user_id, type, amount, category, description, date)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    ''', (user_id, 'expense', total, 'feed_purchase', f'{name} ({quantity} kg)', feed_date))
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
+    feed_date = parse_date(feed_date, 'feed_date', required=False) or date.today()
+    quantity = parse_decimal(quantity, 'quantity')
+    unit_price = parse_money(unit_price, 'unit_price')
+    total = (quantity * unit_price).quantize(MONEY_QUANT, rounding=ROUND_HALF_UP)
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO feed (user_id, name, quantity, unit_price, supplier, feed_date)
+            VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
+        ''', (user_id, name, quantity, unit_price, supplier, feed_date))
+        fid = cursor.fetchone()['id']
+        
+        cursor.execute('''
+            INSERT INTO finance (user_id, type, amount, category, description, date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        ''', (user_id, 'expense', total, 'feed_purchase', f'{name} ({quantity} kg)', feed_date))
+        _bump_stats(cursor, user_id, expense=total)
+        _bump_versions(cursor, user_id, 'feed', 'finance')
+    snapshot_cache.invalidate(user_id)
     return fid
 
 def update_feed(feed_id, data):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE feed SET name=%s, quantity=%s, unit_price=%s, supplier=%s, feed_date=%s 
-        WHERE id=%s''', (data['name'], data['quantity'], data['unit_price'], data['supplier'], data['feed_date'], feed_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    quantity = parse_decimal(data['quantity'], 'quantity')
+    unit_price = parse_money(data['unit_price'], 'unit_price')
+    feed_date = parse_date(data['feed_date'], 'feed_date')
+    with transaction() as cursor:
+        cursor.execute('''
+            UPDATE feed SET name=%s, quantity=%s, unit_price=%s, supplier=%s, feed_date=%s 
+            WHERE id=%s RETURNING user_id''', (data['name'], quantity, unit_price, data['supplier'], feed_date, feed_id))
+        row = cursor.fetchone()
+        if row:
+            _bump_versions(cursor, row['user_id'], 'feed')
 
 def delete_feed(feed_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute('SELECT user_id, name, (quantity * unit_price) as total FROM feed WHERE id = %s', (feed_id,))
+    with transaction() as cursor:
+        # add_feed / importer yozgan summa bilan bir xil yaxlitlash
+        cursor.execute('SELECT user_id, name, ROUND(quantity * unit_price, 2) as total FROM feed WHERE id = %s', (feed_id,))
         feed = cursor.fetchone()
         if feed:
+            # Bir xil nom va summali bir nechta xarid bo'lishi mumkin - faqat bitta qator
             cursor.execute('''
-                DELETE FROM finance WHERE user_id = %s AND amount = %s AND category = 'feed_purchase' 
-                AND description LIKE %s
+                DELETE FROM finance WHERE id = (
+                    SELECT id FROM finance
+                    WHERE user_id = %s AND amount = %s AND category = 'feed_purchase' AND description LIKE %s
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING type, amount
             ''', (feed['user_id'], feed['total'], f"%{feed['name']}%"))
+            _bump_finance_rows(cursor, feed['user_id'], cursor.fetchall(), sign=-1)
+            _bump_versions(cursor, feed['user_id'], 'feed', 'finance')
         cursor.execute('DELETE FROM feed WHERE id = %s', (feed_id,))
-        conn.commit()
-    finally:
-        cursor.close()
-        conn.close()
+    if feed:
+        snapshot_cache.invalidate(feed['user_id'])
 
 # ==================== VACCINATIONS ====================
 
-def get_vaccinations(user_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT v.*, a.type as animal_type, a.breed FROM vaccinations v
-        LEFT JOIN animals a ON v.animal_id = a.id
-        WHERE v.user_id = %s ORDER BY v.vaccination_date DESC
-    ''', (user_id,))
-    vax = cursor.fetchall()
-    cursor.close()
-    conn.close()
+def get_vaccinations(user_id, limit=None, after=None):
+    keyset, limit_sql, params = _keyset('v.vaccination_date', 'v.id', after, limit)
+    with get_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT v.*, a.type as animal_type, a.breed FROM vaccinations v
+            LEFT JOIN animals a ON v.animal_id = a.id
+            WHERE v.user_id = %s {keyset}
+            ORDER BY v.vaccination_date DESC, v.id DESC {limit_sql}
+        ''', (user_id, *params))
+        vax = cursor.fetchall()
     return [dict(v) for v in vax]
 
 def add_vaccination(user_id, animal_id, vaccine_name, vaccination_date, next_date=None, veterinarian=None, cost=0):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO vaccinations (user_id, animal_id, vaccine_name, vaccination_date, next_date, veterinarian, cost)
-        VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
-    ''', (user_id, animal_id, vaccine_name, vaccination_date, next_date, veterinarian, cost))
-    vid = cursor.fetchone()['id']
-    if cost and cost > 0:
+    vaccination_date = parse_date(vaccination_date, 'vaccination_date')
+    next_date = parse_date(next_date, 'next_date', required=False)
+    cost = parse_money(cost, 'cost', required=False) or 0
+    with transaction() as cursor:
         cursor.execute('''
-            INSERT INTO finance (user_id, type, amount, category, description, date)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        ''', (user_id, 'expense', cost, 'medicine', f'Vaksina: {vaccine_name}', vaccination_date))
-    conn.commit()
-    cursor.close()
-    conn.close()
+            INSERT INTO vaccinations (user_id, animal_id, vaccine_name, vaccination_date, next_date, veterinarian, cost)
+            VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
+        ''', (user_id, animal_id, vaccine_name, vaccination_date, next_date, veterinarian, cost))
+        vid = cursor.fetchone()['id']
+        if cost and cost > 0:
+            cursor.execute('''
+                INSERT INTO finance (user_id, type, amount, category, description, date)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            ''', (user_id, 'expense', cost, 'medicine', f'Vaksina: {vaccine_name}', vaccination_date))
+            _bump_stats(cursor, user_id, expense=cost)
+            _bump_versions(cursor, user_id, 'finance')
+        _bump_versions(cursor, user_id, 'vaccinations')
+    if cost and cost > 0:
+        snapshot_cache.invalidate(user_id)
     return vid
 
 def update_vaccination(vac_id, data):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE vaccinations SET vaccine_name=%s, vaccination_date=%s, next_date=%s, veterinarian=%s, cost=%s 
-        WHERE id=%s''', (data['vaccine_name'], data['vaccination_date'], data.get('next_date'), data.get('veterinarian'), data.get('cost'), vac_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    vaccination_date = parse_date(data['vaccination_date'], 'vaccination_date')
+    next_date = parse_date(data.get('next_date'), 'next_date', required=False)
+    cost = parse_money(data.get('cost'), 'cost', required=False)
+    with transaction() as cursor:
+        cursor.execute('''
+            UPDATE vaccinations SET vaccine_name=%s, vaccination_date=%s, next_date=%s, veterinarian=%s, cost=%s,
+                reminder_sent = reminder_sent AND next_date IS NOT DISTINCT FROM %s
+            WHERE id=%s RETURNING user_id''', (data['vaccine_name'], vaccination_date, next_date,
+                                                data.get('veterinarian'), cost, next_date, vac_id))
+        row = cursor.fetchone()
+        if row:
+            _bump_versions(cursor, row['user_id'], 'vaccinations')
 
 def delete_vaccination(vac_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM vaccinations WHERE id = %s', (vac_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute('DELETE FROM vaccinations WHERE id = %s RETURNING user_id', (vac_id,))
+        row = cursor.fetchone()
+        if row:
+            _bump_versions(cursor, row['user_id'], 'vaccinations')
 
 # ==================== FINANCE ====================
 
-def get_finance(user_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM finance WHERE user_id = %s ORDER BY date DESC', (user_id,))
-    fin = cursor.fetchall()
-    cursor.close()
-    conn.close()
+def get_finance(user_id, limit=None, after=None):
+    keyset, limit_sql, params = _keyset('date', 'id', after, limit)
+    with get_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT * FROM finance WHERE user_id = %s {keyset}
+            ORDER BY date DESC, id DESC {limit_sql}
+        ''', (user_id, *params))
+        fin = cursor.fetchall()
     return [dict(f) for f in fin]
 
+FINANCE_TYPES = ('income', 'expense')
+
 def add_finance(user_id, finance_type, amount, category, description=None, date=None):
-    if not date: date = datetime.now().strftime('%Y-%m-%d')
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO finance (user_id, type, amount, category, description, date)
-        VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
-    ''', (user_id, finance_type, amount, category, description, date))
-    fid = cursor.fetchone()['id']
-    conn.commit()
-    cursor.close()
-    conn.close()
+    if finance_type not in FINANCE_TYPES:
+        raise ValidationError(f"type: {finance_type!r} (income/expense kutilgan)")
+    amount = parse_money(amount, 'amount')
+    date = parse_date(date, 'date', required=False) or datetime.now().date()
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO finance (user_id, type, amount, category, description, date)
+            VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
+        ''', (user_id, finance_type, amount, category, description, date))
+        fid = cursor.fetchone()['id']
+        _bump_finance_rows(cursor, user_id, [{'type': finance_type, 'amount': amount}])
+        _bump_versions(cursor, user_id, 'finance')
+    snapshot_cache.invalidate(user_id)
     return fid
 
 def delete_finance(fid):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM finance WHERE id = %s', (fid,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute('DELETE FROM finance WHERE id = %s RETURNING user_id, type, amount', (fid,))
+        row = cursor.fetchone()
+        if row:
+            _bump_finance_rows(cursor, row['user_id'], [row], sign=-1)
+            _bump_versions(cursor, row['user_id'], 'finance')
+    if row:
+        snapshot_cache.invalidate(row['user_id'])
 
 def get_finance_stats(user_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT SUM(amount) as total FROM finance WHERE user_id = %s AND type = 'income'", (user_id,))
-    inc = cursor.fetchone()['total'] or 0
-    cursor.execute("SELECT SUM(amount) as total FROM finance WHERE user_id = %s AND type = 'expense'", (user_id,))
-    exp = cursor.fetchone()['total'] or 0
-    cursor.close()
-    conn.close()
-    return {'income': inc, 'expense': exp, 'profit': inc - exp}
+    return get_dashboard_snapshot(user_id)['finance']
 
-def delete_user_completely(telegram_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+# ==================== DASHBOARD ====================
+
+def get_dashboard_snapshot(user_id):
+    """Foydalanuvchi va uning yig'indilari (snapshot_cache orqali; yozuvchilar keshni o'chiradi)"""
+    return snapshot_cache.get(user_id, _load_dashboard_snapshot)
+
+def _load_dashboard_snapshot(user_id):
+    """user_stats dan primary key bo'yicha bitta so'rov"""
+    with get_cursor() as cursor:
+        cursor.execute('''
+            SELECT u.telegram_id, u.full_name, u.language,
+                   s.user_id AS stats_user_id, s.income, s.expense, s.animals_total, s.animals_active
+            FROM (SELECT %(user_id)s::bigint AS user_id) k
+            LEFT JOIN users u ON u.telegram_id = k.user_id
+            LEFT JOIN user_stats s ON s.user_id = k.user_id
+        ''', {'user_id': user_id})
+        row = cursor.fetchone()
+    user = None
+    if row['telegram_id'] is not None:
+        user = {'telegram_id': row['telegram_id'], 'full_name': row['full_name'], 'language': row['language']}
+        if row['stats_user_id'] is None:
+            # Qator hali yo'q (eski ma'lumot) - bir marta noldan hisoblab qo'yamiz
+            rebuild_user_stats(user_id)
+            return _load_dashboard_snapshot(user_id)
+    income = row['income'] or 0
+    expense = row['expense'] or 0
+    return {
+        'user': user,
+        'animals': {'total': row['animals_total'] or 0, 'active': row['animals_active'] or 0},
+        'finance': {'income': income, 'expense': expense, 'profit': income - expense},
+    }
+
+# ==================== EXPORT ====================
+
+EXPORT_ITERSIZE = int(os.environ.get('EXPORT_ITERSIZE', 2000))
+
+# Resurs -> (SELECT, sana ustuni). Qatorlar sana bo'yicha xronologik tartibda.
+EXPORT_QUERIES = {
+    'animals': ('''
+        SELECT a.id, a.type, a.breed, a.gender, a.birth_date, a.weight, a.purchase_price,
+               a.purchase_date, a.status, a.created_date
+        FROM animals a WHERE a.user_id = %(user_id)s {where}
+        ORDER BY a.purchase_date, a.id''', 'a.purchase_date'),
+    'sales': ('''
+        SELECT s.id, s.sale_date, s.animal_id, a.type AS animal_type, a.breed, s.sale_price,
+               b.name AS butcher_name, s.buyer_name, s.buyer_phone, s.payment_type
+        FROM sales s
+        LEFT JOIN animals a ON s.animal_id = a.id
+        LEFT JOIN butchers b ON s.butcher_id = b.id
+        WHERE s.user_id = %(user_id)s {where}
+        ORDER BY s.sale_date, s.id''', 's.sale_date'),
+    'feed': ('''
+        SELECT f.id, f.feed_date, f.name, f.quantity, f.unit_price, f.supplier
+        FROM feed f WHERE f.user_id = %(user_id)s {where}
+        ORDER BY f.feed_date, f.id''', 'f.feed_date'),
+    'vaccinations': ('''
+        SELECT v.id, v.vaccination_date, v.animal_id, a.type AS animal_type, a.breed,
+               v.vaccine_name, v.next_date, v.veterinarian, v.cost
+        FROM vaccinations v
+        LEFT JOIN animals a ON v.animal_id = a.id
+        WHERE v.user_id = %(user_id)s {where}
+        ORDER BY v.vaccination_date, v.id''', 'v.vaccination_date'),
+    'finance': ('''
+        SELECT f.id, f.date, f.type, f.amount, f.category, f.description
+        FROM finance f WHERE f.user_id = %(user_id)s {where}
+        ORDER BY f.date, f.id''', 'f.date'),
+}
+
+def iter_export(resource, user_id, date_from=None, date_to=None, itersize=EXPORT_ITERSIZE):
+    """Server-side (named) cursor orqali eksport: avval ustun nomlari, keyin qatorlar (tuple).
+
+    Bir vaqtda xotirada faqat itersize ta qator turadi. Generator yopilganda
+    (mijoz uzilsa ham) ulanish poolga qaytariladi.
+    """
+    if resource not in EXPORT_QUERIES:
+        raise ValidationError(f"table: {resource!r} ({', '.join(EXPORT_QUERIES)})")
+    sql, date_column = EXPORT_QUERIES[resource]
+    params = {
+        'user_id': user_id,
+        'date_from': parse_date(date_from, 'date_from', required=False),
+        'date_to': parse_date(date_to, 'date_to', required=False),
+    }
+    where = ''
+    if params['date_from']:
+        where += f' AND {date_column} >= %(date_from)s'
+    if params['date_to']:
+        where += f' AND {date_column} <= %(date_to)s'
+
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = False
+    conn.autocommit = False  # named cursor faqat tranzaksiya ichida yashaydi
     try:
-        cursor.execute('DELETE FROM finance WHERE user_id = %s', (telegram_id,))
-        cursor.execute('DELETE FROM vaccinations WHERE user_id = %s', (telegram_id,))
-        cursor.execute('DELETE FROM feed WHERE user_id = %s', (telegram_id,))
-        cursor.execute('DELETE FROM sales WHERE user_id = %s', (telegram_id,))
-        cursor.execute('DELETE FROM animals WHERE user_id = %s', (telegram_id,))
-        cursor.execute('DELETE FROM users WHERE telegram_id = %s', (telegram_id,))
+        with conn.cursor(name=f'export_{resource}', cursor_factory=extensions.cursor) as cursor:
+            cursor.itersize = itersize
+            cursor.execute(sql.format(where=where), params)
+            rows = cursor.fetchmany(itersize)
+            yield [column.name for column in cursor.description]
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(itersize)
         conn.commit()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        raise
+    finally:
+        pool.putconn(conn, discard=discard)
+
+def delete_user_completely(telegram_id):
+    try:
+        with transaction() as cursor:
+            cursor.execute('DELETE FROM finance WHERE user_id = %s', (telegram_id,))
+            cursor.execute('DELETE FROM vaccinations WHERE user_id = %s', (telegram_id,))
+            cursor.execute('DELETE FROM feed WHERE user_id = %s', (telegram_id,))
+            cursor.execute('DELETE FROM sales WHERE user_id = %s', (telegram_id,))
+            cursor.execute('DELETE FROM animals WHERE user_id = %s', (telegram_id,))
+            cursor.execute('DELETE FROM user_stats WHERE user_id = %s', (telegram_id,))
+            cursor.execute('DELETE FROM users WHERE telegram_id = %s', (telegram_id,))
+            # Versiyalar o'chirilmaydi: eski ETag lar yangi (bo'sh) javobga mos kelmasligi uchun
+            _bump_versions(cursor, telegram_id, *USER_RESOURCES)
     except Exception as e:
-        conn.rollback()
         print(f"Error: {e}")
     finally:
-        cursor.close()
-        conn.close()
+        user_cache.invalidate(telegram_id)
+        snapshot_cache.invalidate(telegram_id)
@@ -0,0 +1,259 @@
+"""Bot uchun asinxron ma'lumotlar qatlami (asyncpg).
+
+database.py dagi funksiyalarning bot ishlatadigan qismi, xuddi shu nom va
+qaytariladigan shakl bilan (dict, Decimal, date), lekin event loop ni bloklamaydi.
+Pool Application.post_init da ochiladi va post_shutdown da yopiladi.
+"""
+
+import asyncpg
+
+import database as db
+from user_cache import cache as user_cache, is_missing
+from snapshot_cache import cache as snapshot_cache
+
+_pool = None
+
+def _ssl():
+    # libpq sslmode -> asyncpg ssl parametri ('disable' bo'lsa shifrlashsiz)
+    return False if db.DB_SSLMODE == 'disable' else db.DB_SSLMODE
+
+async def init_pool():
+    """Asinxron pool ni ochish (bir marta)"""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            db.DATABASE_URL, ssl=_ssl(),
+            min_size=db.DB_POOL_MIN, max_size=db.DB_POOL_MAX,
+            max_inactive_connection_lifetime=db.DB_POOL_RECYCLE,
+            timeout=db.DB_POOL_TIMEOUT,
+        )
+    return _pool
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+def get_pool():
+    if _pool is None:
+        raise RuntimeError("database_async.init_pool() chaqirilmagan")
+    return _pool
+
+# ==================== USERS ====================
+
+async def get_user(telegram_id):
+    """users qatori (database.get_user bilan umumiy user_cache orqali)"""
+    user = user_cache.get(telegram_id)
+    if not is_missing(user):
+        return user
+    token = user_cache.loading(telegram_id)
+    row = await get_pool().fetchrow('SELECT * FROM users WHERE telegram_id = $1', telegram_id)
+    user = dict(row) if row else None
+    user_cache.set(telegram_id, user, token)
+    return user
+
+async def add_user(telegram_id, username, first_name, last_name, phone, full_name, language='uz'):
+    async with get_pool().acquire() as conn:
+        async with conn.transaction():
+            user_id = await conn.fetchval('''
+                INSERT INTO users (telegram_id, username, first_name, last_name, phone, full_name, language)
+                VALUES ($1, $2, $3, $4, $5, $6, $7) RETURNING id
+            ''', telegram_id, username, first_name, last_name, phone, full_name, language)
+            await _bump_stats(conn, telegram_id)
+    user_cache.invalidate(telegram_id)
+    snapshot_cache.invalidate(telegram_id)
+    return user_id
+
+async def update_user_language(telegram_id, language):
+    await get_pool().execute('UPDATE users SET language = $1 WHERE telegram_id = $2', language, telegram_id)
+    user_cache.invalidate(telegram_id)
+    snapshot_cache.invalidate(telegram_id)
+
+# ==================== USER STATS ====================
+
+async def _bump_stats(conn, user_id, income=0, expense=0, total=0, active=0):
+    """database._bump_stats bilan bir xil (joriy tranzaksiya ichida)"""
+    await conn.execute('''
+        INSERT INTO user_stats (user_id, income, expense, animals_total, animals_active)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (user_id) DO UPDATE SET
+            income = user_stats.income + EXCLUDED.income,
+            expense = user_stats.expense + EXCLUDED.expense,
+            animals_total = user_stats.animals_total + EXCLUDED.animals_total,
+            animals_active = user_stats.animals_active + EXCLUDED.animals_active,
+            updated_at = CURRENT_TIMESTAMP
+    ''', user_id, income, expense, total, active)
+
+async def _backfill_stats(user_id):
+    """user_stats qatori yo'q bo'lsa, noldan hisoblab qo'yish"""
+    await get_pool().execute(f'''
+        INSERT INTO user_stats (user_id, income, expense, animals_total, animals_active)
+        SELECT user_id, income, expense, animals_total, animals_active
+        FROM ({db.USER_STATS_SQL.format(filter='WHERE u.telegram_id = $1')}) s
+        ON CONFLICT (user_id) DO NOTHING
+    ''', user_id)
+
+# ==================== LISTS ====================
+
+async def browse_animals(user_id, limit, animal_type=None, status=None, cursor=None, backward=False):
+    """Bot ro'yxati uchun bitta sahifa: (rows, yana_bormi).
+
+    cursor - (created_date, id); backward=True - cursor dan oldingi (yangiroq) yozuvlar.
+    Filtrlar idx_animals_user_type_created / idx_animals_user_status_created bilan ishlaydi.
+    """
+    conditions, params = ['user_id = $1'], [user_id]
+    if animal_type:
+        params.append(animal_type)
+        conditions.append(f'type = ${len(params)}')
+    if status:
+        params.append(status)
+        conditions.append(f'status = ${len(params)}')
+    if cursor:
+        params.extend(cursor)
+        conditions.append(f"(created_date, id) {'>' if backward else '<'} (${len(params) - 1}, ${len(params)})")
+    order = 'ASC' if backward else 'DESC'
+    params.append(limit + 1)
+    rows = await get_pool().fetch(f'''
+        SELECT id, type, breed, status, purchase_price, purchase_date, created_date
+        FROM animals WHERE {' AND '.join(conditions)}
+        ORDER BY created_date {order}, id {order} LIMIT ${len(params)}
+    ''', *params)
+    rows = [dict(row) for row in rows]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+    return rows, more
+
+async def get_animal_types(user_id, limit=8):
+    """Fermerdagi eng ko'p uchraydigan turlar (filtr tugmalari uchun)"""
+    rows = await get_pool().fetch('''
+        SELECT type, COUNT(*) AS count FROM animals WHERE user_id = $1 AND type IS NOT NULL
+        GROUP BY type ORDER BY count DESC, type LIMIT $2
+    ''', user_id, limit)
+    return [dict(row) for row in rows]
+
+async def browse_butchers(limit, cursor=None, backward=False):
+    """browse_animals ning qassoblar varianti (idx_butchers_created)"""
+    condition, params = '', []
+    if cursor:
+        params.extend(cursor)
+        condition = f"WHERE (created_date, id) {'>' if backward else '<'} ($1, $2)"
+    order = 'ASC' if backward else 'DESC'
+    params.append(limit + 1)
+    rows = await get_pool().fetch(f'''
+        SELECT id, name, phone, address, created_date FROM butchers {condition}
+        ORDER BY created_date {order}, id {order} LIMIT ${len(params)}
+    ''', *params)
+    rows = [dict(row) for row in rows]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+    return rows, more
+
+async def get_animal_counts(user_id):
+    """user_stats dan (jami, faol) - sanashsiz"""
+    row = await get_pool().fetchrow(
+        'SELECT animals_total, animals_active FROM user_stats WHERE user_id = $1', user_id)
+    return (row['animals_total'], row['animals_active']) if row else (0, 0)
+
+async def count_rows(resource, user_id):
+    table = db.SORT_KEYS[resource][0]
+    if table == 'butchers':
+        return await get_pool().fetchval('SELECT COUNT(*) FROM butchers')
+    if table == 'animals':
+        total = await get_pool().fetchval('SELECT animals_total FROM user_stats WHERE user_id = $1', user_id)
+        return total or 0
+    return await get_pool().fetchval(f'SELECT COUNT(*) FROM {table} WHERE user_id = $1', user_id)
+
+# ==================== DASHBOARD ====================
+
+async def get_dashboard_snapshot(user_id):
+    """database.get_dashboard_snapshot bilan bir xil shakl; web bilan umumiy snapshot_cache orqali"""
+    return await snapshot_cache.aget(user_id, _load_dashboard_snapshot)
+
+async def _load_dashboard_snapshot(user_id):
+    row = await get_pool().fetchrow('''
+        SELECT u.telegram_id, u.full_name, u.language,
+               s.user_id AS stats_user_id, s.income, s.expense, s.animals_total, s.animals_active
+        FROM (SELECT $1::bigint AS user_id) k
+        LEFT JOIN users u ON u.telegram_id = k.user_id
+        LEFT JOIN user_stats s ON s.user_id = k.user_id
+    ''', user_id)
+    user = None
+    if row['telegram_id'] is not None:
+        user = {'telegram_id': row['telegram_id'], 'full_name': row['full_name'], 'language': row['language']}
+        if row['stats_user_id'] is None:
+            await _backfill_stats(user_id)
+            return await _load_dashboard_snapshot(user_id)
+    income = row['income'] or 0
+    expense = row['expense'] or 0
+    return {
+        'user': user,
+        'animals': {'total': row['animals_total'] or 0, 'active': row['animals_active'] or 0},
+        'finance': {'income': income, 'expense': expense, 'profit': income - expense},
+    }
+
+# ==================== REMINDERS ====================
+
+async def claim_due_vaccinations(due_by, after_user=-1, after_id=0, limit=500):
+    """Muddati yetgan (next_date <= due_by) va hali eslatilmagan vaksinatsiyalarni band qilish.
+
+    Qatorlar (user_id, id) tartibida keyset bilan olinadi va shu so'rovning o'zida
+    reminder_sent = TRUE qilinadi, shuning uchun bir nechta jarayon bir xil eslatmani yubormaydi.
+    """
+    rows = await get_pool().fetch('''
+        WITH due AS (
+            SELECT id FROM vaccinations
+            WHERE next_date IS NOT NULL AND NOT reminder_sent AND next_date <= $1
+              AND (user_id, id) > ($2::bigint, $3::integer)
+            ORDER BY user_id, id
+            LIMIT $4
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE vaccinations v SET reminder_sent = TRUE
+        FROM due, users u, animals a
+        WHERE v.id = due.id AND u.telegram_id = v.user_id AND a.id = v.animal_id
+        RETURNING v.id, v.user_id, v.vaccine_name, v.next_date, a.type AS animal_type, a.breed, u.language
+    ''', due_by, after_user, after_id, limit)
+    return sorted((dict(row) for row in rows), key=lambda row: (row['user_id'], row['id']))
+
+async def release_vaccination_reminders(ids):
+    """Yuborilmagan eslatmalarni keyingi ishga tushirish uchun qaytarish"""
+    if ids:
+        await get_pool().execute('UPDATE vaccinations SET reminder_sent = FALSE WHERE id = ANY($1::integer[])', ids)
+
+# ==================== BROADCASTS ====================
+
+async def create_broadcast(text, created_by):
+    return dict(await get_pool().fetchrow('''
+        INSERT INTO broadcasts (text, created_by, total)
+        VALUES ($1, $2, (SELECT COUNT(*) FROM users)) RETURNING *
+    ''', text, created_by))
+
+async def get_broadcast(broadcast_id):
+    row = await get_pool().fetchrow('SELECT * FROM broadcasts WHERE id = $1', broadcast_id)
+    return dict(row) if row else None
+
+async def get_running_broadcasts():
+    rows = await get_pool().fetch("SELECT * FROM broadcasts WHERE status = 'running' ORDER BY id")
+    return [dict(row) for row in rows]
+
+async def get_recent_broadcasts(limit=5):
+    rows = await get_pool().fetch('SELECT * FROM broadcasts ORDER BY id DESC LIMIT $1', limit)
+    return [dict(row) for row in rows]
+
+async def get_user_ids_after(after, limit):
+    """telegram_id bo'yicha keyset (users.telegram_id UNIQUE indeksi)"""
+    rows = await get_pool().fetch(
+        'SELECT telegram_id FROM users WHERE telegram_id > $1 ORDER BY telegram_id LIMIT $2', after, limit)
+    return [row['telegram_id'] for row in rows]
+
+async def save_broadcast_progress(broadcast_id, last_telegram_id, sent, failed, status='running'):
+    await get_pool().execute('''
+        UPDATE broadcasts SET last_telegram_id = $2, sent = $3, failed = $4, status = $5,
+            finished_date = CASE WHEN $5 = 'running' THEN NULL ELSE CURRENT_TIMESTAMP END
+        WHERE id = $1
+    ''', broadcast_id, last_telegram_id, sent, failed, status)
@@ -0,0 +1,27 @@
+"""gunicorn sozlamalari (gunicorn joriy papkadagi shu faylni o'zi o'qiydi: `gunicorn app:app`).
+
+Webhook rejimida bot (ConversationHandler holati, yangilanishlar navbati, foydalanuvchi bo'yicha
+ketma-ketlik) web jarayon xotirasida ishlaydi - bir nechta worker holatni jimgina bo'lib yuboradi
+va har biri setWebhook qiladi. Shuning uchun webhook rejimida faqat bitta worker, parallellik -
+threadlar orqali. Bu yerda tekshiriladi: `--workers 2` bilan ishga tushirilsa server ko'tarilmaydi.
+"""
+import os
+import sys
+
+workers = int(os.environ.get('WEB_WORKERS', 1))
+threads = int(os.environ.get('WEB_THREADS', 8))
+
+def _webhook_mode():
+    from config import BOT_MODE
+    return BOT_MODE == 'webhook'
+
+def on_starting(server):
+    if server.cfg.workers > 1 and _webhook_mode():
+        server.log.error("BOT_MODE=webhook: bot holati jarayon xotirasida - faqat 1 worker "
+                         "(WEB_THREADS bilan parallellik). workers=%s rad etildi", server.cfg.workers)
+        sys.exit(1)
+
+def nworkers_changed(server, new_value, old_value):
+    # TTIN signali bilan oshirilsa ham - qaytarib bo'lmaydi, lekin jimgina emas
+    if new_value > 1 and _webhook_mode():
+        server.log.error("BOT_MODE=webhook: workers=%s - ConversationHandler holati bo'linadi", new_value)
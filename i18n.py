@@ -0,0 +1,113 @@
+"""Bot uchun tarjimalar, klaviaturalar va xabar shablonlari.
+
+config.TRANSLATIONS import paytida bir marta o'zgarmas (MappingProxyType) kataloglarga
+yig'iladi: har bir til o'z kalitlari + DEFAULT_LANGUAGE dagi yetishmayotgan kalitlar.
+Klaviaturalar va shablonlar ham har bir til uchun oldindan quriladi, handlerlar
+faqat o'zgaruvchan qiymatlarni (son, ro'yxat) qo'yadi.
+"""
+from types import MappingProxyType
+
+from telegram import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
+
+from config import TRANSLATIONS
+
+DEFAULT_LANGUAGE = 'uz'
+LANGUAGE_NAMES = MappingProxyType({'uz': "🇺🇿 O'zbekcha", 'ru': '🇷🇺 Русский', 'en': '🇬🇧 English'})
+
+# ==================== CATALOGS ====================
+
+def _compile_catalogs(translations):
+    default = translations[DEFAULT_LANGUAGE]
+    return MappingProxyType({
+        lang: MappingProxyType({**default, **messages}) for lang, messages in translations.items()
+    })
+
+CATALOGS = _compile_catalogs(TRANSLATIONS)
+
+def language(lang):
+    """Noma'lum yoki bo'sh til -> DEFAULT_LANGUAGE"""
+    return lang if lang in CATALOGS else DEFAULT_LANGUAGE
+
+def catalog(lang):
+    return CATALOGS.get(lang) or CATALOGS[DEFAULT_LANGUAGE]
+
+def t(lang, key):
+    """Tarjima: til -> DEFAULT_LANGUAGE -> kalitning o'zi"""
+    return catalog(lang).get(key, key)
+
+# ==================== KEYBOARDS ====================
+
+def _main_keyboard(messages):
+    return ReplyKeyboardMarkup([
+        [KeyboardButton(f"🐄 {messages['animals']}"), KeyboardButton(f"👤 {messages['butchers']}")],
+        [KeyboardButton(f"💰 {messages['sales']}"), KeyboardButton(f"🌾 {messages['feed']}")],
+        [KeyboardButton(f"💉 {messages['vaccinations']}"), KeyboardButton(f"📊 {messages['finance']}")],
+        [KeyboardButton(f"🏠 {messages['dashboard']}"), KeyboardButton(f"🌐 {messages['language']}")],
+    ], resize_keyboard=True)
+
+MAIN_KEYBOARDS = MappingProxyType({lang: _main_keyboard(messages) for lang, messages in CATALOGS.items()})
+
+LANGUAGE_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton(name, callback_data=f'lang_{lang}')] for lang, name in LANGUAGE_NAMES.items()
+])
+
+CONTACT_KEYBOARD = ReplyKeyboardMarkup(
+    [[KeyboardButton("📱 Telefon raqamni yuborish", request_contact=True)]],
+    resize_keyboard=True, one_time_keyboard=True)
+
+CANCEL_TEXT = "Bekor qilish"
+CANCEL_KEYBOARD = ReplyKeyboardMarkup([[KeyboardButton(CANCEL_TEXT)]], resize_keyboard=True)
+
+def main_keyboard(lang):
+    return MAIN_KEYBOARDS.get(lang) or MAIN_KEYBOARDS[DEFAULT_LANGUAGE]
+
+def webapp_markup(label, url):
+    """Web App tugmasi (URL har bir foydalanuvchi uchun alohida, shuning uchun oldindan qurilmaydi)"""
+    return InlineKeyboardMarkup([[InlineKeyboardButton(label, web_app=WebAppInfo(url=url))]])
+
+# ==================== TEMPLATES ====================
+
+# {kalit} - tarjima (qurishda qo'yiladi), {{maydon}} - handler qiymati (render paytida)
+_RAW_TEMPLATES = {
+    'dashboard': (
+        "📊 {dashboard}\n\n"
+        "🐄 {total_animals}: {{total}}\n"
+        "✅ {active_animals}: {{active}}\n\n"
+        "💰 {total_income}: {{income:,.0f}} {sum}\n"
+        "💸 {total_expense}: {{expense:,.0f}} {sum}\n"
+        "📈 {net_profit}: {{profit:,.0f}} {sum}\n\n"
+    ),
+    'no_data': "❌ {no_data}",
+}
+
+def _compile_templates(messages):
+    escaped = {key: str(value).replace('{', '{{').replace('}', '}}') for key, value in messages.items()}
+    return MappingProxyType({name: raw.format(**escaped) for name, raw in _RAW_TEMPLATES.items()})
+
+TEMPLATES = MappingProxyType({lang: _compile_templates(messages) for lang, messages in CATALOGS.items()})
+
+def templates(lang):
+    return TEMPLATES.get(lang) or TEMPLATES[DEFAULT_LANGUAGE]
+
+def render_dashboard(lang, snapshot):
+    animals, finance = snapshot['animals'], snapshot['finance']
+    return templates(lang)['dashboard'].format(
+        total=animals['total'], active=animals['active'],
+        income=finance['income'], expense=finance['expense'], profit=finance['profit'])
+
+def render_animal_items(lang, animals):
+    currency = catalog(lang)['sum']
+    # Qatorlar f-string bilan (str.format har chaqiriqda shablonni qayta tahlil qiladi)
+    return ''.join(f"{'✅' if animal['status'] == 'active' else '❌'} {animal['type']} - {animal['breed']}\n"
+                   f"   💰 {animal['purchase_price']:,.0f} {currency}\n"
+                   f"   📅 {animal['purchase_date']}\n\n"
+                   for animal in animals)
+
+def render_butcher_items(butchers):
+    parts = []
+    for butcher in butchers:
+        parts.append(f"👤 {butcher['name']}\n   📱 {butcher['phone']}\n")
+        if butcher['address']:
+            parts.append(f"   📍 {butcher['address']}\n")
+        parts.append("\n")
+    return ''.join(parts)
@@ -0,0 +1,307 @@
+"""CSV/XLSX dan animals, feed va finance jadvallariga ommaviy import.
+
+    python importer.py animals hayvonlar.csv --user-id 123456 [--errors xatolar.csv]
+
+Fayl oqim bilan o'qiladi, har bir qator tekshiriladi va CHUNK_SIZE lik bo'laklarda
+`COPY ... FROM STDIN` orqali vaqtinchalik staging jadvalga yuklanadi, so'ng
+staging dan asosiy jadvalga (va add_animal/add_feed yaratadigan moliya yozuvlari
+bilan birga) INSERT ... SELECT qilinadi. Xotira fayl hajmiga bog'liq emas.
+Butun import bitta tranzaksiya: DB xatosi bo'lsa hech narsa yozilmaydi,
+noto'g'ri qatorlar esa o'tkazib yuborilib, xatolar hisobotiga yoziladi.
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import sys
+
+import database as db
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+def _normalize_header(name):
+    return str(name or '').strip().lower().replace("'", '').replace('‘', '').replace(' ', '_').replace('-', '_')
+
+def _finance_type(value):
+    value = str(value or '').strip().lower()
+    value = {'kirim': 'income', 'доход': 'income', 'chiqim': 'expense', 'расход': 'expense'}.get(value, value)
+    if value not in db.FINANCE_TYPES:
+        raise db.ValidationError(f"type: {value!r} (income/expense kutilgan)")
+    return value
+
+def _text(value, field, required=False):
+    text = str(value).strip() if value is not None else ''
+    if required and not text:
+        raise db.ValidationError(f"{field}: qiymat kiritilmagan")
+    return text or None
+
+def _animal(row):
+    animal = db._normalize_animal(row)
+    status = _text(row.get('status'), 'status') or 'active'
+    if status not in ('active', 'sold', 'deceased'):
+        raise db.ValidationError(f"status: {status!r}")
+    return (animal['type'], _text(animal['breed'], 'breed'), _text(animal['gender'], 'gender'),
+            animal['birth_date'], animal['weight'], animal['purchase_price'], animal['purchase_date'], status)
+
+def _feed(row):
+    return (_text(row.get('name'), 'name', required=True),
+            db.parse_decimal(row.get('quantity'), 'quantity'),
+            db.parse_money(row.get('unit_price'), 'unit_price'),
+            _text(row.get('supplier'), 'supplier'),
+            db.parse_date(row.get('feed_date'), 'feed_date'))
+
+def _finance(row):
+    return (_finance_type(row.get('type')),
+            db.parse_money(row.get('amount'), 'amount'),
+            _text(row.get('category'), 'category', required=True),
+            _text(row.get('description'), 'description'),
+            db.parse_date(row.get('date'), 'date'))
+
+# Har bir tur: ustunlar (staging tartibida), sarlavha sinonimlari, qator konvertori,
+# staging -> asosiy jadval SQL lari va user_stats deltasi
+KINDS = {
+    'animals': {
+        'columns': ['type', 'breed', 'gender', 'birth_date', 'weight', 'purchase_price', 'purchase_date', 'status'],
+        'required': ['type', 'purchase_price', 'purchase_date'],
+        'aliases': {
+            'type': ['turi', 'tur', 'hayvon', 'тип', 'вид'],
+            'breed': ['zoti', 'zot', 'порода'],
+            'gender': ['jinsi', 'пол'],
+            'birth_date': ['tugilgan_sana', 'дата_рождения'],
+            'weight': ['ogirligi', 'ogirlik', 'vazn', 'вес'],
+            'purchase_price': ['price', 'narx', 'narxi', 'xarid_narxi', 'цена'],
+            'purchase_date': ['date', 'sana', 'xarid_sanasi', 'дата', 'дата_покупки'],
+            'status': ['holati', 'статус'],
+        },
+        'convert': _animal,
+        'staging': '''
+            type TEXT, breed TEXT, gender TEXT, birth_date DATE, weight REAL,
+            purchase_price NUMERIC(14, 2), purchase_date DATE, status TEXT
+        ''',
+        'insert': [
+            '''INSERT INTO animals (user_id, type, breed, gender, birth_date, weight, purchase_price, purchase_date, status)
+               SELECT %(user_id)s, type, breed, gender, birth_date, weight, purchase_price, purchase_date, status
+               FROM import_staging''',
+            # add_animal dagi f'{animal_type} - {breed}' bilan bir xil tavsif (delete_animal shu bo'yicha topadi)
+            '''INSERT INTO finance (user_id, type, amount, category, description, date)
+               SELECT %(user_id)s, 'expense', purchase_price, 'animal_purchase',
+                      type || ' - ' || COALESCE(breed, 'None'), purchase_date
+               FROM import_staging''',
+        ],
+        'stats': '''
+            SELECT 0 AS income, COALESCE(SUM(purchase_price), 0) AS expense, COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE status = 'active') AS active
+            FROM import_staging
+        ''',
+    },
+    'feed': {
+        'columns': ['name', 'quantity', 'unit_price', 'supplier', 'feed_date'],
+        'required': ['name', 'quantity', 'unit_price', 'feed_date'],
+        'aliases': {
+            'name': ['nomi', 'ozuqa', 'название'],
+            'quantity': ['miqdor', 'miqdori', 'kg', 'количество'],
+            'unit_price': ['price', 'narx', 'narxi', 'цена'],
+            'supplier': ['yetkazib_beruvchi', 'поставщик'],
+            'feed_date': ['date', 'sana', 'дата'],
+        },
+        'convert': _feed,
+        'staging': '''
+            name TEXT, quantity NUMERIC, unit_price NUMERIC(14, 2), supplier TEXT, feed_date DATE
+        ''',
+        'insert': [
+            '''INSERT INTO feed (user_id, name, quantity, unit_price, supplier, feed_date)
+               SELECT %(user_id)s, name, quantity, unit_price, supplier, feed_date FROM import_staging''',
+            # add_feed dagi f'{name} ({quantity} kg)' bilan bir xil
+            '''INSERT INTO finance (user_id, type, amount, category, description, date)
+               SELECT %(user_id)s, 'expense', ROUND(quantity * unit_price, 2), 'feed_purchase',
+                      name || ' (' || quantity::text || ' kg)', feed_date
+               FROM import_staging''',
+        ],
+        'stats': '''
+            SELECT 0 AS income, COALESCE(SUM(ROUND(quantity * unit_price, 2)), 0) AS expense,
+                   0 AS total, 0 AS active
+            FROM import_staging
+        ''',
+    },
+    'finance': {
+        'columns': ['type', 'amount', 'category', 'description', 'date'],
+        'required': ['type', 'amount', 'category', 'date'],
+        'aliases': {
+            'type': ['turi', 'тип'],
+            'amount': ['summa', 'miqdor', 'сумма'],
+            'category': ['kategoriya', 'категория'],
+            'description': ['izoh', 'tavsif', 'описание'],
+            'date': ['sana', 'дата'],
+        },
+        'convert': _finance,
+        'staging': '''
+            type TEXT, amount NUMERIC(14, 2), category TEXT, description TEXT, date DATE
+        ''',
+        'insert': [
+            '''INSERT INTO finance (user_id, type, amount, category, description, date)
+               SELECT %(user_id)s, type, amount, category, description, date FROM import_staging''',
+        ],
+        'stats': '''
+            SELECT COALESCE(SUM(amount) FILTER (WHERE type = 'income'), 0) AS income,
+                   COALESCE(SUM(amount) FILTER (WHERE type = 'expense'), 0) AS expense,
+                   0 AS total, 0 AS active
+            FROM import_staging
+        ''',
+    },
+}
+
+# ==================== READERS ====================
+
+def _iter_csv(fileobj):
+    text = fileobj if isinstance(fileobj, io.TextIOBase) else io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    # Ajratuvchi (, ; yoki tab) sarlavha qatoridan aniqlanadi - fayl qayta o'qilmaydi
+    header = text.readline()
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    yield from csv.reader(itertools.chain([header], text), dialect)
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise db.ValidationError("XLSX import uchun openpyxl o'rnatilishi kerak (pip install openpyxl)")
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ['' if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+def iter_records(fileobj, filename, kind):
+    """(qator raqami, {maydon: qiymat}) juftliklari; sarlavha sinonimlar orqali moslanadi"""
+    spec = KINDS[kind]
+    rows = _iter_xlsx(fileobj) if filename.lower().endswith(('.xlsx', '.xlsm')) else _iter_csv(fileobj)
+    header = next(rows, None)
+    if not header:
+        raise db.ValidationError("fayl bo'sh")
+
+    lookup = {}
+    for field in spec['columns']:
+        lookup[field] = field
+        for alias in spec['aliases'].get(field, []):
+            lookup[_normalize_header(alias)] = field
+    mapping = {}
+    for position, name in enumerate(header):
+        field = lookup.get(_normalize_header(name))
+        if field and field not in mapping.values():
+            mapping[position] = field
+    missing = [field for field in spec['required'] if field not in mapping.values()]
+    if missing:
+        raise db.ValidationError(f"ustunlar topilmadi: {', '.join(missing)}")
+
+    for line_no, row in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in row):
+            continue
+        yield line_no, {field: row[position] for position, field in mapping.items() if position < len(row)}
+
+# ==================== LOADER ====================
+
+def _copy_chunk(cursor, spec, buffer):
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY import_staging ({', '.join(spec['columns'])}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer)
+
+def _flush(cursor, spec, user_id, buffer, totals):
+    _copy_chunk(cursor, spec, buffer)
+    for sql in spec['insert']:
+        cursor.execute(sql, {'user_id': user_id})
+    cursor.execute(spec['stats'])
+    delta = cursor.fetchone()
+    for key in totals:
+        totals[key] += delta[key]
+    cursor.execute('TRUNCATE import_staging')
+
+def _csv_value(value):
+    return '\\N' if value is None else value
+
+def import_file(kind, user_id, fileobj, filename='data.csv', error_writer=None, chunk_size=CHUNK_SIZE):
+    """Faylni import qilish. error_writer(line_no, error) berilsa, har bir xato unga yoziladi.
+
+    Qaytaradi: {'kind', 'imported', 'failed', 'errors': [...birinchi MAX_REPORTED_ERRORS...]}
+    """
+    if kind not in KINDS:
+        raise db.ValidationError(f"kind: {kind!r} ({', '.join(KINDS)})")
+    spec = KINDS[kind]
+    result = {'kind': kind, 'imported': 0, 'failed': 0, 'errors': []}
+    totals = {'income': 0, 'expense': 0, 'total': 0, 'active': 0}
+
+    with db.transaction() as cursor:
+        cursor.execute(f"CREATE TEMP TABLE import_staging ({spec['staging']}) ON COMMIT DROP")
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+        for line_no, record in iter_records(fileobj, filename, kind):
+            try:
+                values = spec['convert'](record)
+            except db.ValidationError as e:
+                result['failed'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    result['errors'].append({'line': line_no, 'error': str(e)})
+                if error_writer:
+                    error_writer(line_no, str(e))
+                continue
+            writer.writerow([_csv_value(value) for value in values])
+            pending += 1
+            if pending >= chunk_size:
+                _flush(cursor, spec, user_id, buffer, totals)
+                result['imported'] += pending
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if pending:
+            _flush(cursor, spec, user_id, buffer, totals)
+            result['imported'] += pending
+
+        if result['imported']:
+            db._bump_stats(cursor, user_id, income=totals['income'], expense=totals['expense'],
+                           total=totals['total'], active=totals['active'])
+            db._bump_versions(cursor, user_id, kind, 'finance')
+    if result['imported']:
+        db.snapshot_cache.invalidate(user_id)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV/XLSX dan ommaviy import (COPY orqali)')
+    parser.add_argument('kind', choices=sorted(KINDS))
+    parser.add_argument('path')
+    parser.add_argument('--user-id', type=int, required=True, help='fermer telegram_id si')
+    parser.add_argument('--errors', help='xatolar hisoboti (CSV) yoziladigan fayl')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    report = None
+    error_writer = None
+    if args.errors:
+        report = open(args.errors, 'w', newline='', encoding='utf-8')
+        report_csv = csv.writer(report)
+        report_csv.writerow(['line', 'error'])
+        error_writer = lambda line_no, error: report_csv.writerow([line_no, error])
+
+    try:
+        with open(args.path, 'rb') as fileobj:
+            result = import_file(args.kind, args.user_id, fileobj, os.path.basename(args.path),
+                                 error_writer=error_writer, chunk_size=args.chunk_size)
+    except db.ValidationError as e:
+        print(f'❌ {e}')
+        sys.exit(2)
+    finally:
+        if report:
+            report.close()
+
+    print(f"✅ {result['imported']} ta qator import qilindi, {result['failed']} ta xato")
+    if not args.errors:
+        for item in result['errors'][:20]:
+            print(f"  {item['line']}-qator: {item['error']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""Sxema migratsiyalari - deploy dan oldin bir marta ishga tushiriladi.
+
+    python migrate.py              # yangi migratsiyalarni qo'llash
+    python migrate.py --check      # faqat tekshirish (exit 1 - qo'llanmagan migratsiya bor)
+    python migrate.py --list       # holat
+    python migrate.py --target 3   # shu versiyagacha
+
+migrations/ dagi `NNNN_nom.sql` va `NNNN_nom.py` fayllar versiya tartibida qo'llanadi,
+qo'llanganlari `schema_version` jadvalida. Sxema yangi bo'lsa bitta SELECT bilan tugaydi.
+
+- .sql - butunlay bitta tranzaksiyada (versiya yozuvi bilan birga); birinchi qatori
+  `-- migrate: no-transaction` bo'lsa, har bir buyruq alohida (CREATE INDEX CONCURRENTLY uchun).
+- .py - `up(conn)`; `TRANSACTIONAL = False` bo'lsa tranzaksiyalarni migratsiyaning o'zi boshqaradi.
+
+Bir vaqtda bir nechta jarayon ishga tushsa, faqat bittasi migratsiya qiladi (pg_advisory_lock),
+qolganlari kutadi va keyin allaqachon qo'llanganlarini o'tkazib yuboradi. Kutish
+pg_try_advisory_lock + pauza bilan: uzoq kutayotgan so'rov CONCURRENTLY indeksni to'xtatib qo'yadi.
+Web (gunicorn app:app) va bot (python bot.py) ishga tushganda jadvallarga tegmaydi.
+"""
+import argparse
+import importlib.util
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+import psycopg2
+
+import database as db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+LOCK_KEY = 7_318_255_001          # pg_advisory_lock kaliti (shu loyiha migratsiyalari uchun)
+LOCK_POLL_INTERVAL = 0.5          # sekund
+NO_TRANSACTION = '-- migrate: no-transaction'
+
+Migration = namedtuple('Migration', 'version name path transactional')
+
+_FILENAME = re.compile(r'^(\d+)_(\w+)\.(sql|py)$')
+
+SCHEMA_VERSION_DDL = '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_ms INTEGER
+    )
+'''
+
+# ==================== DISCOVERY ====================
+
+def _load_module(path):
+    spec = importlib.util.spec_from_file_location(f'migration_{os.path.basename(path)[:-3]}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def discover(directory=MIGRATIONS_DIR):
+    """Versiya tartibidagi Migration lar; takroriy versiya - xato"""
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version, name, kind = int(match.group(1)), match.group(2), match.group(3)
+        if version in migrations:
+            raise RuntimeError(f'Takroriy migratsiya versiyasi {version}: {filename}')
+        path = os.path.join(directory, filename)
+        if kind == 'sql':
+            with open(path, encoding='utf-8') as f:
+                transactional = not f.readline().strip().lower().startswith(NO_TRANSACTION)
+        else:
+            transactional = getattr(_load_module(path), 'TRANSACTIONAL', True)
+        migrations[version] = Migration(version, name, path, transactional)
+    return [migrations[version] for version in sorted(migrations)]
+
+def split_statements(sql):
+    """SQL faylni alohida buyruqlarga (no-transaction rejimi uchun); $$ ichidagi ; hisobga olinmaydi"""
+    statements, current = [], []
+    for part in re.split(r'(;\s*(?:\n|$))', sql):
+        current.append(part)
+        text = ''.join(current)
+        if part.startswith(';') and text.count('$$') % 2 == 0:
+            statement = '\n'.join(line for line in text.strip().rstrip(';').splitlines()
+                                  if not line.strip().startswith('--')).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+    tail = '\n'.join(line for line in ''.join(current).splitlines() if not line.strip().startswith('--')).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+# ==================== HELPERS (migratsiya fayllari uchun) ====================
+
+def create_index_concurrently(conn, name, definition):
+    """CREATE INDEX CONCURRENTLY; avvalgi uzilgan urinishdan qolgan INVALID indeks qayta quriladi"""
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('''
+                SELECT i.indisvalid AS valid FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace
+            ''', (name,))
+            row = cursor.fetchone()
+            if row and row['valid']:
+                return False
+            if row:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            cursor.execute(f'CREATE INDEX CONCURRENTLY {name} ON {definition}')
+            return True
+    finally:
+        conn.autocommit = autocommit
+
+def drop_index_concurrently(conn, name):
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    finally:
+        conn.autocommit = autocommit
+
+# ==================== RUNNER ====================
+
+def _state(cursor):
+    """(eng katta versiya, qo'llanganlar soni) - bitta so'rov; jadval yo'q bo'lsa (0, 0)"""
+    try:
+        cursor.execute('SELECT COALESCE(MAX(version), 0) AS version, COUNT(*) AS applied FROM schema_version')
+    except psycopg2.errors.UndefinedTable:
+        return 0, 0
+    row = cursor.fetchone()
+    return row['version'], row['applied']
+
+def _is_current(state, migrations):
+    version, applied = state
+    return applied == len(migrations) and version == (migrations[-1].version if migrations else 0)
+
+def _acquire_lock(cursor, log):
+    cursor.execute('SELECT pg_try_advisory_lock(%s) AS locked', (LOCK_KEY,))
+    if cursor.fetchone()['locked']:
+        return
+    log('⏳ Boshqa jarayon migratsiya qilmoqda, kutilmoqda...')
+    while True:
+        time.sleep(LOCK_POLL_INTERVAL)
+        cursor.execute('SELECT pg_try_advisory_lock(%s) AS locked', (LOCK_KEY,))
+        if cursor.fetchone()['locked']:
+            return
+
+def _apply(conn, migration):
+    start = time.perf_counter()
+    sql = None
+    if migration.path.endswith('.sql'):
+        with open(migration.path, encoding='utf-8') as f:
+            sql = f.read()
+    if sql is not None and not migration.transactional:
+        with conn.cursor() as cursor:
+            for statement in split_statements(sql):
+                cursor.execute(statement)
+    conn.autocommit = False
+    if sql is not None and migration.transactional:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+    elif sql is None:
+        _load_module(migration.path).up(conn)
+        if not migration.transactional:
+            conn.commit()
+
+    with conn.cursor() as cursor:
+        # Tranzaksiyali migratsiyada versiya yozuvi o'zgarishlar bilan bitta commit da
+        cursor.execute('INSERT INTO schema_version (version, name, duration_ms) VALUES (%s, %s, %s)',
+                       (migration.version, migration.name, int((time.perf_counter() - start) * 1000)))
+    conn.commit()
+
+def migrate(target=None, log=print):
+    """Qo'llanmagan migratsiyalarni qo'llash; qo'llanganlar ro'yxatini qaytaradi"""
+    migrations = [m for m in discover() if target is None or m.version <= target]
+    conn = db.get_db_connection()
+    # Lock ulanishi tranzaksiyasiz turadi - CONCURRENTLY uni kutmaydi
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            if _is_current(_state(cursor), migrations):
+                return []
+            _acquire_lock(cursor, log)
+        applied_now = []
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(SCHEMA_VERSION_DDL)
+                cursor.execute('SELECT version FROM schema_version')
+                applied = {row['version'] for row in cursor.fetchall()}
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                log(f'→ {migration.version:04d}_{migration.name}')
+                try:
+                    _apply(conn, migration)
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.autocommit = True
+                applied_now.append(migration)
+        finally:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', (LOCK_KEY,))
+        return applied_now
+    finally:
+        conn.close()
+
+def pending(target=None):
+    """Qo'llanmagan migratsiyalar (lock olinmaydi)"""
+    migrations = [m for m in discover() if target is None or m.version <= target]
+    conn = db.get_db_connection()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            if _is_current(_state(cursor), migrations):
+                return []
+            try:
+                cursor.execute('SELECT version FROM schema_version')
+                applied = {row['version'] for row in cursor.fetchall()}
+            except psycopg2.errors.UndefinedTable:
+                applied = set()
+        return [m for m in migrations if m.version not in applied]
+    finally:
+        conn.close()
+
+# ==================== CLI ====================
+
+def main():
+    parser = argparse.ArgumentParser(description='Sxema migratsiyalari')
+    parser.add_argument('--check', action='store_true', help="qo'llanmagan migratsiya bo'lsa exit 1")
+    parser.add_argument('--list', action='store_true', help="migratsiyalar holati")
+    parser.add_argument('--target', type=int, help='shu versiyagacha')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        if args.check or args.list:
+            waiting = {m.version for m in pending(args.target)}
+            if args.list:
+                for m in discover():
+                    mark = '⏳' if m.version in waiting else '✅'
+                    kind = '' if m.transactional else ' (no-transaction)'
+                    print(f'{mark} {m.version:04d}_{m.name}{kind}')
+            if waiting:
+                print(f"⚠️  {len(waiting)} ta migratsiya qo'llanmagan")
+                sys.exit(1)
+            print('✅ Sxema yangi')
+            return
+        applied = migrate(args.target)
+    except Exception as e:
+        print(f'❌ Migratsiya xatosi: {e}')
+        sys.exit(1)
+    status = f"{len(applied)} ta migratsiya qo'llandi" if applied else 'sxema yangi'
+    print(f'✅ {status} ({time.perf_counter() - start:.2f}s)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""TEXT sanalar va REAL summalarni DATE / NUMERIC ga o'tkazish (online migratsiya).
+
+    python migrate_types.py [--batch-size 5000] [--pause 0.05]
+
+Har bir jadval uchun:
+  1. yangi `<ustun>__new` ustunlar qo'shiladi (faqat metadata, tez);
+  2. trigger yangi/yangilangan qatorlarni sinxron saqlaydi;
+  3. mavjud qatorlar id oraliqlari bo'yicha kichik tranzaksiyalarda yoziladi;
+  4. indekslar yangi ustunlarda CONCURRENTLY quriladi, NOT NULL
+     NOT VALID check + VALIDATE orqali tekshiriladi (yozishlarni bloklamaydi);
+  5. qisqa ACCESS EXCLUSIVE lock ichida ustunlar almashtiriladi.
+
+Qayta ishga tushirish xavfsiz: allaqachon o'tkazilgan ustunlar o'tkazib yuboriladi.
+Odatda migrations/0002_typed_columns.py orqali (python migrate.py) ishga tushadi.
+"""
+import argparse
+import re
+import time
+
+import psycopg2
+
+import database as db
+
+DATE = 'DATE'
+MONEY = 'NUMERIC(14, 2)'
+QUANTITY = 'NUMERIC(12, 3)'
+
+# jadval -> {ustun: (yangi tur, NOT NULL)}
+TYPED_COLUMNS = {
+    'animals': {
+        'birth_date': (DATE, False),
+        'purchase_date': (DATE, True),
+        'purchase_price': (MONEY, True),
+    },
+    'sales': {
+        'sale_date': (DATE, True),
+        'sale_price': (MONEY, True),
+    },
+    'feed': {
+        'feed_date': (DATE, True),
+        'quantity': (QUANTITY, True),
+        'unit_price': (MONEY, True),
+    },
+    'vaccinations': {
+        'vaccination_date': (DATE, True),
+        'next_date': (DATE, False),
+        'cost': (MONEY, False),
+    },
+    'finance': {
+        'date': (DATE, True),
+        'amount': (MONEY, True),
+    },
+}
+
+TRY_DATE_FUNCTION = '''
+    CREATE OR REPLACE FUNCTION chorva_try_date(value TEXT) RETURNS DATE AS $$
+    BEGIN
+        RETURN NULLIF(btrim(value), '')::date;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql IMMUTABLE
+'''
+
+def _convert_expr(column, target, source='{col}'):
+    expr = source.format(col=column)
+    if target == DATE:
+        return f'chorva_try_date({expr}::text)'
+    return f'ROUND({expr}::numeric, {3 if target == QUANTITY else 2})'
+
+def _column_types(cursor, table):
+    cursor.execute('''
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+    ''', (table,))
+    return {row['column_name']: row['data_type'] for row in cursor.fetchall()}
+
+def _pending_columns(cursor, table):
+    types = _column_types(cursor, table)
+    pending = {}
+    for column, (target, not_null) in TYPED_COLUMNS[table].items():
+        current = types.get(column)
+        wanted = 'date' if target == DATE else 'numeric'
+        if current and current != wanted:
+            pending[column] = (target, not_null)
+    return pending
+
+def _affected_indexes(cursor, table, columns):
+    """Jadvaldagi shu ustunlarga tayangan indekslar (pg_indexes) -> yangi ustunli ta'rif"""
+    cursor.execute('''
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = %s
+          AND indexname NOT LIKE '%%\\_pkey' AND indexname NOT LIKE '%%\\_\\_new'
+    ''', (table,))
+    affected = {}
+    for row in cursor.fetchall():
+        # "CREATE INDEX nom ON public.jadval USING btree (...)" -> "public.jadval USING btree (...)"
+        definition = row['indexdef'].split(' ON ', 1)[1]
+        new_definition = definition
+        for column in columns:
+            new_definition = re.sub(rf'\b{column}\b', f'{column}__new', new_definition)
+        if new_definition != definition:
+            affected[row['indexname']] = new_definition
+    return affected
+
+def _prepare(conn, table, pending):
+    with conn.cursor() as cursor:
+        cursor.execute(TRY_DATE_FUNCTION)
+        for column, (target, _) in pending.items():
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}__new {target}')
+        assignments = '\n'.join(
+            f'    NEW.{column}__new := {_convert_expr(column, target, "NEW.{col}")};'
+            for column, (target, _) in pending.items()
+        )
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION chorva_sync_{table}() RETURNS trigger AS $$
+            BEGIN
+            {assignments}
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute(f'DROP TRIGGER IF EXISTS chorva_sync_{table} ON {table}')
+        cursor.execute(f'''
+            CREATE TRIGGER chorva_sync_{table} BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION chorva_sync_{table}()
+        ''')
+    conn.commit()
+
+def _backfill(conn, table, pending, batch_size, pause):
+    assignments = ', '.join(f'{column}__new = {_convert_expr(column, target)}'
+                            for column, (target, _) in pending.items())
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT COALESCE(MIN(id), 0) AS lo, COALESCE(MAX(id), 0) AS hi FROM {table}')
+        bounds = cursor.fetchone()
+    conn.commit()
+    low, high = bounds['lo'], bounds['hi']
+    done = 0
+    while low <= high and high:
+        with conn.cursor() as cursor:
+            cursor.execute(f'UPDATE {table} SET {assignments} WHERE id >= %s AND id < %s',
+                           (low, low + batch_size))
+            done += cursor.rowcount
+        conn.commit()
+        low += batch_size
+        if pause:
+            time.sleep(pause)
+    return done
+
+def _check_unconvertible(conn, table, pending):
+    bad = {}
+    with conn.cursor() as cursor:
+        for column in pending:
+            cursor.execute(f'''
+                SELECT id, {column}::text AS value FROM {table}
+                WHERE NULLIF(btrim({column}::text), '') IS NOT NULL AND {column}__new IS NULL
+                ORDER BY id LIMIT 20
+            ''')
+            rows = cursor.fetchall()
+            if rows:
+                bad[column] = [(row['id'], row['value']) for row in rows]
+    conn.commit()
+    return bad
+
+def _build_indexes_and_checks(conn, table, pending):
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            for name, definition in _affected_indexes(cursor, table, pending).items():
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}__new')
+                cursor.execute(f'CREATE INDEX CONCURRENTLY {name}__new ON {definition}')
+            for column, (_, not_null) in pending.items():
+                if not not_null:
+                    continue
+                constraint = f'{table}_{column}__new_not_null'
+                cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}')
+                cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {constraint} '
+                               f'CHECK ({column}__new IS NOT NULL) NOT VALID')
+                # VALIDATE faqat SHARE UPDATE EXCLUSIVE oladi - yozishlar davom etadi
+                cursor.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+    finally:
+        conn.autocommit = False
+
+def _swap(conn, table, pending, lock_timeout, attempts=10):
+    with conn.cursor() as cursor:
+        affected = _affected_indexes(cursor, table, pending)
+    conn.commit()
+    for attempt in range(1, attempts + 1):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SET LOCAL lock_timeout = '{int(lock_timeout * 1000)}ms'")
+                cursor.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+                cursor.execute(f'DROP TRIGGER IF EXISTS chorva_sync_{table} ON {table}')
+                cursor.execute(f'DROP FUNCTION IF EXISTS chorva_sync_{table}()')
+                for column, (_, not_null) in pending.items():
+                    cursor.execute(f'ALTER TABLE {table} DROP COLUMN {column}')
+                    cursor.execute(f'ALTER TABLE {table} RENAME COLUMN {column}__new TO {column}')
+                    if not_null:
+                        # Validatsiya qilingan CHECK tufayli jadval qayta skanerlanmaydi
+                        cursor.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+                        cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT {table}_{column}__new_not_null')
+                for name in affected:
+                    cursor.execute(f'ALTER INDEX {name}__new RENAME TO {name}')
+            conn.commit()
+            return
+        except psycopg2.errors.LockNotAvailable:
+            conn.rollback()
+            print(f'  {table}: lock olinmadi, qayta urinish {attempt}/{attempts}')
+            time.sleep(min(attempt, 5))
+    raise RuntimeError(f'{table}: ustunlarni almashtirish uchun lock olinmadi')
+
+def migrate_table(conn, table, batch_size=5000, pause=0.0, lock_timeout=3.0):
+    with conn.cursor() as cursor:
+        pending = _pending_columns(cursor, table)
+    conn.commit()
+    if not pending:
+        return False
+
+    print(f'{table}: {", ".join(pending)} -> DATE/NUMERIC')
+    _prepare(conn, table, pending)
+    rows = _backfill(conn, table, pending, batch_size, pause)
+    print(f'  {rows} qator yozildi')
+
+    bad = _check_unconvertible(conn, table, pending)
+    if bad:
+        for column, samples in bad.items():
+            print(f'  {table}.{column}: o\'qib bo\'lmaydigan qiymatlar (id, qiymat): {samples}')
+        raise RuntimeError(f"{table}: qiymatlarni tuzatib, migratsiyani qayta ishga tushiring")
+
+    _build_indexes_and_checks(conn, table, pending)
+    _swap(conn, table, pending, lock_timeout)
+    print(f'  {table}: tayyor')
+    return True
+
+def migrate(batch_size=5000, pause=0.0, lock_timeout=3.0):
+    """Barcha jadvallarni o'tkazish; nechta jadval o'zgarganini qaytaradi"""
+    conn = db.get_db_connection()
+    try:
+        changed = 0
+        for table in TYPED_COLUMNS:
+            changed += migrate_table(conn, table, batch_size, pause, lock_timeout)
+        return changed
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='TEXT/REAL ustunlarni DATE/NUMERIC ga o\'tkazish')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--pause', type=float, default=0.0, help='batchlar orasidagi pauza (sekund)')
+    parser.add_argument('--lock-timeout', type=float, default=3.0)
+    args = parser.parse_args()
+    changed = migrate(args.batch_size, args.pause, args.lock_timeout)
+    print(f'✅ Migratsiya tugadi ({changed} ta jadval o\'zgardi)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+-- Boshlang'ich sxema (avvalgi init_db jadvallari). IF NOT EXISTS - mavjud bazalarda hech narsa o'zgarmaydi.
+
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    telegram_id BIGINT UNIQUE NOT NULL,
+    username TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    phone TEXT,
+    full_name TEXT,
+    language TEXT DEFAULT 'uz',
+    registered_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Animals table
+CREATE TABLE IF NOT EXISTS animals (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    type TEXT NOT NULL,
+    breed TEXT,
+    gender TEXT,
+    birth_date DATE,
+    weight REAL,
+    purchase_price NUMERIC(14, 2) NOT NULL,
+    purchase_date DATE NOT NULL,
+    status TEXT DEFAULT 'active',
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(telegram_id)
+);
+
+-- Butchers table
+CREATE TABLE IF NOT EXISTS butchers (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    address TEXT,
+    experience INTEGER,
+    notes TEXT,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Sales table
+CREATE TABLE IF NOT EXISTS sales (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    animal_id INTEGER NOT NULL,
+    butcher_id INTEGER,
+    sale_date DATE NOT NULL,
+    sale_price NUMERIC(14, 2) NOT NULL,
+    buyer_name TEXT,
+    buyer_phone TEXT,
+    payment_type TEXT DEFAULT 'cash',
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(telegram_id),
+    FOREIGN KEY (animal_id) REFERENCES animals(id) ON DELETE CASCADE,
+    FOREIGN KEY (butcher_id) REFERENCES butchers(id) ON DELETE SET NULL
+);
+
+-- Feed table
+CREATE TABLE IF NOT EXISTS feed (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    quantity NUMERIC(12, 3) NOT NULL,
+    unit_price NUMERIC(14, 2) NOT NULL,
+    supplier TEXT,
+    feed_date DATE NOT NULL,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(telegram_id)
+);
+
+-- Vaccinations table
+CREATE TABLE IF NOT EXISTS vaccinations (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    animal_id INTEGER NOT NULL,
+    vaccine_name TEXT NOT NULL,
+    vaccination_date DATE NOT NULL,
+    next_date DATE,
+    veterinarian TEXT,
+    cost NUMERIC(14, 2),
+    reminder_sent BOOLEAN NOT NULL DEFAULT FALSE,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(telegram_id),
+    FOREIGN KEY (animal_id) REFERENCES animals(id) ON DELETE CASCADE
+);
+-- next_date eslatmasi yuborilganmi (next_date o'zgarsa qayta FALSE bo'ladi)
+ALTER TABLE vaccinations ADD COLUMN IF NOT EXISTS reminder_sent BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Finance table
+CREATE TABLE IF NOT EXISTS finance (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    type TEXT NOT NULL,
+    amount NUMERIC(14, 2) NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT,
+    date DATE NOT NULL,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(telegram_id)
+);
+
+-- User stats table - har bir yozishda shu tranzaksiyada yangilanadigan yig'indilar
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id BIGINT PRIMARY KEY,
+    income NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    expense NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    animals_total INTEGER NOT NULL DEFAULT 0,
+    animals_active INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(telegram_id) ON DELETE CASCADE
+);
+
+-- Broadcasts table - admin xabarlari; last_telegram_id gacha yuborilgan (qayta ishga tushganda davom etadi)
+CREATE TABLE IF NOT EXISTS broadcasts (
+    id SERIAL PRIMARY KEY,
+    text TEXT NOT NULL,
+    created_by BIGINT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    last_telegram_id BIGINT NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    sent INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_date TIMESTAMP
+);
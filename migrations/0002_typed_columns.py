@@ -0,0 +1,12 @@
+"""TEXT sanalar / REAL summalar -> DATE / NUMERIC (eski bazalar uchun, yangisida hech narsa qilmaydi).
+
+migrate_types.py dagi online migratsiya: bo'laklab yozish, CONCURRENTLY indekslar va qisqa lock.
+Tranzaksiyalarni o'zi boshqaradi.
+"""
+import migrate_types
+
+TRANSACTIONAL = False
+
+def up(conn):
+    for table in migrate_types.TYPED_COLUMNS:
+        migrate_types.migrate_table(conn, table)
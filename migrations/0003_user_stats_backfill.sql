@@ -0,0 +1,17 @@
+-- user_stats qatori yo'q foydalanuvchilar uchun yig'indilarni hisoblash (user_stats jadvali keyinroq qo'shilgan)
+INSERT INTO user_stats (user_id, income, expense, animals_total, animals_active)
+SELECT u.telegram_id,
+       COALESCE(f.income, 0), COALESCE(f.expense, 0),
+       COALESCE(a.total, 0), COALESCE(a.active, 0)
+FROM users u
+LEFT JOIN LATERAL (
+    SELECT SUM(amount) FILTER (WHERE type = 'income') AS income,
+           SUM(amount) FILTER (WHERE type = 'expense') AS expense
+    FROM finance WHERE user_id = u.telegram_id
+) f ON TRUE
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE status = 'active') AS active
+    FROM animals WHERE user_id = u.telegram_id
+) a ON TRUE
+WHERE NOT EXISTS (SELECT 1 FROM user_stats s WHERE s.user_id = u.telegram_id)
+ON CONFLICT (user_id) DO NOTHING;
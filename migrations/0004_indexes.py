@@ -0,0 +1,48 @@
+"""Har bir foydalanuvchi so'rovi (user_id bo'yicha filtr + sana bo'yicha tartib) uchun indekslar.
+
+Tartib ustunlari getterlardagi ORDER BY bilan bir xil, shuning uchun sort bosqichi kerak emas.
+CONCURRENTLY - katta jadvallarda yozishlar bloklanmaydi.
+"""
+from migrate import create_index_concurrently, drop_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = {
+    # get_animals: WHERE user_id ORDER BY created_date DESC
+    'idx_animals_user_created': 'animals (user_id, created_date DESC, id DESC)',
+    # get_animals_stats: COUNT(*) ... AND status = 'active' (index-only scan);
+    # bot hayvonlar ro'yxati holat filtri bilan: WHERE user_id AND status ORDER BY created_date DESC
+    'idx_animals_user_status_created': 'animals (user_id, status, created_date DESC, id DESC)',
+    # bot hayvonlar ro'yxati tur filtri bilan va turlar ro'yxati (GROUP BY type)
+    'idx_animals_user_type_created': 'animals (user_id, type, created_date DESC, id DESC)',
+    # get_finance: WHERE user_id ORDER BY date DESC
+    'idx_finance_user_date': 'finance (user_id, date DESC, id DESC)',
+    # get_finance_stats: SUM(amount) WHERE user_id AND type (covering, jadvalga murojaatsiz)
+    'idx_finance_user_type': 'finance (user_id, type) INCLUDE (amount)',
+    # get_feed: WHERE user_id ORDER BY feed_date DESC
+    'idx_feed_user_date': 'feed (user_id, feed_date DESC, id DESC)',
+    # get_vaccinations: WHERE v.user_id ORDER BY v.vaccination_date DESC
+    'idx_vaccinations_user_date': 'vaccinations (user_id, vaccination_date DESC, id DESC)',
+    # animals o'chirilganda ON DELETE CASCADE
+    'idx_vaccinations_animal': 'vaccinations (animal_id)',
+    # reminders: hali eslatilmagan next_date lar, fermer bo'yicha guruhlab o'qish uchun (user_id, id) tartibida
+    # (0007 da next_date kalitli idx_vaccinations_reminders_due bilan almashtirilgan)
+    'idx_vaccinations_reminders': 'vaccinations (user_id, id) INCLUDE (next_date) '
+                                  'WHERE next_date IS NOT NULL AND NOT reminder_sent',
+    # get_sales: WHERE s.user_id ORDER BY s.sale_date DESC
+    'idx_sales_user_date': 'sales (user_id, sale_date DESC, id DESC)',
+    # animals/butchers o'chirilganda CASCADE / SET NULL
+    'idx_sales_animal': 'sales (animal_id)',
+    'idx_sales_butcher': 'sales (butcher_id)',
+    # get_butchers: ORDER BY created_date DESC
+    'idx_butchers_created': 'butchers (created_date DESC, id DESC)',
+}
+
+# idx_animals_user_status_created bilan almashtirilgan (prefiksi bir xil)
+DROPPED_INDEXES = ('idx_animals_user_status',)
+
+def up(conn):
+    for name, definition in INDEXES.items():
+        create_index_concurrently(conn, name, definition)
+    for name in DROPPED_INDEXES:
+        drop_index_concurrently(conn, name)
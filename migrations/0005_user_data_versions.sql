@@ -0,0 +1,11 @@
+-- Foydalanuvchi ma'lumotlari versiyalari (GET /api/* ETag). Har bir yozish shu tranzaksiyada
+-- resurs versiyasini umumiy sequence dan yangi qiymatga o'zgartiradi - qiymatlar hech qachon takrorlanmaydi.
+CREATE SEQUENCE IF NOT EXISTS user_data_version_seq;
+
+-- user_id = 0 - barcha foydalanuvchilar uchun umumiy resurslar (butchers)
+CREATE TABLE IF NOT EXISTS user_data_versions (
+    user_id BIGINT NOT NULL,
+    resource TEXT NOT NULL,
+    version BIGINT NOT NULL,
+    PRIMARY KEY (user_id, resource)
+);
@@ -0,0 +1,23 @@
+"""Sotuvlar tahlili (get_sales_analytics) uchun covering indeks.
+
+user_id + sana oralig'i bo'yicha o'qiladi, JOIN va SUM uchun kerakli ustunlar INCLUDE da -
+sales jadvaliga murojaat qilinmaydi (index-only scan). Tartibi idx_sales_user_date bilan bir xil,
+shuning uchun get_sales ham shu indeksdan foydalanadi va eskisi o'chiriladi.
+"""
+from migrate import create_index_concurrently, drop_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = {
+    # get_sales: WHERE s.user_id ORDER BY s.sale_date DESC;
+    # get_sales_analytics: WHERE s.user_id AND s.sale_date BETWEEN ... -> animal_id, butcher_id, sale_price
+    'idx_sales_user_date_cover': 'sales (user_id, sale_date DESC, id DESC) INCLUDE (animal_id, butcher_id, sale_price)',
+}
+
+DROPPED_INDEXES = ('idx_sales_user_date',)
+
+def up(conn):
+    for name, definition in INDEXES.items():
+        create_index_concurrently(conn, name, definition)
+    for name in DROPPED_INDEXES:
+        drop_index_concurrently(conn, name)
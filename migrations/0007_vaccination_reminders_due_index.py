@@ -0,0 +1,24 @@
+"""Eslatmalar indeksi muddat bo'yicha (idx_vaccinations_reminders o'rniga).
+
+claim_due_vaccinations: WHERE NOT reminder_sent AND next_date <= bugun. Eski indeks (user_id, id)
+kalitli edi - muddati hali kelmagan barcha eslatilmagan qatorlar ham o'qilardi. Endi next_date
+oralig'i indeksdan olinadi; (user_id, id) tartibi faqat muddati yetganlar ichida saralanadi
+(ular band qilingach indeksdan chiqadi, shuning uchun bu to'plam kichik). user_id, id kalitda -
+CTE jadvalga murojaatsiz (index-only scan).
+"""
+from migrate import create_index_concurrently, drop_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = {
+    'idx_vaccinations_reminders_due': 'vaccinations (next_date, user_id, id) '
+                                      'WHERE next_date IS NOT NULL AND NOT reminder_sent',
+}
+
+DROPPED_INDEXES = ('idx_vaccinations_reminders',)
+
+def up(conn):
+    for name, definition in INDEXES.items():
+        create_index_concurrently(conn, name, definition)
+    for name in DROPPED_INDEXES:
+        drop_index_concurrently(conn, name)
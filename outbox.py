@@ -0,0 +1,253 @@
+"""Botdan chiquvchi xabarlar navbati va admin broadcast.
+
+Barcha ommaviy xabarlar (eslatmalar, broadcast) shu navbat orqali yuboriladi:
+  - umumiy token bucket (OUTBOX_RATE xabar/sekund, Telegram limiti ~30);
+  - har bir chat uchun token bucket (OUTBOX_CHAT_RATE, Telegram: ~1 xabar/sekund);
+  - OUTBOX_SENDERS ta parallel yuboruvchi;
+  - 429 (RetryAfter) kelsa barcha yuboruvchilar retry_after davomida to'xtaydi va xabar qayta yuboriladi;
+  - boshqa vaqtinchalik xatolar (tarmoq, 5xx) - xabar eksponensial pauza bilan qayta yuboriladi,
+    OUTBOX_MAX_ATTEMPTS urinishdan keyin FAILED.
+
+Broadcast holati `broadcasts` jadvalida: foydalanuvchilar telegram_id bo'yicha
+sahifalab yuboriladi va har bir sahifadan keyin last_telegram_id saqlanadi,
+shuning uchun qayta ishga tushganda to'xtagan joyidan davom etadi.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import timedelta
+
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+import database_async as adb
+
+OUTBOX_RATE = float(os.environ.get('OUTBOX_RATE', 25))
+OUTBOX_CHAT_RATE = float(os.environ.get('OUTBOX_CHAT_RATE', 1))
+OUTBOX_SENDERS = int(os.environ.get('OUTBOX_SENDERS', 8))
+OUTBOX_QUEUE_SIZE = int(os.environ.get('OUTBOX_QUEUE_SIZE', 1000))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_BACKOFF = float(os.environ.get('OUTBOX_BACKOFF', 1))          # birinchi qayta urinishdan oldin, sekund
+OUTBOX_BACKOFF_MAX = float(os.environ.get('OUTBOX_BACKOFF_MAX', 60))  # pauza shundan oshmaydi
+BROADCAST_PAGE = int(os.environ.get('BROADCAST_PAGE', 500))
+BROADCAST_CHECKPOINT = int(os.environ.get('BROADCAST_CHECKPOINT', 50))   # shuncha xabardan keyin holat saqlanadi
+
+# Yuborish natijalari
+SENT = 'sent'
+BLOCKED = 'blocked'   # foydalanuvchi botni bloklagan / chat yo'q - qayta urinilmaydi
+FAILED = 'failed'
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """rate token/sekund, eng ko'pi capacity token (bitta event loop ichida ishlatiladi)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class Outbox:
+    def __init__(self, rate=OUTBOX_RATE, chat_rate=OUTBOX_CHAT_RATE, senders=OUTBOX_SENDERS,
+                 maxsize=OUTBOX_QUEUE_SIZE, max_attempts=OUTBOX_MAX_ATTEMPTS,
+                 backoff=OUTBOX_BACKOFF, backoff_max=OUTBOX_BACKOFF_MAX):
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self.senders = senders
+        self.maxsize = maxsize
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.bot = None
+        self.queue = None
+        self._bucket = None
+        self._chat_buckets = {}
+        self._paused_until = 0.0
+        self._tasks = []
+        self.counters = {SENT: 0, BLOCKED: 0, FAILED: 0, 'retried': 0}
+
+    async def start(self, bot):
+        if self._tasks:
+            return
+        self.bot = bot
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self._bucket = TokenBucket(self.rate)
+        self._tasks = [asyncio.create_task(self._sender(), name=f'outbox-{i}') for i in range(self.senders)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, chat_id, text, **kwargs):
+        """Xabarni navbatga qo'yish (navbat to'la bo'lsa kutadi); natija uchun Future qaytaradi"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((chat_id, text, kwargs, future, 1))
+        return future
+
+    async def send(self, chat_id, text, **kwargs):
+        """Navbat orqali yuborish va natijani (SENT / BLOCKED / FAILED) kutish"""
+        return await (await self.enqueue(chat_id, text, **kwargs))
+
+    def stats(self):
+        return {**self.counters, 'queued': self.queue.qsize() if self.queue else 0,
+                'chats': len(self._chat_buckets)}
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) > 10000:
+                # To'lgan (bo'sh turgan) chatlar bucketlarini tozalash
+                self._chat_buckets = {k: v for k, v in self._chat_buckets.items() if not v.is_full()}
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, capacity=1)
+        return bucket
+
+    async def _sender(self):
+        while True:
+            chat_id, text, kwargs, future, attempt = await self.queue.get()
+            try:
+                result = await self._deliver(chat_id, text, kwargs, attempt)
+                while result is None:
+                    # Qayta urinish shu yuboruvchida (to'la navbatga qaytarish deadlock berishi mumkin)
+                    self.counters['retried'] += 1
+                    attempt += 1
+                    result = await self._deliver(chat_id, text, kwargs, attempt)
+                self.counters[result] += 1
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            finally:
+                self.queue.task_done()
+
+    def _backoff(self, attempt):
+        """attempt-urinishdan keyingi pauza: backoff * 2^(attempt-1), jitter bilan (0.5x-1x)"""
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1)
+
+    async def _deliver(self, chat_id, text, kwargs, attempt):
+        """SENT / BLOCKED / FAILED yoki None (qayta urinish kerak)"""
+        await self._chat_bucket(chat_id).acquire()
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        await self._bucket.acquire()
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            return SENT
+        except RetryAfter as e:
+            delay = e.retry_after
+            delay = delay.total_seconds() if isinstance(delay, timedelta) else float(delay)
+            # 429 butun bot uchun - barcha yuboruvchilar kutadi
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            logger.warning("Telegram 429: %.1f sekund kutiladi", delay)
+        except Forbidden:
+            return BLOCKED
+        except TelegramError as e:
+            if 'chat not found' in str(e).lower():
+                return BLOCKED
+            logger.warning("Xabar yuborilmadi (%s, urinish %s): %s", chat_id, attempt, e)
+            if attempt < self.max_attempts:
+                # Faqat shu xabar kutadi (boshqa yuboruvchilar ishlashda davom etadi)
+                await asyncio.sleep(self._backoff(attempt))
+        return None if attempt < self.max_attempts else FAILED
+
+_outbox = Outbox()
+
+async def start(bot):
+    """Navbatni ishga tushirish va tugallanmagan broadcastlarni davom ettirish (post_init)"""
+    await _outbox.start(bot)
+    await resume_broadcasts()
+
+async def stop():
+    await stop_broadcasts()
+    await _outbox.stop()
+
+async def enqueue(chat_id, text, **kwargs):
+    return await _outbox.enqueue(chat_id, text, **kwargs)
+
+async def send(chat_id, text, **kwargs):
+    return await _outbox.send(chat_id, text, **kwargs)
+
+def stats():
+    return _outbox.stats()
+
+# ==================== BROADCAST ====================
+
+_running = {}
+
+async def run_broadcast(broadcast_id, page_size=BROADCAST_PAGE):
+    """Broadcastni last_telegram_id dan davom ettirish; yakuniy yozuvni qaytaradi"""
+    broadcast = await adb.get_broadcast(broadcast_id)
+    after, sent, failed = broadcast['last_telegram_id'], broadcast['sent'], broadcast['failed']
+    while True:
+        user_ids = await adb.get_user_ids_after(after, page_size)
+        if not user_ids:
+            break
+        futures = [await enqueue(user_id, broadcast['text']) for user_id in user_ids]
+        # Natijalar tartib bilan kutiladi: saqlangan last_telegram_id gacha hammasi yakunlangan,
+        # shuning uchun uzilishda ko'pi bilan BROADCAST_CHECKPOINT ta xabar qayta yuboriladi
+        for done, (user_id, future) in enumerate(zip(user_ids, futures), start=1):
+            if await future == SENT:
+                sent += 1
+            else:
+                failed += 1
+            after = user_id
+            if done % BROADCAST_CHECKPOINT == 0:
+                await adb.save_broadcast_progress(broadcast_id, after, sent, failed)
+        await adb.save_broadcast_progress(broadcast_id, after, sent, failed)
+    await adb.save_broadcast_progress(broadcast_id, after, sent, failed, status='done')
+    logger.info("Broadcast #%s tugadi: %s yuborildi, %s xato", broadcast_id, sent, failed)
+    await send(broadcast['created_by'], f"📣 Broadcast #{broadcast_id}: ✅ {sent}, ❌ {failed}")
+    return await adb.get_broadcast(broadcast_id)
+
+def start_broadcast(broadcast_id):
+    """Fon vazifasi sifatida ishga tushirish (bir broadcast uchun bitta vazifa)"""
+    task = _running.get(broadcast_id)
+    if task is None or task.done():
+        task = _running[broadcast_id] = asyncio.create_task(_run_logged(broadcast_id), name=f'broadcast-{broadcast_id}')
+    return task
+
+async def _run_logged(broadcast_id):
+    try:
+        await run_broadcast(broadcast_id)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Broadcast #%s xato bilan to'xtadi (keyingi ishga tushirishda davom etadi)", broadcast_id)
+    finally:
+        _running.pop(broadcast_id, None)
+
+async def resume_broadcasts():
+    """Bot qayta ishga tushganda tugallanmagan broadcastlarni davom ettirish"""
+    for broadcast in await adb.get_running_broadcasts():
+        logger.info("Broadcast #%s davom ettirilmoqda (telegram_id > %s)", broadcast['id'], broadcast['last_telegram_id'])
+        start_broadcast(broadcast['id'])
+
+async def stop_broadcasts():
+    tasks = list(_running.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,29 @@
+"""user_stats jadvalini noldan qayta hisoblash va farqlarni ko'rsatish.
+
+    python reconcile_stats.py              # barcha foydalanuvchilar
+    python reconcile_stats.py --user 12345 # bitta foydalanuvchi
+
+Farq topilsa, qiymatlar to'g'rilanadi va exit code 1 qaytadi (monitoring uchun).
+"""
+import argparse
+import sys
+
+import database as db
+
+def main():
+    parser = argparse.ArgumentParser(description="user_stats ni qayta hisoblash")
+    parser.add_argument('--user', type=int, help='faqat shu telegram_id uchun')
+    args = parser.parse_args()
+
+    drift = db.rebuild_user_stats(args.user)
+    for item in drift:
+        changes = ', '.join(f'{field}: {old} -> {new}' for field, (old, new) in item['diff'].items())
+        print(f"⚠️  user {item['user_id']}: {changes}")
+
+    if drift:
+        print(f'{len(drift)} ta foydalanuvchida farq topildi va tuzatildi')
+        sys.exit(1)
+    print('✅ user_stats to\'g\'ri')
+
+if __name__ == '__main__':
+    main()
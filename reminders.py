@@ -0,0 +1,99 @@
+"""Vaksinatsiya eslatmalari: next_date yetgan yozuvlar bo'yicha har bir fermerga bitta xabar.
+
+Bot JobQueue da har REMINDER_INTERVAL sekundda ishlaydi. Yozuvlar REMINDER_BATCH
+lik bo'laklarda (user_id, id) tartibida band qilinadi (database_async.claim_due_vaccinations),
+bo'lak chegarasida qolgan fermerning yozuvlari keyingi bo'lak bilan birlashtiriladi.
+Xabarlar outbox navbati orqali (Telegram limitlari shu yerda) yuboriladi,
+yuborib bo'lmagan eslatmalar keyingi ishga tushirishga qaytariladi.
+"""
+import asyncio
+import logging
+from datetime import date, timedelta
+
+import database_async as adb
+import outbox
+from i18n import t
+from config import REMINDER_INTERVAL, REMINDER_DAYS_AHEAD, REMINDER_BATCH
+
+logger = logging.getLogger(__name__)
+
+MAX_DIGEST_LINES = 30
+
+def build_digest(rows, today):
+    """Bitta fermerning yozuvlari -> tarjima qilingan xabar matni"""
+    lang = rows[0]['language'] or 'uz'
+    groups = {'reminder_overdue': [], 'reminder_today': [], 'reminder_upcoming': []}
+    for row in sorted(rows, key=lambda r: (r['next_date'], r['id'])):
+        key = ('reminder_overdue' if row['next_date'] < today
+               else 'reminder_today' if row['next_date'] == today else 'reminder_upcoming')
+        animal = ' '.join(part for part in (row['animal_type'], row['breed']) if part)
+        groups[key].append(f"• {row['vaccine_name']} — {animal} ({row['next_date'].strftime('%d.%m.%Y')})")
+
+    lines = [t(lang, 'reminder_title')]
+    shown = 0
+    for key, items in groups.items():
+        if not items or shown >= MAX_DIGEST_LINES:
+            continue
+        lines.append(f"\n{t(lang, key)}:")
+        for item in items[:MAX_DIGEST_LINES - shown]:
+            lines.append(item)
+            shown += 1
+    if len(rows) > shown:
+        lines.append('… ' + t(lang, 'reminder_more').format(count=len(rows) - shown))
+    return '\n'.join(lines)
+
+async def send_due_reminders(today=None, batch_size=REMINDER_BATCH):
+    """Bitta ishga tushirish; {'users', 'rows', 'failed'} qaytaradi"""
+    today = today or date.today()
+    due_by = today + timedelta(days=REMINDER_DAYS_AHEAD)
+    result = {'users': 0, 'rows': 0, 'failed': 0}
+
+    async def deliver(user_id, rows):
+        # BLOCKED (bot bloklangan) ham yakunlangan hisoblanadi - qayta urinilmaydi
+        if await outbox.send(user_id, build_digest(rows, today)) != outbox.FAILED:
+            result['users'] += 1
+            result['rows'] += len(rows)
+        else:
+            result['failed'] += len(rows)
+            await adb.release_vaccination_reminders([row['id'] for row in rows])
+
+    after_user, after_id = -1, 0
+    carry_user, carry = None, []
+    while True:
+        batch = await adb.claim_due_vaccinations(due_by, after_user, after_id, batch_size)
+        if not batch:
+            break
+        after_user, after_id = batch[-1]['user_id'], batch[-1]['id']
+        digests = []
+        for row in batch:
+            if row['user_id'] != carry_user:
+                if carry:
+                    digests.append(deliver(carry_user, carry))
+                carry_user, carry = row['user_id'], []
+            carry.append(row)
+        # Bo'lakdagi xabarlar parallel (outbox limitlari ichida) yuboriladi
+        await asyncio.gather(*digests)
+        if len(batch) < batch_size:
+            break
+        # Oxirgi fermerning qolgan yozuvlari keyingi bo'lakda bo'lishi mumkin - carry saqlanadi
+    if carry:
+        await deliver(carry_user, carry)
+    return result
+
+async def reminder_job(context):
+    """JobQueue callback"""
+    try:
+        result = await send_due_reminders()
+    except Exception:
+        logger.exception("Vaksinatsiya eslatmalarida xato")
+        return
+    if result['rows'] or result['failed']:
+        logger.info("Eslatmalar: %s fermer, %s yozuv, %s xato", result['users'], result['rows'], result['failed'])
+
+def schedule(application):
+    """build_application dan chaqiriladi (job-queue extra o'rnatilgan bo'lsa)"""
+    if application.job_queue is None:
+        logger.warning("JobQueue yo'q (python-telegram-bot[job-queue]) - eslatmalar o'chirilgan")
+        return
+    application.job_queue.run_repeating(reminder_job, interval=REMINDER_INTERVAL, first=60,
+                                        name='vaccination_reminders')
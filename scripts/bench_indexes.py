@@ -0,0 +1,164 @@
+"""Indekslar benchmarki: minglab fermalar bilan so'rov rejalari va kechikishlar.
+
+Alohida schema ichida (default: bench_indexes) ishlaydi, asosiy jadvallarga tegmaydi.
+
+    DATABASE_URL=postgresql://... python scripts/bench_indexes.py --farms 3000
+
+Avval faqat primary key bilan (0001 migratsiya), keyin barcha migratsiyalar (indekslar) bilan o'lchaydi
+va har bir so'rov uchun EXPLAIN (ANALYZE, BUFFERS) natijasini chiqaradi.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PLAN_QUERIES = {
+    'get_animals': 'SELECT * FROM animals WHERE user_id = %(u)s ORDER BY created_date DESC',
+    'get_animals_stats': "SELECT COUNT(*) FROM animals WHERE user_id = %(u)s AND status = 'active'",
+    'get_finance': 'SELECT * FROM finance WHERE user_id = %(u)s ORDER BY date DESC',
+    'get_finance_stats': "SELECT SUM(amount) FROM finance WHERE user_id = %(u)s AND type = 'income'",
+    'get_feed': 'SELECT * FROM feed WHERE user_id = %(u)s ORDER BY feed_date DESC',
+    'get_vaccinations': '''
+        SELECT v.*, a.type as animal_type, a.breed FROM vaccinations v
+        LEFT JOIN animals a ON v.animal_id = a.id
+        WHERE v.user_id = %(u)s ORDER BY v.vaccination_date DESC''',
+    'get_sales': '''
+        SELECT s.*, a.type as animal_type, a.breed, b.name as butcher_name
+        FROM sales s
+        LEFT JOIN animals a ON s.animal_id = a.id
+        LEFT JOIN butchers b ON s.butcher_id = b.id
+        WHERE s.user_id = %(u)s ORDER BY s.sale_date DESC''',
+}
+
+# Vaqt o'lchanadigan haqiqiy getterlar
+GETTERS = ['get_animals', 'get_finance', 'get_feed', 'get_vaccinations', 'get_sales',
+           'get_dashboard_snapshot']
+
+SEED_SQL = [
+    '''INSERT INTO users (telegram_id, full_name)
+       SELECT g, 'Fermer ' || g FROM generate_series(1, %(farms)s) g''',
+    '''INSERT INTO butchers (name, phone)
+       SELECT 'Qassob ' || g, '+99890' || g FROM generate_series(1, 200) g''',
+    '''INSERT INTO animals (user_id, type, breed, gender, weight, purchase_price, purchase_date, status, created_date)
+       SELECT u, (ARRAY['Sigir','Qo''y','Echki'])[1 + g %% 3], 'Zot ' || (g %% 7), 'Erkak', 300,
+              1000000 + g %% 500000, '2024-01-01'::date + (g %% 700),
+              CASE WHEN g %% 4 = 0 THEN 'sold' ELSE 'active' END,
+              now() - make_interval(mins => g)
+       FROM generate_series(1, %(farms)s) u, generate_series(1, %(animals)s) g''',
+    '''INSERT INTO finance (user_id, type, amount, category, date)
+       SELECT u, CASE WHEN g %% 3 = 0 THEN 'income' ELSE 'expense' END, 10000 + g,
+              'other', '2023-01-01'::date + (g %% 1000)
+       FROM generate_series(1, %(farms)s) u, generate_series(1, %(finance)s) g''',
+    '''INSERT INTO feed (user_id, name, quantity, unit_price, feed_date)
+       SELECT u, 'Arpa', 100, 3000, '2023-01-01'::date + (g %% 1000)
+       FROM generate_series(1, %(farms)s) u, generate_series(1, %(feed)s) g''',
+    '''INSERT INTO vaccinations (user_id, animal_id, vaccine_name, vaccination_date, cost)
+       SELECT a.user_id, a.id, 'Vaksina', '2024-01-01'::date + (a.id %% 300), 5000
+       FROM animals a WHERE a.id %% 3 <> 0''',
+    '''INSERT INTO sales (user_id, animal_id, butcher_id, sale_date, sale_price)
+       SELECT a.user_id, a.id, 1 + a.id %% 200, '2024-06-01'::date + (a.id %% 200), a.purchase_price * 1.2
+       FROM animals a WHERE a.status = 'sold' ''',
+]
+
+def prepare_schema(conn, schema, args):
+    import migrate
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP SCHEMA IF EXISTS {schema} CASCADE')
+        cursor.execute(f'CREATE SCHEMA {schema}')
+    conn.commit()
+    # Faqat jadvallar - indekslarsiz
+    migrate.migrate(target=1, log=lambda message: None)
+    with conn.cursor() as cursor:
+        params = {'farms': args.farms, 'animals': args.animals, 'finance': args.finance, 'feed': args.feed}
+        for sql in SEED_SQL:
+            cursor.execute(sql, params)
+    conn.commit()
+    vacuum_analyze(conn)
+
+def create_indexes(conn):
+    import migrate
+    migrate.migrate(log=lambda message: None)
+    vacuum_analyze(conn)
+
+def vacuum_analyze(conn):
+    # Autovacuum kabi visibility map ni to'ldiradi (index-only scan uchun)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute('VACUUM ANALYZE')
+    conn.autocommit = False
+
+def show_plans(conn, user_id):
+    with conn.cursor() as cursor:
+        for name, sql in PLAN_QUERIES.items():
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) ' + sql, {'u': user_id})
+            print(f'--- {name}')
+            for row in cursor.fetchall():
+                print('   ', list(row.values())[0])
+    conn.rollback()
+
+def time_getters(sample_users, repeat):
+    import database as db
+    results = {}
+    for name in GETTERS:
+        fn = getattr(db, name)
+        samples = []
+        for _ in range(repeat):
+            for user_id in sample_users:
+                start = time.perf_counter()
+                fn(user_id)
+                samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        results[name] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--farms', type=int, default=3000)
+    parser.add_argument('--animals', type=int, default=40, help='har bir fermadagi hayvonlar')
+    parser.add_argument('--finance', type=int, default=150, help='har bir fermadagi moliya yozuvlari')
+    parser.add_argument('--feed', type=int, default=30, help='har bir fermadagi ozuqa yozuvlari')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--schema', default='bench_indexes')
+    parser.add_argument('--keep', action='store_true', help='schema ni o\'chirmaslik')
+    parser.add_argument('--no-plans', action='store_true')
+    args = parser.parse_args()
+
+    # Pool ulanishlari ham shu schema bilan ishlashi uchun (libpq PGOPTIONS ni o'qiydi)
+    os.environ['PGOPTIONS'] = f'-c search_path={args.schema}'
+    import database as db
+
+    conn = db.get_db_connection()
+    print(f'Seeding {args.farms} farms into schema {args.schema} ...')
+    start = time.perf_counter()
+    prepare_schema(conn, args.schema, args)
+    print(f'Seeded in {time.perf_counter() - start:.1f}s')
+
+    sample_users = [1 + (i * 7919) % args.farms for i in range(20)]
+    phases = {}
+    for phase in ('before', 'after'):
+        if phase == 'after':
+            create_indexes(conn)
+        if not args.no_plans:
+            print(f'\n===== PLANS ({phase}) =====')
+            show_plans(conn, sample_users[0])
+        phases[phase] = time_getters(sample_users, args.repeat)
+
+    print(f'\n{"query":<20}{"before p50":>12}{"before p95":>12}{"after p50":>12}{"after p95":>12}{"speedup":>10}')
+    for name in GETTERS:
+        b50, b95 = phases['before'][name]
+        a50, a95 = phases['after'][name]
+        print(f'{name:<20}{b50:>10.2f}ms{b95:>10.2f}ms{a50:>10.2f}ms{a95:>10.2f}ms{b50 / a50:>9.1f}x')
+
+    if not args.keep:
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA {args.schema} CASCADE')
+        conn.commit()
+    conn.close()
+    db.get_pool().closeall()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Bot javoblarini tayyorlash benchmarki: har bir update uchun matn + klaviatura vaqti.
+
+Bazaga ham, Telegramga ham ulanmaydi - faqat CPU qismi o'lchanadi.
+
+    python scripts/bench_render.py --iterations 20000
+
+"before" - avvalgi usul (har safar get_translation, += bilan matn, klaviaturani qayta qurish),
+"after" - i18n modulidagi oldindan qurilgan kataloglar, klaviaturalar va shablonlar;
+hayvonlar ro'yxati uchun - bot hozir ishlatadigan browser.animals_page (matn + inline klaviatura),
+database_async o'rniga tayyor sahifa qaytaradigan funksiyalar bilan.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from telegram import ReplyKeyboardMarkup, KeyboardButton
+
+import browser
+import database_async as adb
+import i18n
+from config import TRANSLATIONS
+
+# ==================== BEFORE ====================
+
+def get_translation(lang, key):
+    return TRANSLATIONS.get(lang, TRANSLATIONS['uz']).get(key, key)
+
+def get_main_keyboard(lang='uz'):
+    t = lambda k: get_translation(lang, k)
+    keyboard = [
+        [KeyboardButton(f"🐄 {t('animals')}"), KeyboardButton(f"👤 {t('butchers')}")],
+        [KeyboardButton(f"💰 {t('sales')}"), KeyboardButton(f"🌾 {t('feed')}")],
+        [KeyboardButton(f"💉 {t('vaccinations')}"), KeyboardButton(f"📊 {t('finance')}")],
+        [KeyboardButton(f"🏠 {t('dashboard')}"), KeyboardButton(f"🌐 {t('language')}")],
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+def old_dashboard(lang, snapshot):
+    t = lambda k: get_translation(lang, k)
+    animals_stats, finance_stats = snapshot['animals'], snapshot['finance']
+    text = f"📊 {t('dashboard')}\n\n"
+    text += f"🐄 {t('total_animals')}: {animals_stats['total']}\n"
+    text += f"✅ {t('active_animals')}: {animals_stats['active']}\n\n"
+    text += f"💰 {t('total_income')}: {finance_stats['income']:,.0f} {t('sum')}\n"
+    text += f"💸 {t('total_expense')}: {finance_stats['expense']:,.0f} {t('sum')}\n"
+    text += f"📈 {t('net_profit')}: {finance_stats['profit']:,.0f} {t('sum')}\n\n"
+    return text
+
+def old_animals(lang, animals, total):
+    t = lambda k: get_translation(lang, k)
+    text = f"🐄 {t('animals')} ({total} ta):\n\n"
+    for animal in animals:
+        status_emoji = "✅" if animal['status'] == 'active' else "❌"
+        text += f"{status_emoji} {animal['type']} - {animal['breed']}\n"
+        text += f"   💰 {animal['purchase_price']:,.0f} {t('sum')}\n"
+        text += f"   📅 {animal['purchase_date']}\n\n"
+    if total > 10:
+        text += f"... va yana {total - 10} ta\n\n"
+    return text
+
+# ==================== SCENARIOS ====================
+
+SNAPSHOT = {'animals': {'total': 125, 'active': 98},
+            'finance': {'income': Decimal('182500000'), 'expense': Decimal('96400000'),
+                        'profit': Decimal('86100000')}}
+ANIMALS = [{'id': i, 'type': 'Sigir', 'breed': 'Golshtin', 'status': 'active' if i % 3 else 'sold',
+            'purchase_price': Decimal('8500000.00'), 'purchase_date': date(2024, 3, i % 28 + 1),
+            'created_date': datetime(2024, 3, 1, 9, 30) - timedelta(minutes=i)}
+           for i in range(10)]
+WEBAPP_URL = 'https://example.com/auth?user_id=960099174'
+
+async def _browse_animals(user_id, limit, animal_type=None, status=None, cursor=None, backward=False):
+    return ANIMALS[:limit], True
+
+async def _animal_counts(user_id):
+    return 125, 98
+
+# Bazaga ulanmaslik uchun: browser faqat shu ikkitasini chaqiradi
+adb.browse_animals = _browse_animals
+adb.get_animal_counts = _animal_counts
+
+def run(coro):
+    """Hech narsani kutmaydigan coroutine ni event loopsiz bajarish (loop narxi o'lchovga qo'shilmaydi)"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError('coroutine kutishga o\'tdi')
+
+def animals_page(lang):
+    return run(browser.animals_page(960099174, lang, WEBAPP_URL))
+
+SCENARIOS = {
+    'keyboard': (lambda lang: get_main_keyboard(lang), lambda lang: i18n.main_keyboard(lang)),
+    'dashboard': (lambda lang: (old_dashboard(lang, SNAPSHOT), get_main_keyboard(lang)),
+                  lambda lang: (i18n.render_dashboard(lang, SNAPSHOT), i18n.main_keyboard(lang))),
+    'animals': (lambda lang: old_animals(lang, ANIMALS, 125), animals_page),
+}
+
+def measure(func, iterations):
+    langs = ('uz', 'ru', 'en')
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(langs[i % 3])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    # Natijalar bir xil ekanini tekshirish
+    for lang in ('uz', 'ru', 'en'):
+        assert old_dashboard(lang, SNAPSHOT) == i18n.render_dashboard(lang, SNAPSHOT)
+        # Sahifa matni endi boshqacha (sahifa raqami, filtrlar) - faqat ro'yxat qismi bir xil
+        assert i18n.render_animal_items(lang, ANIMALS) in animals_page(lang)[0]
+
+    print(f'{"scenario":<12}{"before":>12}{"after":>12}{"speedup":>10}')
+    for name, (before, after) in SCENARIOS.items():
+        b, a = measure(before, args.iterations), measure(after, args.iterations)
+        print(f'{name:<12}{b:>10.2f}us{a:>10.2f}us{b / a:>9.1f}x')
+
+if __name__ == '__main__':
+    main()
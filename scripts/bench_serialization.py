@@ -0,0 +1,103 @@
+"""/api/animals javobi benchmarki: serializatsiya CPU vaqti va tarmoqdagi baytlar.
+
+Bazaga ulanmaydi - get_animals qaytaradigan shakldagi qatorlar (DATE, TIMESTAMP, NUMERIC) yasaladi.
+
+    python scripts/bench_serialization.py --animals 5000 --repeat 20
+
+"before" - avvalgi ChorvaJSONProvider (stdlib json, sort_keys, default() orqali sanalar),
+"after" - serialization.dumps (orjson bo'lsa) va br/gzip siqish.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import serialization
+
+# ==================== BEFORE ====================
+
+class OldJSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o):
+        if isinstance(o, date) and not isinstance(o, datetime):
+            return o.isoformat()
+        if isinstance(o, Decimal):
+            return float(o)
+        return DefaultJSONProvider.default(o)
+
+# ==================== DATA ====================
+
+def make_animals(count):
+    types = ['Sigir', "Qo'y", 'Echki', 'Buqa', 'Tana']
+    breeds = ['Golshtin', 'Hisori', 'Qorako\'l', 'Simmental', None]
+    start = date(2023, 1, 1)
+    created = datetime(2024, 1, 1, 9, 30)
+    return [{
+        'id': i,
+        'user_id': 960099174,
+        'type': types[i % len(types)],
+        'breed': breeds[i % len(breeds)],
+        'gender': 'erkak' if i % 2 else 'urg\'ochi',
+        'birth_date': start - timedelta(days=400 + i % 700) if i % 3 else None,
+        'weight': 180.5 + i % 300,
+        'purchase_price': Decimal(4_500_000 + (i % 97) * 12_500).quantize(Decimal('0.01')),
+        'purchase_date': start + timedelta(days=i % 600),
+        'status': 'active' if i % 7 else 'sold',
+        'created_date': created + timedelta(minutes=i * 13),
+    } for i in range(1, count + 1)]
+
+# ==================== MEASURE ====================
+
+def measure(func, repeat):
+    """(natija, median CPU ms)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = func()
+        samples.append((time.process_time() - start) * 1000)
+    return result, statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON serializatsiya va siqish benchmarki')
+    parser.add_argument('--animals', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    animals = make_animals(args.animals)
+    app = Flask(__name__)
+    old = OldJSONProvider(app)
+    stdlib = json.JSONEncoder(default=serialization._default, separators=(',', ':'))
+
+    with app.app_context():
+        before, before_ms = measure(lambda: old.response(animals).get_data(), args.repeat)
+    after, after_ms = measure(lambda: serialization.dumps(animals), args.repeat)
+    fallback, fallback_ms = measure(lambda: stdlib.encode(animals).encode('utf-8'), args.repeat)
+    assert json.loads(before) == json.loads(after) == json.loads(fallback), 'natijalar farq qiladi'
+
+    print(f'{args.animals} animals, JSON backend: {serialization.BACKEND}\n')
+    print(f'{"serializer":<28}{"cpu ms":>10}{"bytes":>12}')
+    print(f'{"before (stdlib, sorted)":<28}{before_ms:>10.2f}{len(before):>12,}')
+    print(f'{"after (json fallback)":<28}{fallback_ms:>10.2f}{len(fallback):>12,}')
+    print(f'{"after (" + serialization.BACKEND + ")":<28}{after_ms:>10.2f}{len(after):>12,}')
+
+    print(f'\n{"encoding":<28}{"cpu ms":>10}{"bytes":>12}{"ratio":>8}{"total ms":>10}')
+    print(f'{"identity":<28}{0:>10.2f}{len(after):>12,}{1:>8.2f}{after_ms:>10.2f}')
+    for encoding in reversed(serialization.ENCODINGS):
+        body, ms = measure(lambda: serialization.compress(after, encoding), args.repeat)
+        print(f'{encoding:<28}{ms:>10.2f}{len(body):>12,}{len(body) / len(after):>8.2f}{after_ms + ms:>10.2f}')
+    if 'br' not in serialization.ENCODINGS:
+        print("(brotli o'rnatilmagan - faqat gzip)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Sovuq start benchmarki: entry pointlarni alohida jarayonlarda import qilish vaqti.
+
+    DATABASE_URL=postgresql://... python scripts/bench_startup.py --runs 5
+
+Har bir o'lchov yangi `python` jarayonida: modul import vaqti, telegram modullari
+yuklangan-yuklanmagani va web uchun birinchi so'rov (/ping) gacha bo'lgan vaqt.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+first_request = None
+if {web}:
+    response = {module}.app.test_client().get('/ping')
+    assert response.status_code == 200
+    first_request = time.perf_counter() - start
+print(json.dumps({{
+    'import': imported - start,
+    'first_request': first_request,
+    'modules': len(sys.modules),
+    'telegram_modules': sum(1 for name in sys.modules if name == 'telegram' or name.startswith('telegram.')),
+}}))
+'''
+
+ENTRY_POINTS = {
+    'web (app)': ('app', True),
+    'bot': ('bot', False),
+    'migrate': ('migrate', False),
+}
+
+def probe(module, web):
+    env = {**os.environ, 'PYTHONPATH': ROOT, 'BOT_MODE': os.environ.get('BOT_MODE', 'polling'),
+           'BOT_TOKEN': os.environ.get('BOT_TOKEN', '1:bench')}
+    output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, web=web)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"entry point":<12}{"import p50":>12}{"1st req p50":>13}{"modules":>9}{"telegram":>10}')
+    for name, (module, web) in ENTRY_POINTS.items():
+        results = [probe(module, web) for _ in range(args.runs)]
+        imports = statistics.median(r['import'] for r in results) * 1000
+        first = f"{statistics.median(r['first_request'] for r in results) * 1000:.0f}ms" if web else '-'
+        last = results[-1]
+        print(f'{name:<12}{imports:>10.0f}ms{first:>13}{last["modules"]:>9}{last["telegram_modules"]:>10}')
+
+if __name__ == '__main__':
+    main()
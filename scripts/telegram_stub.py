@@ -0,0 +1,121 @@
+"""Bot API ning lokal stubi: outbox, broadcast va webhookni Telegramsiz sinash uchun.
+
+    python scripts/telegram_stub.py --port 8081 --rate 30 --blocked 1001,1002
+    TELEGRAM_API_BASE_URL=http://127.0.0.1:8081 python bot.py
+
+sendMessage umumiy limitdan (--rate xabar/sekund) yoki bitta chat uchun
+--chat-rate dan oshsa 429 (retry_after bilan) qaytaradi, --blocked dagi
+chatlarga 403. GET /stats - hisoblagichlar (JSON).
+"""
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Stub', 'username': 'chorva_stub_bot'}
+
+class StubState:
+    def __init__(self, rate, chat_rate, blocked):
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self.blocked = blocked
+        self.lock = threading.Lock()
+        self.recent = deque()                   # oxirgi 1 sekunddagi yuborishlar
+        self.chat_last = {}                     # chat_id -> oxirgi yuborish vaqti
+        self.counters = defaultdict(int)
+        self.per_chat = defaultdict(int)
+        self.message_id = 0
+
+    def send_message(self, params):
+        chat_id = int(params.get('chat_id'))
+        now = time.monotonic()
+        with self.lock:
+            self.counters['sendMessage'] += 1
+            if chat_id in self.blocked:
+                self.counters['403'] += 1
+                return 403, {'ok': False, 'error_code': 403, 'description': 'Forbidden: bot was blocked by the user'}
+            while self.recent and now - self.recent[0] > 1:
+                self.recent.popleft()
+            too_fast_chat = self.chat_rate and now - self.chat_last.get(chat_id, -1e9) < 1 / self.chat_rate
+            if len(self.recent) >= self.rate or too_fast_chat:
+                self.counters['429'] += 1
+                return 429, {'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 1',
+                             'parameters': {'retry_after': 1}}
+            self.recent.append(now)
+            self.chat_last[chat_id] = now
+            self.per_chat[chat_id] += 1
+            self.counters['delivered'] += 1
+            self.message_id += 1
+            return 200, {'ok': True, 'result': {
+                'message_id': self.message_id, 'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'}, 'from': BOT_USER, 'text': params.get('text', ''),
+            }}
+
+    def snapshot(self):
+        with self.lock:
+            duplicates = sum(1 for count in self.per_chat.values() if count > 1)
+            return {**self.counters, 'chats': len(self.per_chat), 'chats_with_duplicates': duplicates}
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _params(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            if 'json' in (self.headers.get('Content-Type') or ''):
+                return json.loads(raw or b'{}')
+            return {key: values[0] for key, values in parse_qs(raw.decode()).items()}
+
+        def do_GET(self):
+            if self.path == '/stats':
+                return self._reply(200, state.snapshot())
+            self.do_POST()
+
+        def do_POST(self):
+            method = self.path.rstrip('/').rsplit('/', 1)[-1]
+            params = self._params() if self.command == 'POST' else {}
+            if method == 'getMe':
+                return self._reply(200, {'ok': True, 'result': BOT_USER})
+            if method == 'sendMessage':
+                return self._reply(*state.send_message(params))
+            if method == 'getUpdates':
+                time.sleep(min(float(params.get('timeout') or 0), 1))
+                return self._reply(200, {'ok': True, 'result': []})
+            with state.lock:
+                state.counters[method] += 1
+            return self._reply(200, {'ok': True, 'result': True})
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Telegram Bot API stub')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--rate', type=float, default=30, help='umumiy limit (xabar/sekund)')
+    parser.add_argument('--chat-rate', type=float, default=1, help='bitta chat uchun limit (0 - cheklanmagan)')
+    parser.add_argument('--blocked', default='', help='403 qaytaradigan chat_id lar (vergul bilan)')
+    args = parser.parse_args()
+
+    blocked = {int(x) for x in args.blocked.split(',') if x.strip()}
+    state = StubState(args.rate, args.chat_rate, blocked)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f'Bot API stub: http://{args.host}:{args.port} (rate={args.rate}/s, blocked={len(blocked)})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(state.snapshot(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""/api/* javoblari uchun JSON serializatsiya va siqish.
+
+JSON backend: orjson (o'rnatilgan bo'lsa) yoki stdlib json - natija bir xil:
+  DATE -> 'YYYY-MM-DD', TIMESTAMP -> HTTP sana (Flask kabi), NUMERIC -> son.
+
+Siqish: Accept-Encoding bo'yicha br (brotli o'rnatilgan bo'lsa) yoki gzip,
+faqat COMPRESS_MIN_SIZE baytdan katta javoblar uchun (kichik javobda foyda yo'q).
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))    # bayt
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))             # 0-11; 5 - tez va yaxshi siqadi
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/csv', 'application/x-ndjson')
+
+# ==================== JSON ====================
+
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def http_date(o):
+    """werkzeug.http.http_date bilan bir xil natija (naive - UTC), lekin bir necha barobar tez"""
+    if o.tzinfo is not None:
+        o = o.astimezone(timezone.utc)
+    return (f'{_WEEKDAYS[o.weekday()]}, {o.day:02d} {_MONTHS[o.month - 1]} {o.year:04d} '
+            f'{o.hour:02d}:{o.minute:02d}:{o.second:02d} GMT')
+
+def _default(o):
+    # Eng ko'p uchraydiganlari birinchi: DATE ustunlar, keyin NUMERIC summalar
+    cls = type(o)
+    if cls is date:
+        return o.isoformat()
+    if cls is Decimal:
+        return float(o)
+    if isinstance(o, datetime):
+        return http_date(o)
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    raise TypeError(f"{type(o).__name__} JSON ga o'tmaydi")
+
+if orjson is not None:
+    BACKEND = 'orjson'
+    # PASSTHROUGH_DATETIME - sanalar _default orqali (orjson o'zi ISO 8601 yozadi)
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """obj -> JSON (bytes)"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+else:
+    BACKEND = 'json'
+    _encoder = json.JSONEncoder(default=_default, separators=(',', ':'))
+
+    def dumps(obj):
+        """obj -> JSON (bytes)"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    loads = json.loads
+
+# ==================== COMPRESSION ====================
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def choose_encoding(accept_encodings):
+    """werkzeug request.accept_encodings dan eng yaxshi qo'llab-quvvatlangan kodlash (yoki None)"""
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def compress_response(response, accept_encodings):
+    """after_request uchun: mos javoblarni joyida siqadi"""
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
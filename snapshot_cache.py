@@ -0,0 +1,276 @@
+"""Dashboard / statistika snapshotlari uchun read-through kesh (user_id -> get_dashboard_snapshot).
+
+Ikki qatlam:
+  1. jarayon ichidagi LRU (SNAPSHOT_CACHE_SIZE ta yozuv, TTL bilan);
+  2. ixtiyoriy umumiy Redis (REDIS_URL) - gunicorn workerlari va bot jarayoni orasida.
+
+database.py dagi yozuvchi funksiyalar commit dan keyin invalidate(user_id) chaqiradi.
+Redis da har bir foydalanuvchining generatsiya hisoblagichi bor (INCR), snapshot esa
+qaysi generatsiyada hisoblangani bilan saqlanadi - yozish bilan parallel hisoblangan eski
+snapshot keyin qaytarilmaydi. Redis bo'lmasa invalidatsiya faqat shu jarayonda, boshqa
+jarayondagi o'zgarish ko'pi bilan TTL ichida ko'rinadi (user_cache bilan bir xil).
+
+Bir kalit uchun bir vaqtda faqat bitta loader ishlaydi (singleflight), qolgan threadlar natijani kutadi.
+Bot (asyncpg) aget() orqali shu keshdan o'qiydi - web va bot bitta kesh va invalidatsiyani ko'radi.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+SNAPSHOT_CACHE_SIZE = int(os.environ.get('SNAPSHOT_CACHE_SIZE', 5000))
+SNAPSHOT_CACHE_TTL = float(os.environ.get('SNAPSHOT_CACHE_TTL', 300))    # sekund
+REDIS_URL = os.environ.get('REDIS_URL', '')
+REDIS_PREFIX = os.environ.get('REDIS_PREFIX', 'chorva:snapshot:')
+REDIS_TIMEOUT = 0.5                                                       # sekund
+
+logger = logging.getLogger(__name__)
+
+# Redis xato bersa - keshsiz, to'g'ridan-to'g'ri bazadan
+_BYPASS = object()
+
+# ==================== SERIALIZATION ====================
+
+def _encode(value):
+    def default(o):
+        if isinstance(o, Decimal):
+            return {'$decimal': str(o)}
+        raise TypeError(f'{type(o).__name__} JSON ga o\'tmaydi')
+    return json.dumps(value, default=default, separators=(',', ':'))
+
+def _decode(raw):
+    return json.loads(raw, object_hook=lambda d: Decimal(d['$decimal']) if d.keys() == {'$decimal'} else d)
+
+def _copy(value):
+    """Snapshot ichidagi dict lar nusxasi (chaqiruvchi o'zgartirsa kesh buzilmaydi)"""
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in value.items()}
+
+def _connect(url):
+    if not url:
+        return None
+    try:
+        import redis
+    except ImportError:
+        logger.warning("REDIS_URL berilgan, lekin redis o'rnatilmagan (pip install redis) - faqat jarayon ichidagi kesh")
+        return None
+    return redis.Redis.from_url(url, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT)
+
+# ==================== CACHE ====================
+
+class _Flight:
+    """Bitta kalit uchun ishlayotgan loader; boshqa threadlar event ni kutadi"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.stale = False   # yuklash paytida invalidate bo'ldi - natija saqlanmaydi
+
+class SnapshotCache:
+    """Thread-safe LRU + ixtiyoriy Redis, singleflight bilan"""
+
+    def __init__(self, maxsize=SNAPSHOT_CACHE_SIZE, ttl=SNAPSHOT_CACHE_TTL, redis_url=REDIS_URL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = _connect(redis_url)
+        self._data = OrderedDict()   # user_id -> (expires_at, generation, snapshot)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.shared_errors = 0
+
+    def _shared_error(self, error):
+        with self._lock:
+            self.shared_errors += 1
+            first = self.shared_errors == 1
+        if first:
+            logger.warning("Snapshot kesh: Redis xatosi (%s) - keshsiz davom etamiz", error)
+
+    def _generation(self, key):
+        if self.shared is None:
+            return 0
+        try:
+            return int(self.shared.get(f'{REDIS_PREFIX}gen:{key}') or 0)
+        except Exception as e:
+            self._shared_error(e)
+            return _BYPASS
+
+    def _shared_get(self, key, generation):
+        if self.shared is None:
+            return None
+        try:
+            raw = self.shared.get(f'{REDIS_PREFIX}{key}:{generation}')
+        except Exception as e:
+            self._shared_error(e)
+            return None
+        return _decode(raw) if raw is not None else None
+
+    def _shared_set(self, key, generation, value):
+        if self.shared is None:
+            return
+        try:
+            self.shared.set(f'{REDIS_PREFIX}{key}:{generation}', _encode(value), ex=max(1, int(self.ttl)))
+        except Exception as e:
+            self._shared_error(e)
+
+    def get(self, key, loader):
+        """Keshdagi snapshot yoki loader(key) natijasi"""
+        generation = self._generation(key)
+        if generation is _BYPASS:
+            with self._lock:
+                self.misses += 1
+            return loader(key)
+
+        cached, flight, leader = self._lookup(key, generation)
+        if cached is not None:
+            return cached
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                if not isinstance(flight.error, Exception):
+                    # Leader to'xtatildi (KeyboardInterrupt va h.k.) - natija yo'q, o'zimiz yuklaymiz
+                    return loader(key)
+                raise flight.error
+            return _copy(flight.value)
+
+        try:
+            value = self._shared_get(key, generation)
+            if value is None:
+                with self._lock:
+                    self.misses += 1
+                value = loader(key)
+                if not flight.stale:
+                    self._shared_set(key, generation, value)
+            else:
+                with self._lock:
+                    self.shared_hits += 1
+            flight.value = value
+        except BaseException as e:
+            # CancelledError / KeyboardInterrupt ham: aks holda _finish value=None ni TTL davomida keshlaydi
+            flight.error = e
+            raise
+        finally:
+            self._finish(key, generation, flight)
+        return _copy(value)
+
+    def _lookup(self, key, generation):
+        """(nusxa yoki None, flight, leader) - lock ichida LRU tekshiruvi va flight ro'yxatdan o'tkazish"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic() and entry[1] == generation:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return _copy(entry[2]), None, False
+                del self._data[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+            return None, flight, leader
+
+    def _finish(self, key, generation, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if flight.error is None and not flight.stale:
+                self._data[key] = (time.monotonic() + self.ttl, generation, flight.value)
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        flight.event.set()
+
+    async def _io(self, func, *args):
+        # Redis klienti sinxron - event loop bloklanmasligi uchun threadda
+        if self.shared is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    async def aget(self, key, loader):
+        """get() ning asyncio varianti: loader - coroutine funksiya (database_async)"""
+        generation = await self._io(self._generation, key)
+        if generation is _BYPASS:
+            with self._lock:
+                self.misses += 1
+            return await loader(key)
+
+        cached, flight, leader = self._lookup(key, generation)
+        if cached is not None:
+            return cached
+        if not leader:
+            # Boshqa thread yoki task yuklayapti; event loop ni bloklamasdan kutamiz
+            await asyncio.to_thread(flight.event.wait)
+            if flight.error is not None:
+                if not isinstance(flight.error, Exception):
+                    # Leader task bekor qilindi (CancelledError) - natija yo'q, o'zimiz yuklaymiz
+                    return await loader(key)
+                raise flight.error
+            return _copy(flight.value)
+
+        try:
+            value = await self._io(self._shared_get, key, generation)
+            if value is None:
+                with self._lock:
+                    self.misses += 1
+                value = await loader(key)
+                if not flight.stale:
+                    await self._io(self._shared_set, key, generation, value)
+            else:
+                with self._lock:
+                    self.shared_hits += 1
+            flight.value = value
+        except BaseException as e:
+            # CancelledError / KeyboardInterrupt ham: aks holda _finish value=None ni TTL davomida keshlaydi
+            flight.error = e
+            raise
+        finally:
+            self._finish(key, generation, flight)
+        return _copy(value)
+
+    def invalidate(self, key):
+        """Yozishdan keyin (commit dan so'ng) chaqiriladi"""
+        with self._lock:
+            self._data.pop(key, None)
+            flight = self._flights.pop(key, None)
+            if flight is not None:
+                flight.stale = True
+            self.invalidations += 1
+        if self.shared is not None:
+            try:
+                gen_key = f'{REDIS_PREFIX}gen:{key}'
+                pipe = self.shared.pipeline()
+                pipe.incr(gen_key)
+                # Hisoblagich snapshotlardan uzoqroq yashaydi - qayta 0 dan boshlansa eski snapshot qolmagan
+                pipe.expire(gen_key, max(86400, int(self.ttl) * 2))
+                pipe.execute()
+            except Exception as e:
+                self._shared_error(e)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            # coalesced - boshqa thread yuklagan natijani kutganlar (bazaga bormagan)
+            total = self.hits + self.shared_hits + self.coalesced + self.misses
+            return {
+                'size': len(self._data), 'hits': self.hits, 'shared_hits': self.shared_hits,
+                'misses': self.misses, 'coalesced': self.coalesced, 'invalidations': self.invalidations,
+                'evictions': self.evictions, 'shared': self.shared is not None, 'shared_errors': self.shared_errors,
+                'hit_ratio': round((total - self.misses) / total, 4) if total else 0.0,
+            }
+
+cache = SnapshotCache()
@@ -83,8 +83,61 @@ class Modal {
 }
 
 // ==================== API HELPERS ====================
+// GET javoblari ETag bilan sessionStorage da saqlanadi; keyingi so'rovda If-None-Match yuboriladi,
+// 304 kelsa saqlangan javob ishlatiladi (server ro'yxatni qayta o'qimaydi)
+const API_CACHE_PREFIX = 'chorva-api:';
+const API_CACHED_HEADERS = ['X-Next-Cursor', 'X-Total-Count'];
+
+function readApiCache(url) {
+    try {
+        return JSON.parse(sessionStorage.getItem(API_CACHE_PREFIX + url));
+    } catch (e) {
+        return null;
+    }
+}
+
+function writeApiCache(url, entry) {
+    try {
+        sessionStorage.setItem(API_CACHE_PREFIX + url, JSON.stringify(entry));
+    } catch (e) {
+        // Joy tugasa - keshsiz ishlaymiz
+    }
+}
+
+async function cachedGet(url, headers = {}) {
+    const cached = readApiCache(url);
+    const response = await fetch(url, {
+        cache: 'no-store',
+        headers: {
+            'Content-Type': 'application/json',
+            ...headers,
+            ...(cached ? { 'If-None-Match': cached.etag } : {})
+        }
+    });
+    if (response.status === 304 && cached) {
+        return cached;
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const entry = { body: await response.json(), headers: {} };
+    API_CACHED_HEADERS.forEach(name => {
+        const value = response.headers.get(name);
+        if (value !== null) entry.headers[name] = value;
+    });
+    const etag = response.headers.get('ETag');
+    if (etag) {
+        entry.etag = etag;
+        writeApiCache(url, entry);
+    }
+    return entry;
+}
+
 async function apiRequest(url, options = {}) {
     try {
+        if ((options.method || 'GET').toUpperCase() === 'GET') {
+            return (await cachedGet(url, options.headers)).body;
+        }
         const response = await fetch(url, {
             ...options,
             headers: {
@@ -105,6 +158,132 @@ async function apiRequest(url, options = {}) {
     }
 }
 
+// ==================== PAGINATION ====================
+// /api/* ro'yxatlari sahifalab qaytadi: ?limit=&after=, javob sarlavhalarida
+// X-Next-Cursor (keyingi sahifa) va X-Total-Count (faqat birinchi sahifada)
+async function apiPage(url, after = null, limit = null) {
+    const params = new URLSearchParams();
+    if (after) params.set('after', after);
+    if (limit) params.set('limit', limit);
+    const query = params.toString();
+    const fullUrl = query ? `${url}${url.includes('?') ? '&' : '?'}${query}` : url;
+    
+    const entry = await cachedGet(fullUrl);
+    const total = entry.headers['X-Total-Count'];
+    return {
+        items: entry.body,
+        nextCursor: entry.headers['X-Next-Cursor'] || null,
+        total: total === undefined ? null : parseInt(total, 10)
+    };
+}
+
+// Bir nechta ro'yxatning birinchi sahifasi bitta so'rovda (bitta snapshot):
+// apiBootstrap({ sales: {}, animals: { fields: 'id,type', limit: 500 } })
+//   -> { sales: { items, nextCursor, total }, animals: {...} }
+async function apiBootstrap(resources) {
+    const params = new URLSearchParams();
+    params.set('include', Object.keys(resources).join(','));
+    Object.entries(resources).forEach(([name, spec]) => {
+        if (spec.fields) params.set(`fields[${name}]`, spec.fields);
+        if (spec.limit) params.set(`limit[${name}]`, spec.limit);
+    });
+    
+    const entry = await cachedGet(`/api/bootstrap?${params.toString()}`);
+    const pages = {};
+    Object.entries(entry.body).forEach(([name, page]) => {
+        pages[name] = { items: page.items, nextCursor: page.next_cursor, total: page.total };
+    });
+    return pages;
+}
+
+// Birinchi sahifa (masalan, bootstrap dan) + qolgan sahifalar
+async function collectAll(url, page, limit = 500) {
+    const items = [...page.items];
+    let after = page.nextCursor;
+    while (after) {
+        const next = await apiPage(url, after, limit);
+        items.push(...next.items);
+        after = next.nextCursor;
+    }
+    return items;
+}
+
+// Barcha sahifalarni yig'ish (tanlash ro'yxatlari uchun)
+async function apiRequestAll(url, limit = 500) {
+    return collectAll(url, await apiPage(url, null, limit), limit);
+}
+
+// Birinchi sahifa + "Yana yuklash" tugmasi
+class PagedList {
+    constructor(url, options = {}) {
+        this.url = url;
+        this.anchor = options.anchor || null;
+        this.limit = options.limit || null;
+        this.onChange = options.onChange || (() => {});
+        this.items = [];
+        this.cursor = null;
+        this.total = null;
+        this.loading = false;
+        
+        this.button = document.createElement('button');
+        this.button.className = 'btn btn-secondary btn-block load-more';
+        this.button.style.display = 'none';
+        this.button.addEventListener('click', () => this.loadMore());
+        if (this.anchor) {
+            this.anchor.insertAdjacentElement('afterend', this.button);
+        }
+    }
+    
+    async reload() {
+        this.items = [];
+        this.cursor = null;
+        this.total = null;
+        await this.loadMore(true);
+    }
+    
+    // Birinchi sahifa allaqachon olingan bo'lsa (bootstrap) - qayta so'ralmaydi
+    setFirstPage(page) {
+        this.items = [...page.items];
+        this.cursor = page.nextCursor;
+        this.total = page.total;
+        this.onChange(this.items);
+        this.updateButton();
+    }
+    
+    async loadMore(first = false) {
+        if (this.loading || (!first && !this.cursor)) return;
+        this.loading = true;
+        try {
+            const page = await apiPage(this.url, first ? null : this.cursor, this.limit);
+            this.items.push(...page.items);
+            this.cursor = page.nextCursor;
+            if (page.total !== null) this.total = page.total;
+            this.onChange(this.items);
+        } catch (error) {
+            console.error('API Error:', error);
+            showAlert('Xatolik yuz berdi!', 'danger');
+            throw error;
+        } finally {
+            this.loading = false;
+            this.updateButton();
+        }
+    }
+    
+    get hasMore() {
+        return Boolean(this.cursor);
+    }
+    
+    updateButton() {
+        if (!this.hasMore) {
+            this.button.style.display = 'none';
+            return;
+        }
+        const counter = this.total !== null ? ` (${this.items.length} / ${this.total})` : '';
+        this.button.innerHTML = `<i class="fas fa-chevron-down"></i> Yana yuklash${counter}`;
+        this.button.style.display = 'block';
+    }
+}
+
 // ==================== ALERTS ====================
 function showAlert(message, type = 'success') {
     const alertDiv = document.createElement('div');
@@ -397,6 +576,11 @@ window.chorvaApp = {
     parseFormattedNumber,
     Modal,
     apiRequest,
+    apiPage,
+    apiRequestAll,
+    apiBootstrap,
+    collectAll,
+    PagedList,
     showAlert,
     SwipeHandler,
     PullToRefresh,
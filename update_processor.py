@@ -0,0 +1,131 @@
+"""Bot yangilanishlarini parallel, lekin har bir foydalanuvchi uchun ketma-ket qayta ishlash.
+
+Application.concurrent_updates ga beriladi: turli foydalanuvchilar yangilanishlari
+BOT_CONCURRENT_UPDATES tagacha parallel ishlaydi, bitta foydalanuvchiniki esa
+kelgan tartibida birin-ketin (ConversationHandler PHONE -> FULLNAME holatlari buzilmaydi).
+Band foydalanuvchining yangi yangilanishi uning navbatiga qo'yiladi va slotni egallamaydi.
+
+Handlerlar kechikishi timed() bilan o'lchanadi, /stats da ko'rinadi.
+"""
+import functools
+import logging
+import time
+from collections import deque
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from config import BOT_CONCURRENT_UPDATES
+
+LATENCY_SAMPLES = 500   # har bir handler uchun oxirgi o'lchovlar (p50/p95 uchun)
+
+logger = logging.getLogger(__name__)
+
+class UserOrderedUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, max_concurrent_updates=BOT_CONCURRENT_UPDATES):
+        super().__init__(max_concurrent_updates)
+        self._pending = {}   # kalit -> hali boshlanmagan coroutine lar (kalit band)
+        self.waiting = 0
+        self.max_waiting = 0
+        self.processed = 0
+
+    @staticmethod
+    def key(update):
+        """Ketma-ketlik kaliti: foydalanuvchi, bo'lmasa chat; None - cheklovsiz"""
+        if isinstance(update, Update):
+            if update.effective_user:
+                return update.effective_user.id
+            if update.effective_chat:
+                return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update, coroutine):
+        key = self.key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Shu foydalanuvchining oldingi yangilanishi ishlanmoqda - o'sha task navbatni bo'shatadi
+            pending.append(coroutine)
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            return
+        pending = self._pending[key] = deque()
+        try:
+            await self._run(coroutine)
+            while pending:
+                self.waiting -= 1
+                await self._run(pending.popleft())
+        finally:
+            del self._pending[key]
+            # Bekor qilinganda (to'xtatish) qolganlari ishga tushmaydi
+            for rest in pending:
+                rest.close()
+            self.waiting -= len(pending)
+
+    async def _run(self, coroutine):
+        try:
+            await coroutine
+        except Exception:
+            # Application.process_update handler xatolarini o'zi ushlaydi; bu yerga kelgani navbatni to'xtatmasin
+            logger.exception("Yangilanishni qayta ishlashda xato")
+        finally:
+            self.processed += 1
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def stats(self):
+        return {'max_concurrent': self.max_concurrent_updates, 'active': self.current_concurrent_updates,
+                'busy_users': len(self._pending), 'waiting': self.waiting, 'max_waiting': self.max_waiting,
+                'processed': self.processed}
+
+class HandlerMetrics:
+    """Handler nomi -> kechikishlar (bitta event loop ichida ishlatiladi)"""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.samples = samples
+        self._latency = {}
+        self._counts = {}
+        self._errors = {}
+
+    def observe(self, name, seconds, failed=False):
+        latency = self._latency.get(name)
+        if latency is None:
+            latency = self._latency[name] = deque(maxlen=self.samples)
+        latency.append(seconds)
+        self._counts[name] = self._counts.get(name, 0) + 1
+        if failed:
+            self._errors[name] = self._errors.get(name, 0) + 1
+
+    def stats(self):
+        result = {}
+        for name, latency in self._latency.items():
+            ordered = sorted(latency)
+            result[name] = {
+                'count': self._counts[name], 'errors': self._errors.get(name, 0),
+                'p50_ms': round(ordered[len(ordered) // 2] * 1000, 1),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                'max_ms': round(ordered[-1] * 1000, 1),
+            }
+        return result
+
+metrics = HandlerMetrics()
+
+def timed(callback):
+    """Handler callback kechikishini metrics ga yozuvchi o'ram"""
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await callback(update, context)
+            failed = False
+            return result
+        finally:
+            metrics.observe(callback.__name__, time.perf_counter() - start, failed)
+    return wrapper
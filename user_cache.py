@@ -0,0 +1,97 @@
+"""Foydalanuvchi profillari uchun jarayon ichidagi kesh (telegram_id -> users qatori).
+
+TTL + LRU. Ro'yxatdan o'tmagan foydalanuvchilar ham (None) qisqaroq TTL bilan
+keshlanadi. database.py va database_async.py dagi get_user shu keshdan o'qiydi,
+add_user / update_user_language / delete_user_completely esa yozuvni o'chiradi.
+Kesh har bir jarayonda alohida (gunicorn workerlari, bot), shuning uchun
+boshqa jarayondagi o'zgarish ko'pi bilan TTL ichida ko'rinadi.
+
+O'qish so'rovdan oldin loading() bilan belgilanadi: so'rov va set() orasida invalidate()
+bo'lsa, o'qilgan (eskirgan) qator keshga yozilmaydi.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 300))                    # sekund
+USER_CACHE_NEGATIVE_TTL = float(os.environ.get('USER_CACHE_NEGATIVE_TTL', 30))   # topilmagan foydalanuvchi
+
+_MISSING = object()
+
+class UserCache:
+    """Thread-safe TTL + LRU kesh"""
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL, negative_ttl=USER_CACHE_NEGATIVE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._data = OrderedDict()   # telegram_id -> (expires_at, user yoki None)
+        self._loading = {}           # telegram_id -> bazadan o'qish belgisi (invalidate o'chiradi)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_skips = 0
+
+    def get(self, telegram_id):
+        """Keshdagi qiymat (user dict nusxasi yoki None) yoki topilmasa _MISSING"""
+        with self._lock:
+            entry = self._data.get(telegram_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[telegram_id]
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(telegram_id)
+            self.hits += 1
+        user = entry[1]
+        return dict(user) if user is not None else None
+
+    def loading(self, telegram_id):
+        """Bazadan o'qishdan oldin; qaytgan belgi set() ga beriladi"""
+        token = object()
+        with self._lock:
+            if len(self._loading) > self.maxsize:
+                # Xato bilan tugagan o'qishlar belgilari - tozalansa faqat hozirgi set() lar o'tkazib yuboriladi
+                self._loading.clear()
+            self._loading[telegram_id] = token
+        return token
+
+    def set(self, telegram_id, user, token=None):
+        """token - loading() natijasi; o'shandan beri invalidate() bo'lgan bo'lsa yozilmaydi"""
+        ttl = self.ttl if user is not None else self.negative_ttl
+        with self._lock:
+            if token is not None:
+                if self._loading.get(telegram_id) is not token:
+                    self.stale_skips += 1
+                    return
+                del self._loading[telegram_id]
+            self._data[telegram_id] = (time.monotonic() + ttl, dict(user) if user is not None else None)
+            self._data.move_to_end(telegram_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, telegram_id):
+        with self._lock:
+            self._data.pop(telegram_id, None)
+            self._loading.pop(telegram_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'stale_skips': self.stale_skips, 'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+cache = UserCache()
+
+def is_missing(value):
+    return value is _MISSING
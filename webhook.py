@@ -0,0 +1,174 @@
+"""Telegram webhook rejimi: yangilanishlar web jarayondagi Flask route ga keladi.
+
+    POST /telegram/webhook  ->  secret token tekshiruvi  ->  chegaralangan navbat
+                            ->  Application.update_queue (alohida thread va event loop)
+                            ->  UserOrderedUpdateProcessor (polling bilan bir xil)
+
+Navbat to'lsa 503 qaytadi va Telegram yangilanishni keyinroq qayta yuboradi.
+telegram kutubxonasi faqat webhook rejimida (runner ishga tushganda) yuklanadi.
+ConversationHandler holati jarayon xotirasida, shuning uchun bitta gunicorn
+worker (ko'p thread bilan) ishlatiladi.
+"""
+import asyncio
+import atexit
+import hashlib
+import hmac
+import logging
+import os
+import queue
+import threading
+
+from flask import Blueprint, request, jsonify
+
+from config import BOT_MODE, BOT_TOKEN, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_QUEUE_SIZE, WEBHOOK_WORKERS
+
+logger = logging.getLogger(__name__)
+
+webhook_bp = Blueprint('telegram_webhook', __name__)
+
+def _secret():
+    # WEBHOOK_SECRET berilmasa tokendan barqaror qiymat (Telegram: A-Z, a-z, 0-9, _ va -)
+    return WEBHOOK_SECRET or hashlib.sha256(f'webhook:{BOT_TOKEN}'.encode()).hexdigest()
+
+class WebhookRunner:
+    """Navbatdagi yangilanishlarni bot Application ga uzatuvchi fon thread"""
+
+    def __init__(self, maxsize=WEBHOOK_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.received = 0
+        self.rejected = 0
+        self.forwarded = 0
+        self._pid = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def submit(self, payload):
+        """True - navbatga qo'yildi, False - navbat to'la"""
+        try:
+            self.queue.put_nowait(payload)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.received += 1
+        return True
+
+    def start(self):
+        """Har bir jarayonda bir marta (gunicorn fork dan keyin ham) ishga tushadi"""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='telegram-webhook', daemon=True)
+            self._thread.start()
+            # Jarayon tugaganda Application.stop/shutdown va post_shutdown (outbox, asyncpg pool)
+            atexit.unregister(self.stop)
+            atexit.register(self.stop)
+
+    def stop(self, timeout=10):
+        self._stopping.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {'queued': self.queue.qsize(), 'received': self.received,
+                'rejected': self.rejected, 'forwarded': self.forwarded}
+
+    def _get(self):
+        try:
+            return self.queue.get(timeout=1)
+        except queue.Empty:
+            return None
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        from telegram import Update
+        import bot
+
+        application = bot.build_application()
+        await application.initialize()
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await self._set_webhook(application, Update)
+        logger.info("Webhook rejimi: navbat %s, parallel yangilanishlar %s",
+                    self.queue.maxsize, application.update_processor.max_concurrent_updates)
+
+        # Executor emas, oddiy thread: atexit da (stop) concurrent.futures allaqachon yopilgan bo'ladi
+        inbox = asyncio.Queue(maxsize=1)
+        threading.Thread(target=self._pump, args=(asyncio.get_running_loop(), inbox),
+                         name='telegram-webhook-pump', daemon=True).start()
+        try:
+            await self._forward(application, Update, inbox)
+        finally:
+            await application.stop()
+            if application.post_shutdown:
+                await application.post_shutdown(application)
+            await application.shutdown()
+
+    def _pump(self, loop, inbox):
+        """queue.Queue -> asyncio.Queue; inbox bitta joyli - navbat to'lishi (503) o'zgarmaydi"""
+        while not self._stopping.is_set():
+            payload = self._get()
+            if payload is None:
+                continue
+            try:
+                asyncio.run_coroutine_threadsafe(inbox.put(payload), loop).result()
+            except RuntimeError:
+                return   # event loop yopilgan
+
+    async def _forward(self, application, update_cls, inbox):
+        # Bitta uzatuvchi - kelish tartibi saqlanadi; parallellik va foydalanuvchi bo'yicha
+        # ketma-ketlikni Application ning update processori ta'minlaydi
+        while not self._stopping.is_set():
+            try:
+                payload = await asyncio.wait_for(inbox.get(), timeout=1)
+            except asyncio.TimeoutError:
+                continue
+            try:
+                await application.update_queue.put(update_cls.de_json(payload, application.bot))
+                self.forwarded += 1
+            except Exception:
+                logger.exception("Yangilanishni o'qishda xato")
+            finally:
+                self.queue.task_done()
+
+    async def _set_webhook(self, application, update_cls):
+        # Har safar qayta o'rnatiladi - WEBHOOK_SECRET almashtirilsa ham Telegram yangisini yuboradi
+        if not WEBHOOK_URL:
+            logger.warning("WEBHOOK_URL bo'sh - setWebhook o'tkazib yuborildi")
+            return
+        url = WEBHOOK_URL.rstrip('/') + WEBHOOK_PATH
+        await application.bot.set_webhook(url, secret_token=_secret(),
+                                          allowed_updates=update_cls.ALL_TYPES,
+                                          max_connections=WEBHOOK_WORKERS)
+        logger.info("Webhook o'rnatildi: %s", url)
+
+runner = WebhookRunner()
+
+@webhook_bp.route(WEBHOOK_PATH, methods=['POST'])
+def telegram_webhook():
+    if BOT_MODE != 'webhook':
+        return jsonify({'error': 'Not Found'}), 404
+    token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    # bytes: compare_digest str da ASCII bo'lmagan belgilarda TypeError beradi (500 o'rniga 403 kerak)
+    if not hmac.compare_digest(token.encode(), _secret().encode()):
+        return jsonify({'error': 'Forbidden'}), 403
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Bad Request'}), 400
+    runner.start()
+    if not runner.submit(payload):
+        return jsonify({'error': 'Queue full'}), 503
+    return jsonify({'ok': True})
+
+def init_app(app):
+    """Blueprint ni ulash; webhook rejimida bot runner ni darhol ishga tushirish"""
+    app.register_blueprint(webhook_bp)
+    if BOT_MODE == 'webhook':
+        runner.start()